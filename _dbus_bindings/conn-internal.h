@@ -44,6 +44,9 @@ typedef struct {
     PyObject *weaklist;
 
     dbus_bool_t has_mainloop;
+
+    /* A Metrics object while metrics are enabled, or NULL */
+    PyObject *metrics;
 } Connection;
 
 typedef struct {
@@ -52,6 +55,9 @@ typedef struct {
 } DBusPyLibDBusConnection;
 
 extern struct PyMethodDef DBusPyConnection_tp_methods[];
+extern DBusHandlerResult DBusPyConnection_MetricsFilter(DBusConnection *,
+                                                        DBusMessage *,
+                                                        void *);
 extern DBusHandlerResult DBusPyConnection_HandleMessage(Connection *,
                                                         PyObject *,
                                                         PyObject *);
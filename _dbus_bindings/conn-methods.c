@@ -114,7 +114,20 @@ _object_path_message(DBusConnection *conn, DBusMessage *message,
     }
     else {
         DBG("%s", "... and we have a message handler for that object path");
-        ret = DBusPyConnection_HandleMessage(conn_obj, msg_obj, callable);
+        if (conn_obj->metrics) {
+            /* the handler might disable the metrics */
+            PyObject *metrics = conn_obj->metrics;
+            double start = DBusPyMetrics_Now();
+
+            Py_INCREF(metrics);
+            ret = DBusPyConnection_HandleMessage(conn_obj, msg_obj, callable);
+            DBusPyMetrics_RecordDispatch(metrics, TRUE,
+                                         DBusPyMetrics_Now() - start);
+            Py_DECREF(metrics);
+        }
+        else {
+            ret = DBusPyConnection_HandleMessage(conn_obj, msg_obj, callable);
+        }
     }
 
 out:
@@ -194,7 +207,20 @@ _filter_message(DBusConnection *conn, DBusMessage *message, void *user_data)
     }
 #endif
 
-    ret = DBusPyConnection_HandleMessage(conn_obj, msg_obj, callable);
+    if (conn_obj->metrics) {
+        /* the filter might disable the metrics */
+        PyObject *metrics = conn_obj->metrics;
+        double start = DBusPyMetrics_Now();
+
+        Py_INCREF(metrics);
+        ret = DBusPyConnection_HandleMessage(conn_obj, msg_obj, callable);
+        DBusPyMetrics_RecordDispatch(metrics, FALSE,
+                                     DBusPyMetrics_Now() - start);
+        Py_DECREF(metrics);
+    }
+    else {
+        ret = DBusPyConnection_HandleMessage(conn_obj, msg_obj, callable);
+    }
 out:
     Py_XDECREF(msg_obj);
     Py_XDECREF(conn_obj);
@@ -203,6 +229,31 @@ out:
     return ret;
 }
 
+/* A filter which counts the messages passing through the filter chain
+ * while metrics are enabled. The user_data is the Metrics object, which
+ * is not referenced by libdbus: as for _filter_message, only use it if the
+ * Connection still has it. */
+DBusHandlerResult
+DBusPyConnection_MetricsFilter(DBusConnection *conn, DBusMessage *message,
+                               void *user_data)
+{
+    PyGILState_STATE gil = PyGILState_Ensure();
+    Connection *conn_obj;
+
+    conn_obj = (Connection *)DBusPyConnection_ExistingFromDBusConnection(conn);
+    if (!conn_obj) {
+        PyErr_Clear();
+    }
+    else {
+        if (conn_obj->metrics && conn_obj->metrics == user_data) {
+            DBusPyMetrics_CountReceived(conn_obj->metrics, message);
+        }
+        Py_DECREF(conn_obj);
+    }
+    PyGILState_Release(gil);
+    return DBUS_HANDLER_RESULT_NOT_YET_HANDLED;
+}
+
 PyDoc_STRVAR(Connection__require_main_loop__doc__,
 "_require_main_loop()\n\n"
 "Raise an exception if this Connection is not bound to any main loop -\n"
@@ -301,6 +352,79 @@ Connection_set_exit_on_disconnect (Connection *self, PyObject *args)
     Py_RETURN_NONE;
 }
 
+/* libdbus only warns (and fails to send) if a message containing Unix
+ * file descriptors is sent on a connection which can't pass them, so
+ * raise a meaningful exception beforehand instead. */
+static dbus_bool_t
+_check_can_send_message(Connection *self, DBusMessage *msg)
+{
+#ifdef DBUS_TYPE_UNIX_FD
+    dbus_bool_t ok = TRUE;
+
+    if (dbus_message_contains_unix_fds(msg)) {
+        Py_BEGIN_ALLOW_THREADS
+        ok = dbus_connection_can_send_type(self->conn, DBUS_TYPE_UNIX_FD);
+        Py_END_ALLOW_THREADS
+    }
+    if (!ok) {
+        DBusPyException_SetString("This connection cannot pass Unix file "
+                                  "descriptors");
+        return FALSE;
+    }
+#endif
+    return TRUE;
+}
+
+PyDoc_STRVAR(Connection_can_send_type__doc__,
+"can_send_type(signature: str) -> bool\n\n"
+"Return true if values of the given single complete type can be sent\n"
+"on this connection.\n"
+"\n"
+"Unix file descriptors (``'h'``) can only be sent if libdbus supports\n"
+"them (version 1.3.1 or later) and the other end of the connection\n"
+"offered to receive them during authentication, which requires a Unix\n"
+"socket transport. Until the connection has been authenticated, the\n"
+"result for ``'h'`` is false. Other types can always be sent.\n"
+"\n"
+":Since: 0.84.0\n");
+static PyObject *
+Connection_can_send_type(Connection *self, PyObject *args)
+{
+    const char *signature;
+    const char *p;
+    dbus_bool_t ok = TRUE;
+
+    TRACE(self);
+    DBUS_PY_RAISE_VIA_NULL_IF_FAIL(self->conn);
+    if (!PyArg_ParseTuple(args, "s:can_send_type", &signature)) return NULL;
+    if (!dbus_signature_validate_single(signature, NULL)) {
+        PyErr_SetString(PyExc_ValueError, "Expected a signature containing "
+                        "a single complete type");
+        return NULL;
+    }
+
+    /* container types can be sent if everything they contain can; without
+     * fd-passing support, libdbus rejected 'h' as invalid above, and
+     * everything else can always be sent */
+    for (p = signature; ok && *p; p++) {
+        switch (*p) {
+            case DBUS_STRUCT_BEGIN_CHAR:
+            case DBUS_STRUCT_END_CHAR:
+            case DBUS_DICT_ENTRY_BEGIN_CHAR:
+            case DBUS_DICT_ENTRY_END_CHAR:
+                break;
+#ifdef DBUS_TYPE_UNIX_FD
+            default:
+                Py_BEGIN_ALLOW_THREADS
+                ok = dbus_connection_can_send_type(self->conn, *p);
+                Py_END_ALLOW_THREADS
+                break;
+#endif
+        }
+    }
+    return PyBool_FromLong(ok);
+}
+
 PyDoc_STRVAR(Connection_send_message__doc__,
 "send_message(msg) -> long\n\n"
 "Queue the given message for sending, and return the message serial number.\n"
@@ -323,6 +447,7 @@ Connection_send_message(Connection *self, PyObject *args)
 
     msg = DBusPyMessage_BorrowDBusMessage(obj);
     if (!msg) return NULL;
+    if (!_check_can_send_message(self, msg)) return NULL;
 
     Py_BEGIN_ALLOW_THREADS
     ok = dbus_connection_send(self->conn, msg, &serial);
@@ -331,6 +456,9 @@ Connection_send_message(Connection *self, PyObject *args)
     if (!ok) {
         return PyErr_NoMemory();
     }
+    if (self->metrics) {
+        DBusPyMetrics_CountSent(self->metrics, msg);
+    }
 
     return PyLong_FromUnsignedLong(serial);
 }
@@ -352,6 +480,8 @@ PyDoc_STRVAR(Connection_send_message_with_reply__doc__,
 "       If the reply takes more than this many seconds, a timeout error\n"
 "       will be created locally and raised instead. If this timeout is\n"
 "       negative (default), a sane default (supplied by libdbus) is used.\n"
+"       If it is infinite (``float('inf')``, new in 0.84.0), libdbus never\n"
+"       times out the call; the caller should arrange to cancel it.\n"
 "   `require_main_loop` : bool\n"
 "       If True, raise RuntimeError if this Connection does not have a main\n"
 "       loop configured. If False (default) and there is no main loop, you are\n"
@@ -386,10 +516,19 @@ Connection_send_message_with_reply(Connection *self, PyObject *args, PyObject *k
 
     msg = DBusPyMessage_BorrowDBusMessage(obj);
     if (!msg) return NULL;
+    if (!_check_can_send_message(self, msg)) return NULL;
 
     if (timeout_s < 0) {
         timeout_ms = -1;
     }
+    else if (Py_IS_INFINITY(timeout_s)) {
+#ifdef DBUS_TIMEOUT_INFINITE
+        timeout_ms = DBUS_TIMEOUT_INFINITE;
+#else
+        /* older libdbus has no special value, but this is nearly 25 days */
+        timeout_ms = INT_MAX;
+#endif
+    }
     else {
         if (timeout_s > ((double)INT_MAX) / 1000.0) {
             PyErr_SetString(PyExc_ValueError, "Timeout too long");
@@ -412,6 +551,9 @@ Connection_send_message_with_reply(Connection *self, PyObject *args, PyObject *k
         return DBusPyException_SetString ("Connection is disconnected - "
                                           "unable to make method call");
     }
+    if (self->metrics) {
+        DBusPyMetrics_CountSent(self->metrics, msg);
+    }
 
     return DBusPyPendingCall_ConsumeDBusPendingCall(pending, callable);
 }
@@ -458,6 +600,7 @@ Connection_send_message_with_reply_and_block(Connection *self, PyObject *args)
 
     msg = DBusPyMessage_BorrowDBusMessage(obj);
     if (!msg) return NULL;
+    if (!_check_can_send_message(self, msg)) return NULL;
 
     if (timeout_s < 0) {
         timeout_ms = -1;
@@ -479,12 +622,115 @@ Connection_send_message_with_reply_and_block(Connection *self, PyObject *args)
     /* FIXME: if we instead used send_with_reply and blocked on the resulting
      * PendingCall, then we could get all args from the error, not just
      * the first */
+    if (self->metrics) {
+        /* if there's an error but no reply, libdbus didn't send it */
+        if (reply || !dbus_error_has_name(&error, DBUS_ERROR_DISCONNECTED)) {
+            DBusPyMetrics_CountSent(self->metrics, msg);
+        }
+        if (reply) {
+            DBusPyMetrics_CountReceived(self->metrics, reply);
+        }
+    }
     if (!reply) {
         return DBusPyException_ConsumeError(&error);
     }
     return DBusPyMessage_ConsumeDBusMessage(reply);
 }
 
+PyDoc_STRVAR(Connection_set_metrics_enabled__doc__,
+"set_metrics_enabled(enabled: bool)\n\n"
+"Start or stop recording metrics for this connection (see `get_metrics`).\n"
+"They are disabled by default, which costs next to nothing. Disabling\n"
+"them discards what has been recorded; enabling them when they are\n"
+"already enabled has no effect.\n"
+"\n"
+":Since: 0.84.0\n");
+static PyObject *
+Connection_set_metrics_enabled(Connection *self, PyObject *args)
+{
+    int enabled;
+    dbus_bool_t ok;
+    PyObject *metrics;
+
+    TRACE(self);
+    DBUS_PY_RAISE_VIA_NULL_IF_FAIL(self->conn);
+    if (!PyArg_ParseTuple(args, "i:set_metrics_enabled", &enabled)) {
+        return NULL;
+    }
+
+    if (enabled && !self->metrics) {
+        metrics = DBusPyMetrics_New();
+        if (!metrics) return NULL;
+
+        /* count the messages that reach the filters; the connection owns
+         * the Metrics until after it has removed the filter */
+        Py_BEGIN_ALLOW_THREADS
+        ok = dbus_connection_add_filter(self->conn,
+                                        DBusPyConnection_MetricsFilter,
+                                        metrics, NULL);
+        Py_END_ALLOW_THREADS
+        if (!ok) {
+            Py_DECREF(metrics);
+            return PyErr_NoMemory();
+        }
+        self->metrics = metrics;
+    }
+    else if (!enabled && self->metrics) {
+        metrics = self->metrics;
+        Py_BEGIN_ALLOW_THREADS
+        dbus_connection_remove_filter(self->conn,
+                                      DBusPyConnection_MetricsFilter,
+                                      metrics);
+        Py_END_ALLOW_THREADS
+        self->metrics = NULL;
+        Py_DECREF(metrics);
+    }
+    Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(Connection_get_metrics__doc__,
+"get_metrics() -> dict or None\n\n"
+"Return a snapshot of the metrics recorded since they were enabled with\n"
+"`set_metrics_enabled`, or None if they are disabled. The dict has these\n"
+"keys:\n"
+"\n"
+"`sent`, `received` : dict\n"
+"    The number of messages sent and received, by type ('method_call',\n"
+"    'method_return', 'error' or 'signal'). Received messages are\n"
+"    counted when they pass through the message filters, or when they\n"
+"    are replies to calls made with `call_async`, `call_blocking`,\n"
+"    `call_many` or `send_message_with_reply_and_block` (except for\n"
+"    error replies to the latter, which libdbus doesn't return). A\n"
+"    message handled by a message filter added earlier isn't counted.\n"
+"`bytes_sent`, `bytes_received` : long or None\n"
+"    The total size of those messages, or None if libdbus is too old to\n"
+"    say. Measuring the size copies the message.\n"
+"`append`, `get_args` : dict\n"
+"    Histograms of the time spent converting arguments to and from\n"
+"    D-Bus by dbus-python's method calls, method replies and signals\n"
+"`filter_dispatch`, `object_path_dispatch` : dict\n"
+"    Histograms of the time spent in each call to a message filter\n"
+"    (including signal receivers), and to an exported object's message\n"
+"    handler (including the method's implementation)\n"
+"`calls` : dict\n"
+"    Map from (interface, member) to a histogram of the round-trip time\n"
+"    of successful or failed calls made with `call_async`,\n"
+"    `call_blocking` or `call_many`\n"
+"\n"
+"Each histogram is a dict with keys 'count', 'sum' and 'max' (in\n"
+"seconds), and 'buckets', a list of pairs (upper bound in seconds,\n"
+"count), where the upper bounds are powers of 2 microseconds, and empty\n"
+"buckets are left out.\n"
+"\n"
+":Since: 0.84.0\n");
+static PyObject *
+Connection_get_metrics(Connection *self, PyObject *unused UNUSED)
+{
+    TRACE(self);
+    if (!self->metrics) Py_RETURN_NONE;
+    return PyObject_CallMethod(self->metrics, "snapshot", NULL);
+}
+
 PyDoc_STRVAR(Connection_flush__doc__,
 "flush()\n\n"
 "Block until the outgoing message queue is empty.\n");
@@ -1005,11 +1251,14 @@ PyDoc_STRVAR(set_unique_name__doc__,
 struct PyMethodDef DBusPyConnection_tp_methods[] = {
 #define ENTRY(name, flags) {#name, (PyCFunction)Connection_##name, flags, Connection_##name##__doc__}
     ENTRY(_require_main_loop, METH_NOARGS),
+    ENTRY(can_send_type, METH_VARARGS),
     ENTRY(close, METH_NOARGS),
     ENTRY(flush, METH_NOARGS),
     ENTRY(get_is_connected, METH_NOARGS),
     ENTRY(get_is_authenticated, METH_NOARGS),
+    ENTRY(get_metrics, METH_NOARGS),
     ENTRY(set_exit_on_disconnect, METH_VARARGS),
+    ENTRY(set_metrics_enabled, METH_VARARGS),
     ENTRY(get_unix_fd, METH_NOARGS),
     ENTRY(get_peer_unix_user, METH_NOARGS),
     ENTRY(get_peer_unix_process_id, METH_NOARGS),
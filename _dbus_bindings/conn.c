@@ -231,6 +231,7 @@ DBusPyConnection_NewConsumingDBusConnection(PyTypeObject *cls,
 
     self->has_mainloop = (mainloop != Py_None);
     self->conn = NULL;
+    self->metrics = NULL;
     self->filters = PyList_New(0);
     if (!self->filters) goto err;
     self->object_paths = PyDict_New();
@@ -361,6 +362,14 @@ static void Connection_tp_dealloc(Connection *self)
     DBG_WHEREAMI;
 
     DBG("Connection at %p: deleting callbacks", self);
+    if (self->metrics) {
+        if (conn) {
+            dbus_connection_remove_filter(conn,
+                                          DBusPyConnection_MetricsFilter,
+                                          self->metrics);
+        }
+        Py_CLEAR(self->metrics);
+    }
     self->filters = NULL;
     Py_XDECREF(filters);
     self->object_paths = NULL;
@@ -392,6 +401,24 @@ static void Connection_tp_dealloc(Connection *self)
     (self->ob_type->tp_free)((PyObject *)self);
 }
 
+/* Connection attributes ============================================ */
+
+static PyObject *
+Connection_get_metrics_object(Connection *self, void *closure UNUSED)
+{
+    PyObject *ret = self->metrics ? self->metrics : Py_None;
+
+    Py_INCREF(ret);
+    return ret;
+}
+
+static PyGetSetDef Connection_tp_getset[] = {
+    {"_metrics", (getter)Connection_get_metrics_object, NULL,
+     "The object recording this connection's metrics, or None if they are "
+     "disabled", NULL},
+    {NULL},
+};
+
 /* Connection type object =========================================== */
 
 PyTypeObject DBusPyConnection_Type = {
@@ -426,7 +453,7 @@ PyTypeObject DBusPyConnection_Type = {
     0,                      /*tp_iternext*/
     DBusPyConnection_tp_methods,  /*tp_methods*/
     0,                      /*tp_members*/
-    0,                      /*tp_getset*/
+    Connection_tp_getset,   /*tp_getset*/
     0,                      /*tp_base*/
     0,                      /*tp_dict*/
     0,                      /*tp_descr_get*/
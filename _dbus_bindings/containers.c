@@ -393,6 +393,9 @@ Dict_tp_init(DBusPyDict *self, PyObject *args, PyObject *kwargs)
             case DBUS_TYPE_STRING:
             case DBUS_TYPE_OBJECT_PATH:
             case DBUS_TYPE_SIGNATURE:
+#ifdef DBUS_TYPE_UNIX_FD
+            case DBUS_TYPE_UNIX_FD:
+#endif
                 break;
             default:
                 Py_DECREF(signature);
@@ -110,6 +110,8 @@ DEFINE_CHECK(DBusPyUInt32)
 extern PyTypeObject DBusPyInt64_Type, DBusPyUInt64_Type;
 DEFINE_CHECK(DBusPyInt64)
 DEFINE_CHECK(DBusPyUInt64)
+extern PyTypeObject DBusPyUnixFd_Type;
+DEFINE_CHECK(DBusPyUnixFd)
 extern dbus_bool_t dbus_py_init_abstract(void);
 extern dbus_bool_t dbus_py_init_signature(void);
 extern dbus_bool_t dbus_py_init_int_types(void);
@@ -117,6 +119,7 @@ extern dbus_bool_t dbus_py_init_string_types(void);
 extern dbus_bool_t dbus_py_init_float_types(void);
 extern dbus_bool_t dbus_py_init_container_types(void);
 extern dbus_bool_t dbus_py_init_byte_types(void);
+extern dbus_bool_t dbus_py_init_unixfd_type(void);
 extern dbus_bool_t dbus_py_insert_abstract_types(PyObject *this_module);
 extern dbus_bool_t dbus_py_insert_signature(PyObject *this_module);
 extern dbus_bool_t dbus_py_insert_int_types(PyObject *this_module);
@@ -124,6 +127,7 @@ extern dbus_bool_t dbus_py_insert_string_types(PyObject *this_module);
 extern dbus_bool_t dbus_py_insert_float_types(PyObject *this_module);
 extern dbus_bool_t dbus_py_insert_container_types(PyObject *this_module);
 extern dbus_bool_t dbus_py_insert_byte_types(PyObject *this_module);
+extern dbus_bool_t dbus_py_insert_unixfd_type(PyObject *this_module);
 
 /* generic */
 extern void dbus_py_take_gil_and_xdecref(PyObject *);
@@ -141,6 +145,20 @@ extern PyObject *DBusPyMessage_ConsumeDBusMessage(DBusMessage *);
 extern dbus_bool_t dbus_py_init_message_types(void);
 extern dbus_bool_t dbus_py_insert_message_types(PyObject *this_module);
 
+/* metrics.c */
+extern PyObject *DBusPyMetrics_New(void);
+extern double DBusPyMetrics_Now(void);
+extern void DBusPyMetrics_CountSent(PyObject *metrics, DBusMessage *msg);
+extern void DBusPyMetrics_CountReceived(PyObject *metrics, DBusMessage *msg);
+extern void DBusPyMetrics_RecordDispatch(PyObject *metrics,
+                                         dbus_bool_t object_path,
+                                         double seconds);
+extern dbus_bool_t dbus_py_init_metrics_types(void);
+
+/* reply-plan.c */
+extern dbus_bool_t dbus_py_init_reply_plan_type(void);
+extern dbus_bool_t dbus_py_insert_reply_plan_type(PyObject *this_module);
+
 /* pending-call.c */
 extern PyObject *DBusPyPendingCall_ConsumeDBusPendingCall(DBusPendingCall *,
                                                           PyObject *);
@@ -173,6 +191,18 @@ dbus_bool_t dbus_py_validate_interface_name(const char *name);
 dbus_bool_t dbus_py_validate_object_path(const char *path);
 #define dbus_py_validate_error_name dbus_py_validate_interface_name
 
+typedef enum {
+    DBUS_PY_VALIDATED_BUS_NAME = 0,
+    DBUS_PY_VALIDATED_MEMBER_NAME,
+    DBUS_PY_VALIDATED_INTERFACE_NAME,
+    DBUS_PY_VALIDATED_OBJECT_PATH,
+    DBUS_PY_N_VALIDATED
+} DBusPyValidatedKind;
+extern dbus_bool_t dbus_py_init_validation(void);
+dbus_bool_t dbus_py_validation_cache_contains(DBusPyValidatedKind kind,
+                                              PyObject *name);
+void dbus_py_validation_cache_add(DBusPyValidatedKind kind, PyObject *name);
+
 /* debugging support */
 void _dbus_py_assertion_failed(const char *);
 #define DBUS_PY_RAISE_VIA_NULL_IF_FAIL(assertion) \
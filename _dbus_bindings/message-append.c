@@ -54,6 +54,9 @@ get_variant_level(PyObject *obj)
              DBusPyStruct_Check(obj)) {
         return dbus_py_variant_level_get(obj);
     }
+    else if (DBusPyUnixFd_Check(obj)) {
+        return ((DBusPyUnixFd *)obj)->variant_level;
+    }
     else {
         return 0;
     }
@@ -79,6 +82,8 @@ char dbus_py_Message_append__doc__[] = (
 "array (a...)                    any iterable over appropriate objects\n"
 "struct ((...))                  any iterable over appropriate objects\n"
 "variant                         any object above (guess type as below)\n"
+"Unix fd (h)                     dbus.UnixFd, any integer, or anything\n"
+"                                with a fileno() method\n"
 "=============================== ===========================\n"
 "\n"
 "Here 'any integer' means anything on which int() or long()\n"
@@ -128,6 +133,8 @@ char dbus_py_Message_guess_signature__doc__[] = (
 "|                               |value type according to    |\n"
 "|                               |types for an arbitrary item|\n"
 "+-------------------------------+---------------------------+\n"
+"|dbus.UnixFd                    |Unix fd (h)                |\n"
+"+-------------------------------+---------------------------+\n"
 "|anything else                  |raise TypeError            |\n"
 "+-------------------------------+---------------------------+\n"
 );
@@ -187,6 +194,12 @@ _signature_string_from_pyobject(PyObject *obj, long *variant_level_ptr)
     }
     Py_DECREF(magic_attr);
 
+#ifdef DBUS_TYPE_UNIX_FD
+    if (DBusPyUnixFd_Check(obj)) {
+        return PyString_FromString(DBUS_TYPE_UNIX_FD_AS_STRING);
+    }
+#endif
+
     /* Ordering is important: some of these are subclasses of each other. */
     if (PyInt_Check(obj)) {
         if (DBusPyInt16_Check(obj))
@@ -484,6 +497,23 @@ _message_iter_append_string(DBusMessageIter *appender,
     return 0;
 }
 
+#ifdef DBUS_TYPE_UNIX_FD
+static int
+_message_iter_append_unixfd(DBusMessageIter *appender, PyObject *obj)
+{
+    int fd = dbus_py_unix_fd_from_pyobject(obj);
+
+    if (fd < 0) return -1;
+    /* libdbus duplicates the file descriptor, so the caller still owns it */
+    DBG("Performing actual append: unix fd %d", fd);
+    if (!dbus_message_iter_append_basic(appender, DBUS_TYPE_UNIX_FD, &fd)) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    return 0;
+}
+#endif
+
 static int
 _message_iter_append_byte(DBusMessageIter *appender, PyObject *obj)
 {
@@ -964,6 +994,12 @@ _message_iter_append_pyobject(DBusMessageIter *appender,
           ret = _message_iter_append_byte(appender, obj);
           break;
 
+#ifdef DBUS_TYPE_UNIX_FD
+      case DBUS_TYPE_UNIX_FD:
+          ret = _message_iter_append_unixfd(appender, obj);
+          break;
+#endif
+
       case DBUS_TYPE_ARRAY:
           /* 3 cases - it might actually be a dict, or it might be a byte array
            * being copied from a string (for which we have a faster path),
@@ -65,6 +65,7 @@ char dbus_py_Message_get_args_list__doc__[] = (
 "                 list of Byte\n"
 "struct ((...))   dbus.Struct (tuple subclass) of appropriate types\n"
 "variant (v)      contained type, but with variant_level > 0\n"
+"Unix fd (h)      dbus.UnixFd, owning a new file descriptor\n"
 "===============  ===================================================\n"
 );
 
@@ -201,6 +202,7 @@ _message_iter_get_pyobject(DBusMessageIter *iter,
         dbus_uint64_t u64;
         dbus_int64_t i64;
 #endif
+        int fd;
     } u;
     int type = dbus_message_iter_get_arg_type(iter);
     PyObject *args = NULL;
@@ -365,6 +367,20 @@ _message_iter_get_pyobject(DBusMessageIter *iter,
             ret = PyObject_Call((PyObject *)&DBusPyBoolean_Type, args, kwargs);
             break;
 
+#ifdef DBUS_TYPE_UNIX_FD
+        case DBUS_TYPE_UNIX_FD:
+            DBG("%s", "found a unix fd");
+            /* libdbus returns a duplicate, which the UnixFd now owns */
+            dbus_message_iter_get_basic(iter, &u.fd);
+            if (u.fd < 0) {
+                PyErr_SetString(PyExc_OSError, "Unable to duplicate a file "
+                                "descriptor received via D-Bus");
+                break;
+            }
+            ret = DBusPyUnixFd_New(u.fd, variant_level);
+            break;
+#endif
+
         case DBUS_TYPE_ARRAY:
             DBG("%s", "found an array...");
             /* Dicts are arrays of DBUS_TYPE_DICT_ENTRY on the wire.
@@ -520,4 +536,784 @@ dbus_py_Message_get_args_list(Message *self, PyObject *args, PyObject *kwargs)
     return list;
 }
 
+/* Lazy iteration over arguments ==================================== */
+
+char dbus_py_Message_iter_args__doc__[] = (
+"iter_args(**kwargs) -> iterator\n\n"
+"Return an iterator over the message's arguments, which converts each\n"
+"one to a Python object only when it is reached, so a message with\n"
+"large arguments can be processed without holding all of them in\n"
+"memory as Python objects at once. The keyword arguments are the same\n"
+"as for `get_args_list`.\n"
+"\n"
+"The iterator keeps the message alive. The message must not be\n"
+"appended to while it is being iterated over.\n"
+"\n"
+":Since: 0.84.0\n"
+);
+
+char dbus_py_Message_iter_array__doc__[] = (
+"iter_array(index: int, **kwargs) -> iterator\n\n"
+"Return an iterator over the elements of the message's argument at the\n"
+"given (zero-based) position, which must be an array, converting each\n"
+"element to a Python object only when it is reached. For a dict\n"
+"(signature 'a{...}'), the iterator yields (key, value) tuples. The\n"
+"keyword arguments are the same as for `get_args_list`.\n"
+"\n"
+"This is the way to walk through a huge array reply (for instance\n"
+"'a(sa{sv})' with hundreds of thousands of entries) in constant memory.\n"
+"As with `iter_args`, the iterator keeps the message alive.\n"
+"\n"
+":Raises IndexError: if the message has too few arguments\n"
+":Raises TypeError: if the argument is not an array\n"
+":Since: 0.84.0\n"
+);
+
+char dbus_py_Message_get_args_view__doc__[] = (
+"get_args_view(**kwargs) -> sequence\n\n"
+"Return a read-only view of the message's arguments, which converts\n"
+"them to Python objects only when they are accessed. Structs and arrays\n"
+"are represented by sequence views, and dicts by mapping views, which\n"
+"are equally lazy: looking up one key of a large 'a{sv}' only converts\n"
+"the value for that key. Everything else, including the contents of\n"
+"variants, is converted as for `get_args_list`, whose keyword arguments\n"
+"are also accepted here.\n"
+"\n"
+"Each access walks through the message from the start of the\n"
+"container, so use `get_args_list` if every item will be needed, or\n"
+"iterate over the view rather than indexing it. Views keep the whole\n"
+"message alive, and the message must not be appended to while views\n"
+"of it are in use.\n"
+"\n"
+":Since: 0.84.0\n"
+);
+
+/* What a MessageArgsIter yields for each dict entry */
+enum {
+    ITER_ITEMS,
+    ITER_KEYS,
+    ITER_VALUES
+};
+
+typedef struct {
+    PyObject_HEAD
+    /* the Message, kept alive for the caller's benefit */
+    PyObject *message;
+    /* our own reference, in case the Message discards its DBusMessage */
+    DBusMessage *msg;
+    /* first item; when iterating over a dict, first entry */
+    DBusMessageIter first;
+    /* the container, unless this is a view of the message's arguments */
+    DBusMessageIter container;
+    dbus_bool_t toplevel;
+    dbus_bool_t empty;
+    /* number of items, or -1 if not counted yet */
+    Py_ssize_t length;
+    Message_get_args_options opts;
+} MessageView;
+
+static PyTypeObject MessageSequenceView_Type, MessageDictView_Type;
+static PyObject *_message_view_get_item(MessageView *, DBusMessageIter *);
+
+typedef struct {
+    PyObject_HEAD
+    /* the Message, kept alive for the caller's benefit */
+    PyObject *message;
+    /* our own reference, in case the Message discards its DBusMessage */
+    DBusMessage *msg;
+    /* if not NULL, yield containers as views like those in this view */
+    MessageView *view;
+    DBusMessageIter iter;
+    Message_get_args_options opts;
+    int mode;
+    dbus_bool_t finished;
+} MessageArgsIter;
+
+static void
+MessageArgsIter_tp_dealloc(MessageArgsIter *self)
+{
+    Py_XDECREF(self->message);
+    self->message = NULL;
+    Py_XDECREF(self->view);
+    self->view = NULL;
+    if (self->msg) {
+        dbus_message_unref(self->msg);
+        self->msg = NULL;
+    }
+    PyObject_Del(self);
+}
+
+static PyObject *
+MessageArgsIter_tp_iter(PyObject *self)
+{
+    Py_INCREF(self);
+    return self;
+}
+
+static inline PyObject *
+_message_args_iter_get_item(MessageArgsIter *self, DBusMessageIter *iter)
+{
+    if (self->view) {
+        return _message_view_get_item(self->view, iter);
+    }
+    return _message_iter_get_pyobject(iter, &self->opts, 0);
+}
+
+static PyObject *
+MessageArgsIter_tp_iternext(MessageArgsIter *self)
+{
+    PyObject *ret;
+    int type;
+
+    if (self->finished) return NULL;
+
+    type = dbus_message_iter_get_arg_type(&self->iter);
+    if (type == DBUS_TYPE_INVALID) {
+        self->finished = TRUE;
+        return NULL;
+    }
+
+    if (type == DBUS_TYPE_DICT_ENTRY) {
+        DBusMessageIter kv;
+        PyObject *key, *value;
+
+        dbus_message_iter_recurse(&self->iter, &kv);
+        if (self->mode == ITER_VALUES) {
+            dbus_message_iter_next(&kv);
+            ret = _message_args_iter_get_item(self, &kv);
+        }
+        else {
+            key = _message_iter_get_pyobject(&kv, &self->opts, 0);
+            if (!key) return NULL;
+            if (self->mode == ITER_KEYS) {
+                ret = key;
+            }
+            else {
+                dbus_message_iter_next(&kv);
+                value = _message_args_iter_get_item(self, &kv);
+                if (!value) {
+                    Py_DECREF(key);
+                    return NULL;
+                }
+                ret = PyTuple_Pack(2, key, value);
+                Py_DECREF(key);
+                Py_DECREF(value);
+            }
+        }
+    }
+    else {
+        ret = _message_args_iter_get_item(self, &self->iter);
+    }
+    if (!ret) return NULL;
+
+    if (!dbus_message_iter_next(&self->iter)) {
+        self->finished = TRUE;
+    }
+    return ret;
+}
+
+PyTypeObject DBusPyMessageArgsIter_Type = {
+    PyObject_HEAD_INIT(DEFERRED_ADDRESS(&PyType_Type))
+    0,
+    "_dbus_bindings._MessageArgsIter",
+    sizeof(MessageArgsIter),
+    0,
+    (destructor)MessageArgsIter_tp_dealloc, /* tp_dealloc */
+    0,                                      /* tp_print */
+    0,                                      /* tp_getattr */
+    0,                                      /* tp_setattr */
+    0,                                      /* tp_compare */
+    0,                                      /* tp_repr */
+    0,                                      /* tp_as_number */
+    0,                                      /* tp_as_sequence */
+    0,                                      /* tp_as_mapping */
+    0,                                      /* tp_hash */
+    0,                                      /* tp_call */
+    0,                                      /* tp_str */
+    0,                                      /* tp_getattro */
+    0,                                      /* tp_setattro */
+    0,                                      /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,                     /* tp_flags */
+    0,                                      /* tp_doc */
+    0,                                      /* tp_traverse */
+    0,                                      /* tp_clear */
+    0,                                      /* tp_richcompare */
+    0,                                      /* tp_weaklistoffset */
+    MessageArgsIter_tp_iter,                /* tp_iter */
+    (iternextfunc)MessageArgsIter_tp_iternext, /* tp_iternext */
+    0,                                      /* tp_methods */
+    0,                                      /* tp_members */
+    0,                                      /* tp_getset */
+    0,                                      /* tp_base */
+    0,                                      /* tp_dict */
+    0,                                      /* tp_descr_get */
+    0,                                      /* tp_descr_set */
+    0,                                      /* tp_dictoffset */
+    0,                                      /* tp_init */
+    0,                                      /* tp_alloc */
+    /* deliberately not callable! Use Message.iter_args() instead */
+    0,                                      /* tp_new */
+    0,                                      /* tp_free */
+};
+
+/* Return a new iterator positioned at the message's first argument. */
+static MessageArgsIter *
+_message_args_iter_new(Message *self, Message_get_args_options *opts)
+{
+    MessageArgsIter *iter;
+
+    iter = PyObject_New(MessageArgsIter, &DBusPyMessageArgsIter_Type);
+    if (!iter) return NULL;
+    Py_INCREF(self);
+    iter->message = (PyObject *)self;
+    iter->msg = dbus_message_ref(self->msg);
+    iter->view = NULL;
+    iter->opts = *opts;
+    iter->mode = ITER_ITEMS;
+    iter->finished = !dbus_message_iter_init(self->msg, &iter->iter);
+    return iter;
+}
+
+PyObject *
+dbus_py_Message_iter_args(Message *self, PyObject *args, PyObject *kwargs)
+{
+    Message_get_args_options opts = { 0, 0 };
+    static char *argnames[] = { "byte_arrays", "utf8_strings", NULL };
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "|ii:iter_args", argnames,
+                                     &(opts.byte_arrays),
+                                     &(opts.utf8_strings))) return NULL;
+    if (!self->msg) return DBusPy_RaiseUnusableMessage();
+
+    return (PyObject *)_message_args_iter_new(self, &opts);
+}
+
+PyObject *
+dbus_py_Message_iter_array(Message *self, PyObject *args, PyObject *kwargs)
+{
+    Message_get_args_options opts = { 0, 0 };
+    static char *argnames[] = { "index", "byte_arrays", "utf8_strings",
+                                NULL };
+    long index;
+    long i;
+    DBusMessageIter sub;
+    MessageArgsIter *iter;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "l|ii:iter_array",
+                                     argnames, &index,
+                                     &(opts.byte_arrays),
+                                     &(opts.utf8_strings))) return NULL;
+    if (!self->msg) return DBusPy_RaiseUnusableMessage();
+    if (index < 0) {
+        PyErr_SetString(PyExc_IndexError, "argument index out of range");
+        return NULL;
+    }
+
+    iter = _message_args_iter_new(self, &opts);
+    if (!iter) return NULL;
+
+    /* skip to the requested argument without converting anything */
+    for (i = 0; i < index && !iter->finished; i++) {
+        if (!dbus_message_iter_next(&iter->iter)) {
+            iter->finished = TRUE;
+        }
+    }
+    if (iter->finished) {
+        Py_DECREF(iter);
+        PyErr_SetString(PyExc_IndexError, "argument index out of range");
+        return NULL;
+    }
+    if (dbus_message_iter_get_arg_type(&iter->iter) != DBUS_TYPE_ARRAY) {
+        Py_DECREF(iter);
+        PyErr_Format(PyExc_TypeError, "Argument %ld is not an array",
+                     index);
+        return NULL;
+    }
+
+    dbus_message_iter_recurse(&iter->iter, &sub);
+    iter->iter = sub;
+    iter->finished = (dbus_message_iter_get_arg_type(&sub)
+                      == DBUS_TYPE_INVALID);
+    return (PyObject *)iter;
+}
+
+/* Lazy views of containers ========================================= */
+
+/* A DBusMessageIter used for reading can be copied by value, so a view
+ * keeps a copy positioned at its first item and walks forward from there
+ * on each access, converting nothing it doesn't return. */
+
+/* If iter is not NULL, make a view of the container at iter; otherwise
+ * make a view of the message's arguments. */
+static PyObject *
+_message_view_new(PyTypeObject *type, PyObject *message, DBusMessage *msg,
+                  DBusMessageIter *iter, Message_get_args_options *opts)
+{
+    MessageView *self = PyObject_New(MessageView, type);
+
+    if (!self) return NULL;
+    Py_INCREF(message);
+    self->message = message;
+    self->msg = dbus_message_ref(msg);
+    self->length = -1;
+    self->opts = *opts;
+    if (iter) {
+        self->toplevel = FALSE;
+        self->container = *iter;
+        dbus_message_iter_recurse(iter, &self->first);
+        self->empty = (dbus_message_iter_get_arg_type(&self->first)
+                       == DBUS_TYPE_INVALID);
+    }
+    else {
+        self->toplevel = TRUE;
+        self->empty = !dbus_message_iter_init(msg, &self->first);
+    }
+    return (PyObject *)self;
+}
+
+/* Return a new reference to the item at iter: a view if it's a container
+ * (other than a byte array, when those are wanted as ByteArray),
+ * otherwise as converted by get_args_list. */
+static PyObject *
+_message_view_get_item(MessageView *self, DBusMessageIter *iter)
+{
+    int type = dbus_message_iter_get_arg_type(iter);
+
+    if (type == DBUS_TYPE_STRUCT) {
+        return _message_view_new(&MessageSequenceView_Type, self->message,
+                                 self->msg, iter, &self->opts);
+    }
+    if (type == DBUS_TYPE_ARRAY) {
+        type = dbus_message_iter_get_element_type(iter);
+        if (type == DBUS_TYPE_DICT_ENTRY) {
+            return _message_view_new(&MessageDictView_Type, self->message,
+                                     self->msg, iter, &self->opts);
+        }
+        if (type != DBUS_TYPE_BYTE || !self->opts.byte_arrays) {
+            return _message_view_new(&MessageSequenceView_Type,
+                                     self->message, self->msg, iter,
+                                     &self->opts);
+        }
+    }
+    return _message_iter_get_pyobject(iter, &self->opts, 0);
+}
+
+static void
+MessageView_tp_dealloc(MessageView *self)
+{
+    Py_XDECREF(self->message);
+    self->message = NULL;
+    if (self->msg) {
+        dbus_message_unref(self->msg);
+        self->msg = NULL;
+    }
+    PyObject_Del(self);
+}
+
+static PyObject *
+MessageView_get_signature(MessageView *self, void *closure UNUSED)
+{
+    char *sig;
+    PyObject *ret;
+
+    if (self->toplevel) {
+        return PyObject_CallFunction((PyObject *)&DBusPySignature_Type,
+                                     "(s)",
+                                     dbus_message_get_signature(self->msg));
+    }
+    sig = dbus_message_iter_get_signature(&self->container);
+    if (!sig) return PyErr_NoMemory();
+    ret = PyObject_CallFunction((PyObject *)&DBusPySignature_Type, "(s)",
+                                sig);
+    dbus_free(sig);
+    return ret;
+}
+
+static PyObject *
+MessageView_tp_repr(MessageView *self)
+{
+    PyObject *sig = MessageView_get_signature(self, NULL);
+    PyObject *ret;
+
+    if (!sig) return NULL;
+    ret = PyString_FromFormat("<%s of signature '%s' at %p>",
+                              self->ob_type->tp_name,
+                              PyString_AS_STRING(sig), self);
+    Py_DECREF(sig);
+    return ret;
+}
+
+static Py_ssize_t
+MessageView_sq_length(MessageView *self)
+{
+    if (self->length < 0) {
+        DBusMessageIter iter = self->first;
+        Py_ssize_t n = 0;
+
+        if (!self->empty) {
+            do {
+                n++;
+            } while (dbus_message_iter_next(&iter));
+        }
+        self->length = n;
+    }
+    return self->length;
+}
+
+static PyObject *
+_message_view_iter(MessageView *self, int mode)
+{
+    MessageArgsIter *iter;
+
+    iter = PyObject_New(MessageArgsIter, &DBusPyMessageArgsIter_Type);
+    if (!iter) return NULL;
+    Py_INCREF(self->message);
+    iter->message = self->message;
+    iter->msg = dbus_message_ref(self->msg);
+    Py_INCREF(self);
+    iter->view = self;
+    iter->iter = self->first;
+    iter->opts = self->opts;
+    iter->mode = mode;
+    iter->finished = self->empty;
+    return (PyObject *)iter;
+}
+
+static PyGetSetDef MessageView_tp_getset[] = {
+    {"signature", (getter)MessageView_get_signature, NULL,
+     "The D-Bus signature of the viewed container, or of all the "
+     "arguments", NULL},
+    {NULL},
+};
+
+/* Sequence views (structs, arrays and argument lists) ---------------- */
+
+PyDoc_STRVAR(MessageSequenceView_tp_doc,
+"A read-only sequence view of a D-Bus struct or array, or of a message's\n"
+"arguments, converting items only when they are accessed. See\n"
+"`Message.get_args_view`.\n");
+
+static PyObject *
+MessageSequenceView_sq_item(MessageView *self, Py_ssize_t i)
+{
+    DBusMessageIter iter = self->first;
+    Py_ssize_t j;
+
+    /* Python has already added len() to negative indexes */
+    if (i < 0 || self->empty) goto out_of_range;
+    for (j = 0; j < i; j++) {
+        if (!dbus_message_iter_next(&iter)) goto out_of_range;
+    }
+    return _message_view_get_item(self, &iter);
+
+out_of_range:
+    PyErr_SetString(PyExc_IndexError, "index out of range");
+    return NULL;
+}
+
+static PyObject *
+MessageSequenceView_tp_iter(MessageView *self)
+{
+    return _message_view_iter(self, ITER_ITEMS);
+}
+
+static PySequenceMethods MessageSequenceView_tp_as_sequence = {
+    (lenfunc)MessageView_sq_length,         /* sq_length */
+    0,                                      /* sq_concat */
+    0,                                      /* sq_repeat */
+    (ssizeargfunc)MessageSequenceView_sq_item, /* sq_item */
+};
+
+static PyTypeObject MessageSequenceView_Type = {
+    PyObject_HEAD_INIT(DEFERRED_ADDRESS(&PyType_Type))
+    0,
+    "_dbus_bindings._SequenceView",
+    sizeof(MessageView),
+    0,
+    (destructor)MessageView_tp_dealloc,     /* tp_dealloc */
+    0,                                      /* tp_print */
+    0,                                      /* tp_getattr */
+    0,                                      /* tp_setattr */
+    0,                                      /* tp_compare */
+    (reprfunc)MessageView_tp_repr,          /* tp_repr */
+    0,                                      /* tp_as_number */
+    &MessageSequenceView_tp_as_sequence,    /* tp_as_sequence */
+    0,                                      /* tp_as_mapping */
+    0,                                      /* tp_hash */
+    0,                                      /* tp_call */
+    0,                                      /* tp_str */
+    0,                                      /* tp_getattro */
+    0,                                      /* tp_setattro */
+    0,                                      /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,                     /* tp_flags */
+    MessageSequenceView_tp_doc,             /* tp_doc */
+    0,                                      /* tp_traverse */
+    0,                                      /* tp_clear */
+    0,                                      /* tp_richcompare */
+    0,                                      /* tp_weaklistoffset */
+    (getiterfunc)MessageSequenceView_tp_iter, /* tp_iter */
+    0,                                      /* tp_iternext */
+    0,                                      /* tp_methods */
+    0,                                      /* tp_members */
+    MessageView_tp_getset,                  /* tp_getset */
+    0,                                      /* tp_base */
+    0,                                      /* tp_dict */
+    0,                                      /* tp_descr_get */
+    0,                                      /* tp_descr_set */
+    0,                                      /* tp_dictoffset */
+    0,                                      /* tp_init */
+    0,                                      /* tp_alloc */
+    /* deliberately not callable! Use Message.get_args_view() instead */
+    0,                                      /* tp_new */
+    0,                                      /* tp_free */
+};
+
+/* Mapping views (dicts) ---------------------------------------------- */
+
+PyDoc_STRVAR(MessageDictView_tp_doc,
+"A read-only mapping view of a D-Bus dict, converting values only when\n"
+"they are accessed. Looking up a string key compares it with the keys in\n"
+"the message without converting them. See `Message.get_args_view`.\n");
+
+/* Return a new reference to the value for key. If there is no such key,
+ * return NULL without setting an exception. */
+static PyObject *
+_message_dict_view_lookup(MessageView *self, PyObject *key)
+{
+    DBusMessageIter entries, kv;
+    PyObject *utf8 = NULL;
+    const char *key_str = NULL;
+    Py_ssize_t key_len = 0;
+    PyObject *ret = NULL;
+    int key_type;
+
+    if (self->empty) return NULL;
+
+    if (PyUnicode_Check(key)) {
+        utf8 = PyUnicode_AsUTF8String(key);
+        if (!utf8) return NULL;
+        key_str = PyString_AS_STRING(utf8);
+        key_len = PyString_GET_SIZE(utf8);
+    }
+    else if (PyString_Check(key)) {
+        key_str = PyString_AS_STRING(key);
+        key_len = PyString_GET_SIZE(key);
+    }
+
+    entries = self->first;
+    do {
+        dbus_message_iter_recurse(&entries, &kv);
+        key_type = dbus_message_iter_get_arg_type(&kv);
+        if (key_type == DBUS_TYPE_STRING
+            || key_type == DBUS_TYPE_OBJECT_PATH
+            || key_type == DBUS_TYPE_SIGNATURE) {
+            const char *s;
+
+            /* only strings can be equal to string keys, and D-Bus
+             * strings can't contain NUL */
+            if (!key_str || (Py_ssize_t)strlen(key_str) != key_len) break;
+            dbus_message_iter_get_basic(&kv, &s);
+            if (strcmp(s, key_str) != 0) continue;
+        }
+        else {
+            PyObject *k = _message_iter_get_pyobject(&kv, &self->opts, 0);
+            int equal;
+
+            if (!k) goto out;
+            equal = PyObject_RichCompareBool(k, key, Py_EQ);
+            Py_DECREF(k);
+            if (equal < 0) goto out;
+            if (!equal) continue;
+        }
+        dbus_message_iter_next(&kv);
+        ret = _message_view_get_item(self, &kv);
+        goto out;
+    } while (dbus_message_iter_next(&entries));
+
+out:
+    Py_XDECREF(utf8);
+    return ret;
+}
+
+static PyObject *
+MessageDictView_mp_subscript(MessageView *self, PyObject *key)
+{
+    PyObject *ret = _message_dict_view_lookup(self, key);
+
+    if (!ret && !PyErr_Occurred()) {
+        PyErr_SetObject(PyExc_KeyError, key);
+    }
+    return ret;
+}
+
+static int
+MessageDictView_sq_contains(MessageView *self, PyObject *key)
+{
+    PyObject *value = _message_dict_view_lookup(self, key);
+
+    if (value) {
+        Py_DECREF(value);
+        return 1;
+    }
+    return (PyErr_Occurred() ? -1 : 0);
+}
+
+static PyObject *
+MessageDictView_get(MessageView *self, PyObject *args)
+{
+    PyObject *key, *ret;
+    PyObject *failobj = Py_None;
+
+    if (!PyArg_UnpackTuple(args, "get", 1, 2, &key, &failobj)) return NULL;
+    ret = _message_dict_view_lookup(self, key);
+    if (!ret && !PyErr_Occurred()) {
+        Py_INCREF(failobj);
+        ret = failobj;
+    }
+    return ret;
+}
+
+static PyObject *
+MessageDictView_has_key(MessageView *self, PyObject *key)
+{
+    int ret = MessageDictView_sq_contains(self, key);
+
+    if (ret < 0) return NULL;
+    return PyBool_FromLong(ret);
+}
+
+static PyObject *
+MessageDictView_tp_iter(MessageView *self)
+{
+    return _message_view_iter(self, ITER_KEYS);
+}
+
+#define DICT_VIEW_ITER_METHODS(name, mode) \
+static PyObject * \
+MessageDictView_iter##name(MessageView *self, PyObject *unused UNUSED) \
+{ \
+    return _message_view_iter(self, mode); \
+} \
+static PyObject * \
+MessageDictView_##name(MessageView *self, PyObject *unused UNUSED) \
+{ \
+    PyObject *iter = _message_view_iter(self, mode); \
+    PyObject *ret; \
+    if (!iter) return NULL; \
+    ret = PySequence_List(iter); \
+    Py_DECREF(iter); \
+    return ret; \
+}
+DICT_VIEW_ITER_METHODS(keys, ITER_KEYS)
+DICT_VIEW_ITER_METHODS(values, ITER_VALUES)
+DICT_VIEW_ITER_METHODS(items, ITER_ITEMS)
+#undef DICT_VIEW_ITER_METHODS
+
+static PyMethodDef MessageDictView_tp_methods[] = {
+    {"get", (PyCFunction)MessageDictView_get, METH_VARARGS,
+     "D.get(k[,d]) -> D[k] if k in D, else d. d defaults to None."},
+    {"has_key", (PyCFunction)MessageDictView_has_key, METH_O,
+     "D.has_key(k) -> True if D has a key k, else False"},
+    {"keys", (PyCFunction)MessageDictView_keys, METH_NOARGS,
+     "D.keys() -> list of D's keys"},
+    {"values", (PyCFunction)MessageDictView_values, METH_NOARGS,
+     "D.values() -> list of D's values"},
+    {"items", (PyCFunction)MessageDictView_items, METH_NOARGS,
+     "D.items() -> list of D's (key, value) pairs, as 2-tuples"},
+    {"iterkeys", (PyCFunction)MessageDictView_iterkeys, METH_NOARGS,
+     "D.iterkeys() -> an iterator over the keys of D"},
+    {"itervalues", (PyCFunction)MessageDictView_itervalues, METH_NOARGS,
+     "D.itervalues() -> an iterator over the values of D"},
+    {"iteritems", (PyCFunction)MessageDictView_iteritems, METH_NOARGS,
+     "D.iteritems() -> an iterator over the (key, value) items of D"},
+    {NULL},
+};
+
+static PySequenceMethods MessageDictView_tp_as_sequence = {
+    0,                                      /* sq_length */
+    0,                                      /* sq_concat */
+    0,                                      /* sq_repeat */
+    0,                                      /* sq_item */
+    0,                                      /* sq_slice */
+    0,                                      /* sq_ass_item */
+    0,                                      /* sq_ass_slice */
+    (objobjproc)MessageDictView_sq_contains, /* sq_contains */
+};
+
+static PyMappingMethods MessageDictView_tp_as_mapping = {
+    (lenfunc)MessageView_sq_length,         /* mp_length */
+    (binaryfunc)MessageDictView_mp_subscript, /* mp_subscript */
+    0,                                      /* mp_ass_subscript */
+};
+
+static PyTypeObject MessageDictView_Type = {
+    PyObject_HEAD_INIT(DEFERRED_ADDRESS(&PyType_Type))
+    0,
+    "_dbus_bindings._DictView",
+    sizeof(MessageView),
+    0,
+    (destructor)MessageView_tp_dealloc,     /* tp_dealloc */
+    0,                                      /* tp_print */
+    0,                                      /* tp_getattr */
+    0,                                      /* tp_setattr */
+    0,                                      /* tp_compare */
+    (reprfunc)MessageView_tp_repr,          /* tp_repr */
+    0,                                      /* tp_as_number */
+    &MessageDictView_tp_as_sequence,        /* tp_as_sequence */
+    &MessageDictView_tp_as_mapping,         /* tp_as_mapping */
+    0,                                      /* tp_hash */
+    0,                                      /* tp_call */
+    0,                                      /* tp_str */
+    0,                                      /* tp_getattro */
+    0,                                      /* tp_setattro */
+    0,                                      /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,                     /* tp_flags */
+    MessageDictView_tp_doc,                 /* tp_doc */
+    0,                                      /* tp_traverse */
+    0,                                      /* tp_clear */
+    0,                                      /* tp_richcompare */
+    0,                                      /* tp_weaklistoffset */
+    (getiterfunc)MessageDictView_tp_iter,   /* tp_iter */
+    0,                                      /* tp_iternext */
+    MessageDictView_tp_methods,             /* tp_methods */
+    0,                                      /* tp_members */
+    MessageView_tp_getset,                  /* tp_getset */
+    0,                                      /* tp_base */
+    0,                                      /* tp_dict */
+    0,                                      /* tp_descr_get */
+    0,                                      /* tp_descr_set */
+    0,                                      /* tp_dictoffset */
+    0,                                      /* tp_init */
+    0,                                      /* tp_alloc */
+    /* deliberately not callable! Use Message.get_args_view() instead */
+    0,                                      /* tp_new */
+    0,                                      /* tp_free */
+};
+
+PyObject *
+dbus_py_Message_get_args_view(Message *self, PyObject *args,
+                              PyObject *kwargs)
+{
+    Message_get_args_options opts = { 0, 0 };
+    static char *argnames[] = { "byte_arrays", "utf8_strings", NULL };
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "|ii:get_args_view",
+                                     argnames,
+                                     &(opts.byte_arrays),
+                                     &(opts.utf8_strings))) return NULL;
+    if (!self->msg) return DBusPy_RaiseUnusableMessage();
+
+    return _message_view_new(&MessageSequenceView_Type, (PyObject *)self,
+                             self->msg, NULL, &opts);
+}
+
+dbus_bool_t
+dbus_py_init_message_view_types(void)
+{
+    if (PyType_Ready(&DBusPyMessageArgsIter_Type) < 0) return 0;
+    if (PyType_Ready(&MessageSequenceView_Type) < 0) return 0;
+    if (PyType_Ready(&MessageDictView_Type) < 0) return 0;
+    return 1;
+}
+
 /* vim:set ft=c cino< sw=4 sts=4 et: */
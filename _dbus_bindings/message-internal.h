@@ -43,6 +43,17 @@ extern char dbus_py_Message_get_args_list__doc__[];
 extern PyObject *dbus_py_Message_get_args_list(Message *,
                                                PyObject *,
                                                PyObject *);
+extern char dbus_py_Message_iter_args__doc__[];
+extern PyObject *dbus_py_Message_iter_args(Message *, PyObject *,
+                                           PyObject *);
+extern char dbus_py_Message_iter_array__doc__[];
+extern PyObject *dbus_py_Message_iter_array(Message *, PyObject *,
+                                            PyObject *);
+extern char dbus_py_Message_get_args_view__doc__[];
+extern PyObject *dbus_py_Message_get_args_view(Message *, PyObject *,
+                                               PyObject *);
+extern PyTypeObject DBusPyMessageArgsIter_Type;
+extern dbus_bool_t dbus_py_init_message_view_types(void);
 
 extern PyObject *DBusPy_RaiseUnusableMessage(void);
 
@@ -745,6 +745,12 @@ static PyMethodDef Message_tp_methods[] = {
 
     {"get_args_list", (PyCFunction)dbus_py_Message_get_args_list,
       METH_VARARGS|METH_KEYWORDS, dbus_py_Message_get_args_list__doc__},
+    {"iter_args", (PyCFunction)dbus_py_Message_iter_args,
+      METH_VARARGS|METH_KEYWORDS, dbus_py_Message_iter_args__doc__},
+    {"iter_array", (PyCFunction)dbus_py_Message_iter_array,
+      METH_VARARGS|METH_KEYWORDS, dbus_py_Message_iter_array__doc__},
+    {"get_args_view", (PyCFunction)dbus_py_Message_get_args_view,
+      METH_VARARGS|METH_KEYWORDS, dbus_py_Message_get_args_view__doc__},
     {"guess_signature", (PyCFunction)dbus_py_Message_guess_signature,
       METH_VARARGS|METH_STATIC, dbus_py_Message_guess_signature__doc__},
     {"append", (PyCFunction)dbus_py_Message_append,
@@ -1023,6 +1029,7 @@ dbus_bool_t
 dbus_py_init_message_types(void)
 {
     if (PyType_Ready(&MessageType) < 0) return 0;
+    if (!dbus_py_init_message_view_types()) return 0;
 
     MethodCallMessageType.tp_base = &MessageType;
     if (PyType_Ready(&MethodCallMessageType) < 0) return 0;
@@ -0,0 +1,518 @@
+/* Optional per-connection counters and timing histograms.
+ *
+ * Copyright (C) 2008 Collabora Ltd. <http://www.collabora.co.uk/>
+ *
+ * Permission is hereby granted, free of charge, to any person
+ * obtaining a copy of this software and associated documentation
+ * files (the "Software"), to deal in the Software without
+ * restriction, including without limitation the rights to use, copy,
+ * modify, merge, publish, distribute, sublicense, and/or sell copies
+ * of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be
+ * included in all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+ * EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+ * MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+ * NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+ * HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+ * WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+ * DEALINGS IN THE SOFTWARE.
+ */
+
+#include <Python.h>
+
+#include <math.h>
+#include <sys/time.h>
+
+#include "dbus_bindings-internal.h"
+
+/* A Connection only has a Metrics object while metrics are enabled, so
+ * the cost of the instrumentation when they're disabled is checking for
+ * a NULL pointer. */
+
+/* Histograms of durations ========================================== */
+
+/* Bucket i counts durations of less than 2**i microseconds (and at least
+ * 2**(i-1), for i > 0); the last bucket also counts anything longer. */
+#define HISTOGRAM_BUCKETS 32
+
+typedef struct {
+    PyObject_HEAD
+    unsigned long count;
+    double sum;
+    double max;
+    unsigned long buckets[HISTOGRAM_BUCKETS];
+} Histogram;
+
+static PyTypeObject HistogramType;
+
+static Histogram *
+_histogram_new(void)
+{
+    Histogram *self = PyObject_New(Histogram, &HistogramType);
+
+    if (!self) return NULL;
+    self->count = 0;
+    self->sum = 0.0;
+    self->max = 0.0;
+    memset(self->buckets, 0, sizeof(self->buckets));
+    return self;
+}
+
+static void
+_histogram_record(Histogram *self, double seconds)
+{
+    double us = seconds * 1000000.0;
+    int i = 0;
+
+    while (i < HISTOGRAM_BUCKETS - 1 && us >= 1.0) {
+        us /= 2.0;
+        i++;
+    }
+    self->buckets[i]++;
+    self->count++;
+    self->sum += seconds;
+    if (seconds > self->max) {
+        self->max = seconds;
+    }
+}
+
+/* Return a dict {'count': int, 'sum': float, 'max': float,
+ * 'buckets': [(upper bound in seconds, count), ...]}, leaving out empty
+ * buckets. */
+static PyObject *
+_histogram_snapshot(Histogram *self)
+{
+    PyObject *buckets = PyList_New(0);
+    PyObject *ret = NULL;
+    int i;
+
+    if (!buckets) return NULL;
+    for (i = 0; i < HISTOGRAM_BUCKETS; i++) {
+        PyObject *bucket;
+        int ok;
+
+        if (!self->buckets[i]) continue;
+        bucket = Py_BuildValue("(dk)", ldexp(1.0, i) / 1000000.0,
+                               self->buckets[i]);
+        if (!bucket) goto out;
+        ok = PyList_Append(buckets, bucket);
+        Py_DECREF(bucket);
+        if (ok < 0) goto out;
+    }
+    ret = Py_BuildValue("{s:k,s:d,s:d,s:O}", "count", self->count,
+                        "sum", self->sum, "max", self->max,
+                        "buckets", buckets);
+out:
+    Py_DECREF(buckets);
+    return ret;
+}
+
+static void
+Histogram_tp_dealloc(Histogram *self)
+{
+    PyObject_Del(self);
+}
+
+static PyTypeObject HistogramType = {
+    PyObject_HEAD_INIT(DEFERRED_ADDRESS(&PyType_Type))
+    0,
+    "_dbus_bindings._Histogram",
+    sizeof(Histogram),
+    0,
+    (destructor)Histogram_tp_dealloc,       /* tp_dealloc */
+    0,                                      /* tp_print */
+    0,                                      /* tp_getattr */
+    0,                                      /* tp_setattr */
+    0,                                      /* tp_compare */
+    0,                                      /* tp_repr */
+    0,                                      /* tp_as_number */
+    0,                                      /* tp_as_sequence */
+    0,                                      /* tp_as_mapping */
+    0,                                      /* tp_hash */
+    0,                                      /* tp_call */
+    0,                                      /* tp_str */
+    0,                                      /* tp_getattro */
+    0,                                      /* tp_setattro */
+    0,                                      /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,                     /* tp_flags */
+    0,                                      /* tp_doc */
+    0,                                      /* tp_traverse */
+    0,                                      /* tp_clear */
+    0,                                      /* tp_richcompare */
+    0,                                      /* tp_weaklistoffset */
+    0,                                      /* tp_iter */
+    0,                                      /* tp_iternext */
+    0,                                      /* tp_methods */
+    0,                                      /* tp_members */
+    0,                                      /* tp_getset */
+    0,                                      /* tp_base */
+    0,                                      /* tp_dict */
+    0,                                      /* tp_descr_get */
+    0,                                      /* tp_descr_set */
+    0,                                      /* tp_dictoffset */
+    0,                                      /* tp_init */
+    0,                                      /* tp_alloc */
+    /* deliberately not callable! */
+    0,                                      /* tp_new */
+    0,                                      /* tp_free */
+};
+
+/* Metrics ========================================================== */
+
+PyDoc_STRVAR(Metrics_tp_doc,
+"The counters and histograms recorded for a Connection while its metrics\n"
+"are enabled. Cannot be instantiated directly: see\n"
+"`dbus.connection.Connection.set_metrics_enabled`.\n"
+"\n"
+"The record_... methods are used by the dbus-python code that calls\n"
+"`dbus.lowlevel.Message.append` and `dbus.lowlevel.Message.get_args_list`\n"
+"and that waits for method replies, none of which happens in libdbus.\n"
+"\n"
+":Since: 0.84.0\n"
+);
+
+/* indexed by message type; DBUS_MESSAGE_TYPE_INVALID is 0 */
+#define N_MESSAGE_TYPES (DBUS_MESSAGE_TYPE_SIGNAL + 1)
+
+typedef struct {
+    PyObject_HEAD
+    unsigned long sent[N_MESSAGE_TYPES];
+    unsigned long received[N_MESSAGE_TYPES];
+    unsigned PY_LONG_LONG bytes_sent;
+    unsigned PY_LONG_LONG bytes_received;
+    Histogram *append;
+    Histogram *get_args;
+    Histogram *filters;
+    Histogram *object_paths;
+    /* (interface, member) => Histogram of round-trip times */
+    PyObject *calls;
+} Metrics;
+
+static PyTypeObject MetricsType;
+
+static const char *message_type_names[N_MESSAGE_TYPES] = {
+    "invalid", "method_call", "method_return", "error", "signal",
+};
+
+double
+DBusPyMetrics_Now(void)
+{
+    struct timeval tv;
+
+    gettimeofday(&tv, NULL);
+    return tv.tv_sec + tv.tv_usec / 1000000.0;
+}
+
+/* Return the size of the message on the wire, or 0 if libdbus can't
+ * say. */
+static unsigned long
+_message_size(DBusMessage *msg)
+{
+#ifdef HAVE_DBUS_MESSAGE_MARSHAL
+    char *data;
+    int len;
+
+    if (!dbus_message_marshal(msg, &data, &len)) return 0;
+    dbus_free(data);
+    return len;
+#else
+    (void)msg;
+    return 0;
+#endif
+}
+
+static inline int
+_message_type_index(DBusMessage *msg)
+{
+    int type = dbus_message_get_type(msg);
+
+    if (type < 0 || type >= N_MESSAGE_TYPES) return 0;
+    return type;
+}
+
+/* The caller must hold the GIL. */
+void
+DBusPyMetrics_CountSent(PyObject *metrics, DBusMessage *msg)
+{
+    Metrics *self = (Metrics *)metrics;
+
+    self->sent[_message_type_index(msg)]++;
+    self->bytes_sent += _message_size(msg);
+}
+
+/* The caller must hold the GIL. */
+void
+DBusPyMetrics_CountReceived(PyObject *metrics, DBusMessage *msg)
+{
+    Metrics *self = (Metrics *)metrics;
+
+    self->received[_message_type_index(msg)]++;
+    self->bytes_received += _message_size(msg);
+}
+
+/* The caller must hold the GIL. */
+void
+DBusPyMetrics_RecordDispatch(PyObject *metrics, dbus_bool_t object_path,
+                             double seconds)
+{
+    Metrics *self = (Metrics *)metrics;
+
+    _histogram_record(object_path ? self->object_paths : self->filters,
+                      seconds);
+}
+
+PyObject *
+DBusPyMetrics_New(void)
+{
+    Metrics *self = PyObject_New(Metrics, &MetricsType);
+
+    if (!self) return NULL;
+    memset(self->sent, 0, sizeof(self->sent));
+    memset(self->received, 0, sizeof(self->received));
+    self->bytes_sent = 0;
+    self->bytes_received = 0;
+    self->append = _histogram_new();
+    self->get_args = _histogram_new();
+    self->filters = _histogram_new();
+    self->object_paths = _histogram_new();
+    self->calls = PyDict_New();
+    if (!self->append || !self->get_args || !self->filters
+        || !self->object_paths || !self->calls) {
+        Py_DECREF(self);
+        return NULL;
+    }
+    return (PyObject *)self;
+}
+
+static void
+Metrics_tp_dealloc(Metrics *self)
+{
+    Py_XDECREF(self->append);
+    Py_XDECREF(self->get_args);
+    Py_XDECREF(self->filters);
+    Py_XDECREF(self->object_paths);
+    Py_XDECREF(self->calls);
+    PyObject_Del(self);
+}
+
+PyDoc_STRVAR(Metrics_record_append__doc__,
+"record_append(seconds: float)\n\n"
+"Record the time taken by a call to Message.append().\n");
+static PyObject *
+Metrics_record_append(Metrics *self, PyObject *arg)
+{
+    double seconds = PyFloat_AsDouble(arg);
+
+    if (seconds == -1.0 && PyErr_Occurred()) return NULL;
+    _histogram_record(self->append, seconds);
+    Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(Metrics_record_get_args__doc__,
+"record_get_args(seconds: float)\n\n"
+"Record the time taken by a call to Message.get_args_list().\n");
+static PyObject *
+Metrics_record_get_args(Metrics *self, PyObject *arg)
+{
+    double seconds = PyFloat_AsDouble(arg);
+
+    if (seconds == -1.0 && PyErr_Occurred()) return NULL;
+    _histogram_record(self->get_args, seconds);
+    Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(Metrics_record_call__doc__,
+"record_call(interface: str or None, member: str, seconds: float)\n\n"
+"Record the time between sending a method call and receiving its reply.\n");
+static PyObject *
+Metrics_record_call(Metrics *self, PyObject *args)
+{
+    PyObject *interface, *member, *key;
+    Histogram *histogram;
+    double seconds;
+
+    if (!PyArg_ParseTuple(args, "OOd:record_call", &interface, &member,
+                          &seconds)) return NULL;
+    key = PyTuple_Pack(2, interface, member);
+    if (!key) return NULL;
+    histogram = (Histogram *)PyDict_GetItem(self->calls, key);
+    if (!histogram) {
+        histogram = _histogram_new();
+        if (!histogram || PyDict_SetItem(self->calls, key,
+                                         (PyObject *)histogram) < 0) {
+            Py_XDECREF(histogram);
+            Py_DECREF(key);
+            return NULL;
+        }
+        /* the dict owns it now */
+        Py_DECREF(histogram);
+    }
+    Py_DECREF(key);
+    _histogram_record(histogram, seconds);
+    Py_RETURN_NONE;
+}
+
+PyDoc_STRVAR(Metrics_count_received__doc__,
+"count_received(message: dbus.lowlevel.Message)\n\n"
+"Count a message received other than through the filters (a reply).\n");
+static PyObject *
+Metrics_count_received(Metrics *self, PyObject *arg)
+{
+    DBusMessage *msg = DBusPyMessage_BorrowDBusMessage(arg);
+
+    if (!msg) return NULL;
+    DBusPyMetrics_CountReceived((PyObject *)self, msg);
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+_counters_by_type(unsigned long *counters)
+{
+    PyObject *ret = PyDict_New();
+    int i;
+
+    if (!ret) return NULL;
+    for (i = 1; i < N_MESSAGE_TYPES; i++) {
+        PyObject *value = PyLong_FromUnsignedLong(counters[i]);
+
+        if (!value || PyDict_SetItemString(ret, message_type_names[i],
+                                           value) < 0) {
+            Py_XDECREF(value);
+            Py_DECREF(ret);
+            return NULL;
+        }
+        Py_DECREF(value);
+    }
+    return ret;
+}
+
+PyDoc_STRVAR(Metrics_snapshot__doc__,
+"snapshot() -> dict\n\n"
+"Return a copy of the metrics: see\n"
+"`dbus.connection.Connection.get_metrics`.\n");
+static PyObject *
+Metrics_snapshot(Metrics *self, PyObject *unused UNUSED)
+{
+    PyObject *ret = NULL, *calls = NULL, *value = NULL;
+    PyObject *key, *histogram;
+    Py_ssize_t pos = 0;
+
+    calls = PyDict_New();
+    if (!calls) goto err;
+    while (PyDict_Next(self->calls, &pos, &key, &histogram)) {
+        value = _histogram_snapshot((Histogram *)histogram);
+        if (!value || PyDict_SetItem(calls, key, value) < 0) goto err;
+        Py_CLEAR(value);
+    }
+
+    ret = PyDict_New();
+    if (!ret) goto err;
+
+#define SET_ITEM(name, expr) \
+    do { \
+        value = (expr); \
+        if (!value || PyDict_SetItemString(ret, name, value) < 0) goto err; \
+        Py_CLEAR(value); \
+    } while (0)
+
+    SET_ITEM("sent", _counters_by_type(self->sent));
+    SET_ITEM("received", _counters_by_type(self->received));
+#ifdef HAVE_DBUS_MESSAGE_MARSHAL
+    SET_ITEM("bytes_sent", PyLong_FromUnsignedLongLong(self->bytes_sent));
+    SET_ITEM("bytes_received",
+             PyLong_FromUnsignedLongLong(self->bytes_received));
+#else
+    Py_INCREF(Py_None);
+    SET_ITEM("bytes_sent", Py_None);
+    Py_INCREF(Py_None);
+    SET_ITEM("bytes_received", Py_None);
+#endif
+    SET_ITEM("append", _histogram_snapshot(self->append));
+    SET_ITEM("get_args", _histogram_snapshot(self->get_args));
+    SET_ITEM("filter_dispatch", _histogram_snapshot(self->filters));
+    SET_ITEM("object_path_dispatch", _histogram_snapshot(self->object_paths));
+#undef SET_ITEM
+
+    if (PyDict_SetItemString(ret, "calls", calls) < 0) goto err;
+    Py_DECREF(calls);
+    return ret;
+
+err:
+    Py_XDECREF(value);
+    Py_XDECREF(calls);
+    Py_XDECREF(ret);
+    return NULL;
+}
+
+static PyMethodDef Metrics_tp_methods[] = {
+    {"record_append", (PyCFunction)Metrics_record_append, METH_O,
+     Metrics_record_append__doc__},
+    {"record_get_args", (PyCFunction)Metrics_record_get_args, METH_O,
+     Metrics_record_get_args__doc__},
+    {"record_call", (PyCFunction)Metrics_record_call, METH_VARARGS,
+     Metrics_record_call__doc__},
+    {"count_received", (PyCFunction)Metrics_count_received, METH_O,
+     Metrics_count_received__doc__},
+    {"snapshot", (PyCFunction)Metrics_snapshot, METH_NOARGS,
+     Metrics_snapshot__doc__},
+    {NULL, NULL, 0, NULL}
+};
+
+static PyTypeObject MetricsType = {
+    PyObject_HEAD_INIT(DEFERRED_ADDRESS(&PyType_Type))
+    0,
+    "_dbus_bindings._Metrics",
+    sizeof(Metrics),
+    0,
+    (destructor)Metrics_tp_dealloc,         /* tp_dealloc */
+    0,                                      /* tp_print */
+    0,                                      /* tp_getattr */
+    0,                                      /* tp_setattr */
+    0,                                      /* tp_compare */
+    0,                                      /* tp_repr */
+    0,                                      /* tp_as_number */
+    0,                                      /* tp_as_sequence */
+    0,                                      /* tp_as_mapping */
+    0,                                      /* tp_hash */
+    0,                                      /* tp_call */
+    0,                                      /* tp_str */
+    0,                                      /* tp_getattro */
+    0,                                      /* tp_setattro */
+    0,                                      /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,                     /* tp_flags */
+    Metrics_tp_doc,                         /* tp_doc */
+    0,                                      /* tp_traverse */
+    0,                                      /* tp_clear */
+    0,                                      /* tp_richcompare */
+    0,                                      /* tp_weaklistoffset */
+    0,                                      /* tp_iter */
+    0,                                      /* tp_iternext */
+    Metrics_tp_methods,                     /* tp_methods */
+    0,                                      /* tp_members */
+    0,                                      /* tp_getset */
+    0,                                      /* tp_base */
+    0,                                      /* tp_dict */
+    0,                                      /* tp_descr_get */
+    0,                                      /* tp_descr_set */
+    0,                                      /* tp_dictoffset */
+    0,                                      /* tp_init */
+    0,                                      /* tp_alloc */
+    /* deliberately not callable! Use Connection.set_metrics_enabled() */
+    0,                                      /* tp_new */
+    0,                                      /* tp_free */
+};
+
+dbus_bool_t
+dbus_py_init_metrics_types(void)
+{
+    if (PyType_Ready(&HistogramType) < 0) return 0;
+    if (PyType_Ready(&MetricsType) < 0) return 0;
+    return 1;
+}
+
+/* vim:set ft=c cino< sw=4 sts=4 et: */
@@ -60,6 +60,7 @@ static PyObject *
 validate_bus_name(PyObject *unused UNUSED, PyObject *args, PyObject *kwargs)
 {
     const char *name;
+    PyObject *name_obj = Py_None;
     int allow_unique = 1;
     int allow_well_known = 1;
     static char *argnames[] = { "name", "allow_unique", "allow_well_known",
@@ -71,9 +72,21 @@ validate_bus_name(PyObject *unused UNUSED, PyObject *args, PyObject *kwargs)
                                      &allow_well_known)) {
         return NULL;
     }
+    /* the name might have been passed by keyword, in which case it isn't
+     * cached */
+    if (PyTuple_GET_SIZE(args) > 0) {
+        name_obj = PyTuple_GET_ITEM(args, 0);
+    }
+    /* the cache holds names which are valid if both kinds are allowed */
+    if ((name[0] == ':' ? allow_unique : allow_well_known)
+        && dbus_py_validation_cache_contains(DBUS_PY_VALIDATED_BUS_NAME,
+                                             name_obj)) {
+        Py_RETURN_NONE;
+    }
     if (!dbus_py_validate_bus_name(name, !!allow_unique, !!allow_well_known)) {
         return NULL;
     }
+    dbus_py_validation_cache_add(DBUS_PY_VALIDATED_BUS_NAME, name_obj);
     Py_RETURN_NONE;
 }
 
@@ -94,9 +107,15 @@ validate_member_name(PyObject *unused UNUSED, PyObject *args)
     if (!PyArg_ParseTuple(args, "s:validate_member_name", &name)) {
         return NULL;
     }
+    if (dbus_py_validation_cache_contains(DBUS_PY_VALIDATED_MEMBER_NAME,
+                                          PyTuple_GET_ITEM(args, 0))) {
+        Py_RETURN_NONE;
+    }
     if (!dbus_py_validate_member_name(name)) {
         return NULL;
     }
+    dbus_py_validation_cache_add(DBUS_PY_VALIDATED_MEMBER_NAME,
+                                 PyTuple_GET_ITEM(args, 0));
     Py_RETURN_NONE;
 }
 
@@ -122,9 +141,15 @@ validate_interface_name(PyObject *unused UNUSED, PyObject *args)
     if (!PyArg_ParseTuple(args, "s:validate_interface_name", &name)) {
         return NULL;
     }
+    if (dbus_py_validation_cache_contains(DBUS_PY_VALIDATED_INTERFACE_NAME,
+                                          PyTuple_GET_ITEM(args, 0))) {
+        Py_RETURN_NONE;
+    }
     if (!dbus_py_validate_interface_name(name)) {
         return NULL;
     }
+    dbus_py_validation_cache_add(DBUS_PY_VALIDATED_INTERFACE_NAME,
+                                 PyTuple_GET_ITEM(args, 0));
     Py_RETURN_NONE;
 }
 
@@ -143,9 +168,15 @@ validate_object_path(PyObject *unused UNUSED, PyObject *args)
     if (!PyArg_ParseTuple(args, "s:validate_object_path", &name)) {
         return NULL;
     }
+    if (dbus_py_validation_cache_contains(DBUS_PY_VALIDATED_OBJECT_PATH,
+                                          PyTuple_GET_ITEM(args, 0))) {
+        Py_RETURN_NONE;
+    }
     if (!dbus_py_validate_object_path(name)) {
         return NULL;
     }
+    dbus_py_validation_cache_add(DBUS_PY_VALIDATED_OBJECT_PATH,
+                                 PyTuple_GET_ITEM(args, 0));
     Py_RETURN_NONE;
 }
 
@@ -257,6 +288,7 @@ init_dbus_bindings(void)
     }
 
     if (!dbus_py_init_generic()) return;
+    if (!dbus_py_init_validation()) return;
     if (!dbus_py_init_abstract()) return;
     if (!dbus_py_init_signature()) return;
     if (!dbus_py_init_int_types()) return;
@@ -264,8 +296,11 @@ init_dbus_bindings(void)
     if (!dbus_py_init_float_types()) return;
     if (!dbus_py_init_container_types()) return;
     if (!dbus_py_init_byte_types()) return;
+    if (!dbus_py_init_unixfd_type()) return;
     if (!dbus_py_init_message_types()) return;
     if (!dbus_py_init_pending_call()) return;
+    if (!dbus_py_init_metrics_types()) return;
+    if (!dbus_py_init_reply_plan_type()) return;
     if (!dbus_py_init_mainloop()) return;
     if (!dbus_py_init_libdbus_conn_types()) return;
     if (!dbus_py_init_conn_types()) return;
@@ -281,8 +316,10 @@ init_dbus_bindings(void)
     if (!dbus_py_insert_float_types(this_module)) return;
     if (!dbus_py_insert_container_types(this_module)) return;
     if (!dbus_py_insert_byte_types(this_module)) return;
+    if (!dbus_py_insert_unixfd_type(this_module)) return;
     if (!dbus_py_insert_message_types(this_module)) return;
     if (!dbus_py_insert_pending_call(this_module)) return;
+    if (!dbus_py_insert_reply_plan_type(this_module)) return;
     if (!dbus_py_insert_mainloop_types(this_module)) return;
     if (!dbus_py_insert_libdbus_conn_types(this_module)) return;
     if (!dbus_py_insert_conn_types(this_module)) return;
@@ -304,6 +341,10 @@ init_dbus_bindings(void)
                                    DBUS_INTERFACE_PEER) < 0) return;
     if (PyModule_AddStringConstant(this_module, "PROPERTIES_IFACE",
                                    DBUS_INTERFACE_PROPERTIES) < 0) return;
+    /* libdbus doesn't define a constant for this one */
+    if (PyModule_AddStringConstant(this_module, "OBJECT_MANAGER_IFACE",
+                                   "org.freedesktop.DBus.ObjectManager") < 0)
+        return;
     if (PyModule_AddStringConstant(this_module,
                 "DBUS_INTROSPECT_1_0_XML_PUBLIC_IDENTIFIER",
                 DBUS_INTROSPECT_1_0_XML_PUBLIC_IDENTIFIER) < 0) return;
@@ -360,6 +401,10 @@ init_dbus_bindings(void)
     ADD_CONST_PREFIXED(TYPE_STRING)
     ADD_CONST_PREFIXED(TYPE_OBJECT_PATH)
     ADD_CONST_PREFIXED(TYPE_SIGNATURE)
+#ifdef DBUS_TYPE_UNIX_FD
+    /* only present if Unix file descriptors can be marshalled */
+    ADD_CONST_PREFIXED(TYPE_UNIX_FD)
+#endif
     ADD_CONST_PREFIXED(TYPE_ARRAY)
     ADD_CONST_PREFIXED(TYPE_STRUCT)
     ADD_CONST_VAL("STRUCT_BEGIN", DBUS_STRUCT_BEGIN_CHAR)
@@ -41,6 +41,8 @@ static inline int PendingCall_Check (PyObject *o)
 typedef struct {
     PyObject_HEAD
     DBusPendingCall *pc;
+    /* libdbus doesn't remember whether a pending call was cancelled */
+    dbus_bool_t cancelled;
 } PendingCall;
 
 PyDoc_STRVAR(PendingCall_cancel__doc__,
@@ -50,12 +52,24 @@ PyDoc_STRVAR(PendingCall_cancel__doc__,
 static PyObject *
 PendingCall_cancel(PendingCall *self, PyObject *unused UNUSED)
 {
+    self->cancelled = TRUE;
     Py_BEGIN_ALLOW_THREADS
     dbus_pending_call_cancel(self->pc);
     Py_END_ALLOW_THREADS
     Py_RETURN_NONE;
 }
 
+PyDoc_STRVAR(PendingCall_get_cancelled__doc__,
+"get_cancelled() -> bool\n\n"
+"Return true if `cancel` has been called on this pending call.\n"
+"\n"
+":Since: 0.84.0\n");
+static PyObject *
+PendingCall_get_cancelled(PendingCall *self, PyObject *unused UNUSED)
+{
+    return PyBool_FromLong(self->cancelled);
+}
+
 PyDoc_STRVAR(PendingCall_block__doc__,
 "block()\n\n"
 "Block until this pending call has completed and the associated\n"
@@ -208,6 +222,7 @@ DBusPyPendingCall_ConsumeDBusPendingCall(DBusPendingCall *pc,
 
     Py_DECREF(list);
     self->pc = pc;
+    self->cancelled = FALSE;
     return (PyObject *)self;
 }
 
@@ -229,6 +244,8 @@ static PyMethodDef PendingCall_tp_methods[] = {
      PendingCall_cancel__doc__},
     {"get_completed", (PyCFunction)PendingCall_get_completed, METH_NOARGS,
      PendingCall_get_completed__doc__},
+    {"get_cancelled", (PyCFunction)PendingCall_get_cancelled, METH_NOARGS,
+     PendingCall_get_cancelled__doc__},
     {NULL, NULL, 0, NULL}
 };
 
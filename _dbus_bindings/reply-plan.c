@@ -0,0 +1,643 @@
+/* Decoding method replies into plain Python types, following a plan
+ * compiled in advance from the expected signature.
+ *
+ * Copyright (C) 2008 Collabora Ltd. <http://www.collabora.co.uk/>
+ *
+ * Permission is hereby granted, free of charge, to any person
+ * obtaining a copy of this software and associated documentation
+ * files (the "Software"), to deal in the Software without
+ * restriction, including without limitation the rights to use, copy,
+ * modify, merge, publish, distribute, sublicense, and/or sell copies
+ * of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be
+ * included in all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+ * EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+ * MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+ * NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+ * HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+ * WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+ * DEALINGS IN THE SOFTWARE.
+ */
+
+#define PY_SIZE_T_CLEAN 1
+
+#include <Python.h>
+
+#include "dbus_bindings-internal.h"
+#include "types-internal.h"
+
+/* A plan is the complete types of the signature, flattened in prefix
+ * order. Each node has the D-Bus type code (or one of the codes below for
+ * arrays which are decoded specially), and the index of the node after its
+ * subtree: an array's element type is the node after it, a dict's key and
+ * value types are the two nodes after it, and a struct's members are
+ * found by following the end indexes from the node after it.
+ *
+ * The decoder trusts the plan to match the message, so a message is only
+ * decoded if its signature is exactly the plan's. */
+
+#define PLAN_BYTE_ARRAY 'Y'     /* ay, decoded as a str */
+#define PLAN_FIXED_ARRAY 'F'    /* array of numbers or booleans */
+#define PLAN_DICT 'D'           /* a{...} */
+
+typedef struct {
+    int code;
+    int end;
+    /* for structs, the number of members; for fixed arrays, the element
+     * type code */
+    int extra;
+} PlanNode;
+
+typedef struct {
+    PyObject_HEAD
+    PyObject *signature;
+    PlanNode *nodes;
+} ReplyPlan;
+
+PyDoc_STRVAR(ReplyPlan_tp_doc,
+"A plan for decoding messages with a particular signature into plain\n"
+"Python types, rather than the dbus.types subclasses returned by\n"
+"`dbus.lowlevel.Message.get_args_list`:\n"
+"\n"
+"===================  ===================================================\n"
+"D-Bus                Python\n"
+"===================  ===================================================\n"
+"y, n, q, i, u, x, t  int (or long, if it doesn't fit in an int)\n"
+"b                    bool\n"
+"d                    float\n"
+"s, o, g              str (of UTF-8)\n"
+"ay                   str\n"
+"a{...}               dict\n"
+"a...                 list\n"
+"(...)                tuple\n"
+"v                    the contained value, decoded in the same way\n"
+"h                    dbus.UnixFd\n"
+"===================  ===================================================\n"
+"\n"
+"The signature is examined once, when the plan is made, so decoding\n"
+"doesn't need to look at the type of each value.\n"
+"\n"
+"Constructor::\n"
+"\n"
+"    _dbus_bindings._ReplyPlan(signature: str) -> _ReplyPlan\n"
+"\n"
+":Since: 0.84.0\n"
+);
+
+/* Compile the complete type at *sig into nodes[*n...], advancing *sig
+ * past it. The signature must already have been validated. Return 0 on
+ * success or -1 with an exception set. */
+static int
+_plan_compile(const char **sig, PlanNode *nodes, int *n)
+{
+    int index = (*n)++;
+    int code = *((*sig)++);
+
+    nodes[index].code = code;
+    nodes[index].extra = 0;
+
+    switch (code) {
+        case DBUS_TYPE_BYTE:
+        case DBUS_TYPE_BOOLEAN:
+        case DBUS_TYPE_INT16:
+        case DBUS_TYPE_UINT16:
+        case DBUS_TYPE_INT32:
+        case DBUS_TYPE_UINT32:
+        case DBUS_TYPE_INT64:
+        case DBUS_TYPE_UINT64:
+        case DBUS_TYPE_DOUBLE:
+        case DBUS_TYPE_STRING:
+        case DBUS_TYPE_OBJECT_PATH:
+        case DBUS_TYPE_SIGNATURE:
+        case DBUS_TYPE_VARIANT:
+#ifdef DBUS_TYPE_UNIX_FD
+        case DBUS_TYPE_UNIX_FD:
+#endif
+            break;
+
+        case DBUS_TYPE_ARRAY:
+            switch (**sig) {
+                case DBUS_TYPE_BYTE:
+                    nodes[index].code = PLAN_BYTE_ARRAY;
+                    (*sig)++;
+                    break;
+                case DBUS_TYPE_BOOLEAN:
+                case DBUS_TYPE_INT16:
+                case DBUS_TYPE_UINT16:
+                case DBUS_TYPE_INT32:
+                case DBUS_TYPE_UINT32:
+                case DBUS_TYPE_INT64:
+                case DBUS_TYPE_UINT64:
+                case DBUS_TYPE_DOUBLE:
+                    nodes[index].code = PLAN_FIXED_ARRAY;
+                    nodes[index].extra = *((*sig)++);
+                    break;
+                case DBUS_DICT_ENTRY_BEGIN_CHAR:
+                    nodes[index].code = PLAN_DICT;
+                    (*sig)++;
+                    if (_plan_compile(sig, nodes, n) < 0) return -1;
+                    if (_plan_compile(sig, nodes, n) < 0) return -1;
+                    (*sig)++;   /* '}' */
+                    break;
+                default:
+                    if (_plan_compile(sig, nodes, n) < 0) return -1;
+            }
+            break;
+
+        case DBUS_STRUCT_BEGIN_CHAR:
+            while (**sig != DBUS_STRUCT_END_CHAR) {
+                if (_plan_compile(sig, nodes, n) < 0) return -1;
+                nodes[index].extra++;
+            }
+            (*sig)++;
+            break;
+
+        default:
+            PyErr_Format(PyExc_ValueError, "Unable to decode type '%c'",
+                         code);
+            return -1;
+    }
+
+    nodes[index].end = *n;
+    return 0;
+}
+
+/* Return a PyMem_Malloc'd plan for the signature, or NULL with an
+ * exception set. */
+static PlanNode *
+_plan_new(const char *sig)
+{
+    PlanNode *nodes;
+    int n = 0;
+
+    /* there's at most one node per character */
+    nodes = PyMem_New(PlanNode, strlen(sig) + 1);
+    if (!nodes) {
+        PyErr_NoMemory();
+        return NULL;
+    }
+    while (*sig) {
+        if (_plan_compile(&sig, nodes, &n) < 0) {
+            PyMem_Free(nodes);
+            return NULL;
+        }
+    }
+    /* a terminator, so the top-level types can be found by following
+     * end indexes until it's reached */
+    nodes[n].code = DBUS_TYPE_INVALID;
+    nodes[n].end = n;
+    return nodes;
+}
+
+static PyObject *
+_plan_int64(PY_LONG_LONG value)
+{
+    if (value >= LONG_MIN && value <= LONG_MAX) {
+        return PyInt_FromLong((long)value);
+    }
+    return PyLong_FromLongLong(value);
+}
+
+static PyObject *
+_plan_uint64(unsigned PY_LONG_LONG value)
+{
+    if (value <= (unsigned PY_LONG_LONG)LONG_MAX) {
+        return PyInt_FromLong((long)value);
+    }
+    return PyLong_FromUnsignedLongLong(value);
+}
+
+static PyObject *_plan_decode_dynamic(DBusMessageIter *iter);
+
+static PyObject *
+_plan_decode_fixed_array(int code, DBusMessageIter *iter)
+{
+    DBusMessageIter sub;
+    const void *data;
+    int n, i;
+    PyObject *list, *item = NULL;
+
+    dbus_message_iter_recurse(iter, &sub);
+    dbus_message_iter_get_fixed_array(&sub, &data, &n);
+    list = PyList_New(n);
+    if (!list) return NULL;
+
+    for (i = 0; i < n; i++) {
+        switch (code) {
+            case DBUS_TYPE_BOOLEAN:
+                item = PyBool_FromLong(((const dbus_bool_t *)data)[i]);
+                break;
+            case DBUS_TYPE_INT16:
+                item = PyInt_FromLong(((const dbus_int16_t *)data)[i]);
+                break;
+            case DBUS_TYPE_UINT16:
+                item = PyInt_FromLong(((const dbus_uint16_t *)data)[i]);
+                break;
+            case DBUS_TYPE_INT32:
+                item = PyInt_FromLong(((const dbus_int32_t *)data)[i]);
+                break;
+            case DBUS_TYPE_UINT32:
+                item = _plan_uint64(((const dbus_uint32_t *)data)[i]);
+                break;
+#if defined(DBUS_HAVE_INT64) && defined(HAVE_LONG_LONG)
+            case DBUS_TYPE_INT64:
+                item = _plan_int64(((const dbus_int64_t *)data)[i]);
+                break;
+            case DBUS_TYPE_UINT64:
+                item = _plan_uint64(((const dbus_uint64_t *)data)[i]);
+                break;
+#endif
+            case DBUS_TYPE_DOUBLE:
+                item = PyFloat_FromDouble(((const double *)data)[i]);
+                break;
+            default:
+                PyErr_SetString(PyExc_NotImplementedError,
+                                "64-bit integer types are not supported on "
+                                "this platform");
+                item = NULL;
+        }
+        if (!item) {
+            Py_DECREF(list);
+            return NULL;
+        }
+        PyList_SET_ITEM(list, i, item);
+    }
+    return list;
+}
+
+/* Decode the value at iter according to nodes[index]. Returns a new
+ * reference, or NULL with an exception set. */
+static PyObject *
+_plan_decode(const PlanNode *nodes, int index, DBusMessageIter *iter)
+{
+    union {
+        const char *s;
+        unsigned char y;
+        dbus_bool_t b;
+        double d;
+        dbus_uint16_t u16;
+        dbus_int16_t i16;
+        dbus_uint32_t u32;
+        dbus_int32_t i32;
+#if defined(DBUS_HAVE_INT64) && defined(HAVE_LONG_LONG)
+        dbus_uint64_t u64;
+        dbus_int64_t i64;
+#endif
+        int fd;
+    } u;
+    DBusMessageIter sub;
+    PyObject *ret, *key, *value;
+    int i, n, child, status;
+
+    switch (nodes[index].code) {
+        case DBUS_TYPE_STRING:
+        case DBUS_TYPE_OBJECT_PATH:
+        case DBUS_TYPE_SIGNATURE:
+            dbus_message_iter_get_basic(iter, &u.s);
+            return PyString_FromString(u.s);
+
+        case DBUS_TYPE_BYTE:
+            dbus_message_iter_get_basic(iter, &u.y);
+            return PyInt_FromLong(u.y);
+
+        case DBUS_TYPE_BOOLEAN:
+            dbus_message_iter_get_basic(iter, &u.b);
+            return PyBool_FromLong(u.b);
+
+        case DBUS_TYPE_INT16:
+            dbus_message_iter_get_basic(iter, &u.i16);
+            return PyInt_FromLong(u.i16);
+
+        case DBUS_TYPE_UINT16:
+            dbus_message_iter_get_basic(iter, &u.u16);
+            return PyInt_FromLong(u.u16);
+
+        case DBUS_TYPE_INT32:
+            dbus_message_iter_get_basic(iter, &u.i32);
+            return PyInt_FromLong(u.i32);
+
+        case DBUS_TYPE_UINT32:
+            dbus_message_iter_get_basic(iter, &u.u32);
+            return _plan_uint64(u.u32);
+
+#if defined(DBUS_HAVE_INT64) && defined(HAVE_LONG_LONG)
+        case DBUS_TYPE_INT64:
+            dbus_message_iter_get_basic(iter, &u.i64);
+            return _plan_int64(u.i64);
+
+        case DBUS_TYPE_UINT64:
+            dbus_message_iter_get_basic(iter, &u.u64);
+            return _plan_uint64(u.u64);
+#else
+        case DBUS_TYPE_INT64:
+        case DBUS_TYPE_UINT64:
+            PyErr_SetString(PyExc_NotImplementedError,
+                            "64-bit integer types are not supported on "
+                            "this platform");
+            return NULL;
+#endif
+
+        case DBUS_TYPE_DOUBLE:
+            dbus_message_iter_get_basic(iter, &u.d);
+            return PyFloat_FromDouble(u.d);
+
+#ifdef DBUS_TYPE_UNIX_FD
+        case DBUS_TYPE_UNIX_FD:
+            /* libdbus returns a duplicate, which the UnixFd now owns */
+            dbus_message_iter_get_basic(iter, &u.fd);
+            if (u.fd < 0) {
+                PyErr_SetString(PyExc_OSError, "Unable to duplicate a file "
+                                "descriptor received via D-Bus");
+                return NULL;
+            }
+            return DBusPyUnixFd_New(u.fd, 0);
+#endif
+
+        case DBUS_TYPE_VARIANT:
+            dbus_message_iter_recurse(iter, &sub);
+            return _plan_decode_dynamic(&sub);
+
+        case PLAN_BYTE_ARRAY:
+            dbus_message_iter_recurse(iter, &sub);
+            dbus_message_iter_get_fixed_array(&sub, &u.s, &n);
+            return PyString_FromStringAndSize(u.s, (Py_ssize_t)n);
+
+        case PLAN_FIXED_ARRAY:
+            return _plan_decode_fixed_array(nodes[index].extra, iter);
+
+        case DBUS_TYPE_ARRAY:
+            ret = PyList_New(0);
+            if (!ret) return NULL;
+            dbus_message_iter_recurse(iter, &sub);
+            while (dbus_message_iter_get_arg_type(&sub)
+                   != DBUS_TYPE_INVALID) {
+                value = _plan_decode(nodes, index + 1, &sub);
+                if (!value) {
+                    Py_DECREF(ret);
+                    return NULL;
+                }
+                status = PyList_Append(ret, value);
+                Py_DECREF(value);
+                if (status < 0) {
+                    Py_DECREF(ret);
+                    return NULL;
+                }
+                dbus_message_iter_next(&sub);
+            }
+            return ret;
+
+        case PLAN_DICT:
+            ret = PyDict_New();
+            if (!ret) return NULL;
+            dbus_message_iter_recurse(iter, &sub);
+            while (dbus_message_iter_get_arg_type(&sub)
+                   == DBUS_TYPE_DICT_ENTRY) {
+                DBusMessageIter kv;
+
+                dbus_message_iter_recurse(&sub, &kv);
+                key = _plan_decode(nodes, index + 1, &kv);
+                if (!key) {
+                    Py_DECREF(ret);
+                    return NULL;
+                }
+                dbus_message_iter_next(&kv);
+                value = _plan_decode(nodes, nodes[index + 1].end, &kv);
+                if (!value) {
+                    Py_DECREF(key);
+                    Py_DECREF(ret);
+                    return NULL;
+                }
+                status = PyDict_SetItem(ret, key, value);
+                Py_DECREF(key);
+                Py_DECREF(value);
+                if (status < 0) {
+                    Py_DECREF(ret);
+                    return NULL;
+                }
+                dbus_message_iter_next(&sub);
+            }
+            return ret;
+
+        case DBUS_STRUCT_BEGIN_CHAR:
+            ret = PyTuple_New(nodes[index].extra);
+            if (!ret) return NULL;
+            dbus_message_iter_recurse(iter, &sub);
+            child = index + 1;
+            for (i = 0; i < nodes[index].extra; i++) {
+                value = _plan_decode(nodes, child, &sub);
+                if (!value) {
+                    Py_DECREF(ret);
+                    return NULL;
+                }
+                PyTuple_SET_ITEM(ret, i, value);
+                dbus_message_iter_next(&sub);
+                child = nodes[child].end;
+            }
+            return ret;
+    }
+
+    PyErr_Format(PyExc_TypeError, "Unknown type '\\%x' in D-Bus message",
+                 nodes[index].code);
+    return NULL;
+}
+
+/* Decode the contents of a variant, whose type isn't in the plan. */
+static PyObject *
+_plan_decode_dynamic(DBusMessageIter *iter)
+{
+    int type = dbus_message_iter_get_arg_type(iter);
+    char *sig;
+    PlanNode *nodes;
+    PyObject *ret;
+
+    if (type != DBUS_TYPE_ARRAY && type != DBUS_TYPE_STRUCT) {
+        /* the usual case, which needs no compiling */
+        PlanNode node;
+
+        node.code = type;
+        node.end = 1;
+        node.extra = 0;
+        return _plan_decode(&node, 0, iter);
+    }
+
+    sig = dbus_message_iter_get_signature(iter);
+    if (!sig) return PyErr_NoMemory();
+    nodes = _plan_new(sig);
+    dbus_free(sig);
+    if (!nodes) return NULL;
+    ret = _plan_decode(nodes, 0, iter);
+    PyMem_Free(nodes);
+    return ret;
+}
+
+static PyObject *
+ReplyPlan_tp_new(PyTypeObject *cls, PyObject *args, PyObject *kwargs)
+{
+    const char *sig;
+    ReplyPlan *self;
+    static char *argnames[] = {"signature", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "s:__new__", argnames,
+                                     &sig)) return NULL;
+    if (!dbus_signature_validate(sig, NULL)) {
+        PyErr_SetString(PyExc_ValueError, "Corrupt type signature");
+        return NULL;
+    }
+
+    self = (ReplyPlan *)cls->tp_alloc(cls, 0);
+    if (!self) return NULL;
+    self->nodes = _plan_new(sig);
+    if (!self->nodes) {
+        Py_DECREF(self);
+        return NULL;
+    }
+    self->signature = PyString_FromString(sig);
+    if (!self->signature) {
+        Py_DECREF(self);
+        return NULL;
+    }
+    return (PyObject *)self;
+}
+
+static void
+ReplyPlan_tp_dealloc(ReplyPlan *self)
+{
+    Py_XDECREF(self->signature);
+    if (self->nodes) PyMem_Free(self->nodes);
+    self->ob_type->tp_free((PyObject *)self);
+}
+
+static PyObject *
+ReplyPlan_tp_repr(ReplyPlan *self)
+{
+    return PyString_FromFormat("%s(%s)", self->ob_type->tp_name,
+                               PyString_AS_STRING(self->signature));
+}
+
+PyDoc_STRVAR(ReplyPlan_decode__doc__,
+"decode(message: dbus.lowlevel.Message) -> list or None\n\n"
+"Return the message's arguments as a list of plain Python objects, or\n"
+"None if the message's signature is not the plan's signature.\n");
+static PyObject *
+ReplyPlan_decode(ReplyPlan *self, PyObject *message)
+{
+    DBusMessage *msg = DBusPyMessage_BorrowDBusMessage(message);
+    DBusMessageIter iter;
+    const char *sig;
+    PyObject *list, *item;
+    int index;
+
+    if (!msg) return NULL;
+    sig = dbus_message_get_signature(msg);
+    if (!sig || strcmp(sig, PyString_AS_STRING(self->signature)) != 0) {
+        Py_RETURN_NONE;
+    }
+
+    list = PyList_New(0);
+    if (!list) return NULL;
+    if (!dbus_message_iter_init(msg, &iter)) {
+        /* no arguments */
+        return list;
+    }
+    for (index = 0; self->nodes[index].code != DBUS_TYPE_INVALID;
+         index = self->nodes[index].end) {
+        item = _plan_decode(self->nodes, index, &iter);
+        if (!item) {
+            Py_DECREF(list);
+            return NULL;
+        }
+        if (PyList_Append(list, item) < 0) {
+            Py_DECREF(item);
+            Py_DECREF(list);
+            return NULL;
+        }
+        Py_DECREF(item);
+        dbus_message_iter_next(&iter);
+    }
+    return list;
+}
+
+static PyMethodDef ReplyPlan_tp_methods[] = {
+    {"decode", (PyCFunction)ReplyPlan_decode, METH_O,
+     ReplyPlan_decode__doc__},
+    {NULL}
+};
+
+static PyObject *
+ReplyPlan_get_signature(ReplyPlan *self, void *closure UNUSED)
+{
+    Py_INCREF(self->signature);
+    return self->signature;
+}
+
+static PyGetSetDef ReplyPlan_tp_getset[] = {
+    {"signature", (getter)ReplyPlan_get_signature, NULL,
+     "The signature of the messages this plan decodes", NULL},
+    {NULL}
+};
+
+static PyTypeObject ReplyPlanType = {
+    PyObject_HEAD_INIT(DEFERRED_ADDRESS(&PyType_Type))
+    0,
+    "_dbus_bindings._ReplyPlan",
+    sizeof(ReplyPlan),
+    0,
+    (destructor)ReplyPlan_tp_dealloc,       /* tp_dealloc */
+    0,                                      /* tp_print */
+    0,                                      /* tp_getattr */
+    0,                                      /* tp_setattr */
+    0,                                      /* tp_compare */
+    (reprfunc)ReplyPlan_tp_repr,            /* tp_repr */
+    0,                                      /* tp_as_number */
+    0,                                      /* tp_as_sequence */
+    0,                                      /* tp_as_mapping */
+    0,                                      /* tp_hash */
+    0,                                      /* tp_call */
+    0,                                      /* tp_str */
+    0,                                      /* tp_getattro */
+    0,                                      /* tp_setattro */
+    0,                                      /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,                     /* tp_flags */
+    ReplyPlan_tp_doc,                       /* tp_doc */
+    0,                                      /* tp_traverse */
+    0,                                      /* tp_clear */
+    0,                                      /* tp_richcompare */
+    0,                                      /* tp_weaklistoffset */
+    0,                                      /* tp_iter */
+    0,                                      /* tp_iternext */
+    ReplyPlan_tp_methods,                   /* tp_methods */
+    0,                                      /* tp_members */
+    ReplyPlan_tp_getset,                    /* tp_getset */
+    0,                                      /* tp_base */
+    0,                                      /* tp_dict */
+    0,                                      /* tp_descr_get */
+    0,                                      /* tp_descr_set */
+    0,                                      /* tp_dictoffset */
+    0,                                      /* tp_init */
+    0,                                      /* tp_alloc */
+    ReplyPlan_tp_new,                       /* tp_new */
+    0,                                      /* tp_free */
+};
+
+dbus_bool_t
+dbus_py_init_reply_plan_type(void)
+{
+    if (PyType_Ready(&ReplyPlanType) < 0) return 0;
+    return 1;
+}
+
+dbus_bool_t
+dbus_py_insert_reply_plan_type(PyObject *this_module)
+{
+    Py_INCREF(&ReplyPlanType);
+    if (PyModule_AddObject(this_module, "_ReplyPlan",
+                           (PyObject *)&ReplyPlanType) < 0) return 0;
+    return 1;
+}
+
+/* vim:set ft=c cino< sw=4 sts=4 et: */
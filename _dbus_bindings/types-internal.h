@@ -58,6 +58,15 @@ typedef struct {
 extern PyTypeObject DBusPyStrBase_Type;
 DEFINE_CHECK(DBusPyStrBase)
 
+typedef struct {
+    PyObject_HEAD
+    int fd;
+    long variant_level;
+} DBusPyUnixFd;
+
+PyObject *DBusPyUnixFd_New(int fd, long variant_level);
+int dbus_py_unix_fd_from_pyobject(PyObject *obj);
+
 dbus_int16_t dbus_py_int16_range_check(PyObject *);
 dbus_uint16_t dbus_py_uint16_range_check(PyObject *);
 dbus_int32_t dbus_py_int32_range_check(PyObject *);
@@ -0,0 +1,290 @@
+/* Simple D-Bus types: Unix file descriptors.
+ *
+ * Copyright (C) 2008 Collabora Ltd. <http://www.collabora.co.uk/>
+ *
+ * Permission is hereby granted, free of charge, to any person
+ * obtaining a copy of this software and associated documentation
+ * files (the "Software"), to deal in the Software without
+ * restriction, including without limitation the rights to use, copy,
+ * modify, merge, publish, distribute, sublicense, and/or sell copies
+ * of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be
+ * included in all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+ * EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+ * MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+ * NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+ * HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+ * WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+ * DEALINGS IN THE SOFTWARE.
+ */
+
+#include <Python.h>
+#include <structmember.h>
+
+#include <errno.h>
+#include <unistd.h>
+
+#include "dbus_bindings-internal.h"
+#include "types-internal.h"
+
+PyDoc_STRVAR(UnixFd_tp_doc,
+"A Unix file descriptor, to be passed to or received from another process\n"
+"(D-Bus signature 'h').\n"
+"\n"
+"A UnixFd owns a duplicate of the file descriptor it was constructed\n"
+"from, which is closed when the UnixFd is closed or deallocated, so the\n"
+"original can be closed as soon as the UnixFd has been made. File\n"
+"descriptors received in messages are UnixFd objects owning a new\n"
+"file descriptor; call `take` to take over responsibility for closing it.\n"
+"\n"
+"File descriptors can only be sent on connections where\n"
+"``conn.can_send_type('h')`` is true: both ends must support it (which\n"
+"requires a Unix socket transport), and libdbus must be version 1.3.1\n"
+"or later.\n"
+"\n"
+"Constructor::\n"
+"\n"
+"    dbus.types.UnixFd(value: int or file-like object[, variant_level: int])\n"
+"      -> UnixFd\n"
+"\n"
+"``value`` is a file descriptor, or an object with a ``fileno()`` method\n"
+"returning one.\n"
+"\n"
+"``variant_level`` must be non-negative; the default is 0.\n"
+"\n"
+":IVariables:\n"
+"  `variant_level` : int\n"
+"    Indicates how many nested Variant containers this object\n"
+"    is contained in: if a message's wire format has a variant containing a\n"
+"    variant containing a file descriptor, this is represented in Python by\n"
+"    a UnixFd with variant_level==2.\n"
+":Since: 0.84.0\n"
+);
+
+/* Return a file descriptor number from an int, long or an object with
+ * a fileno() method, or -1 with an exception set. */
+int
+dbus_py_unix_fd_from_pyobject(PyObject *obj)
+{
+    PyObject *fileno = NULL;
+    long fd;
+
+    if (DBusPyUnixFd_Check(obj)) {
+        fd = ((DBusPyUnixFd *)obj)->fd;
+        if (fd < 0) {
+            PyErr_SetString(PyExc_ValueError, "The UnixFd has been closed "
+                            "or taken");
+            return -1;
+        }
+        return (int)fd;
+    }
+
+    if (!PyInt_Check(obj) && !PyLong_Check(obj)) {
+        if (!PyObject_HasAttrString(obj, "fileno")) {
+            PyErr_SetString(PyExc_TypeError, "Expected a file descriptor "
+                            "or an object with a fileno() method");
+            return -1;
+        }
+        fileno = PyObject_CallMethod(obj, "fileno", NULL);
+        if (!fileno) return -1;
+        obj = fileno;
+    }
+    fd = PyInt_AsLong(obj);
+    Py_XDECREF(fileno);
+    if (fd == -1 && PyErr_Occurred()) return -1;
+    if (fd < 0 || fd > INT_MAX) {
+        PyErr_Format(PyExc_ValueError, "%ld is not a valid file descriptor",
+                     fd);
+        return -1;
+    }
+    return (int)fd;
+}
+
+/* Steal the given file descriptor, which will be closed when the UnixFd
+ * is closed or deallocated. If this fails, the file descriptor is closed
+ * immediately. */
+PyObject *
+DBusPyUnixFd_New(int fd, long variant_level)
+{
+    DBusPyUnixFd *self = PyObject_New(DBusPyUnixFd, &DBusPyUnixFd_Type);
+
+    if (!self) {
+        close(fd);
+        return NULL;
+    }
+    self->fd = fd;
+    self->variant_level = variant_level;
+    return (PyObject *)self;
+}
+
+static PyObject *
+UnixFd_tp_new(PyTypeObject *cls UNUSED, PyObject *args, PyObject *kwargs)
+{
+    PyObject *value;
+    long variant_level = 0;
+    int fd;
+    static char *argnames[] = {"value", "variant_level", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O|l:__new__", argnames,
+                                     &value, &variant_level)) return NULL;
+    if (variant_level < 0) {
+        PyErr_SetString(PyExc_ValueError,
+                        "variant_level must be non-negative");
+        return NULL;
+    }
+
+    fd = dbus_py_unix_fd_from_pyobject(value);
+    if (fd < 0) return NULL;
+
+    fd = dup(fd);
+    if (fd < 0) return PyErr_SetFromErrno(PyExc_OSError);
+
+    return DBusPyUnixFd_New(fd, variant_level);
+}
+
+static void
+UnixFd_tp_dealloc(DBusPyUnixFd *self)
+{
+    if (self->fd >= 0) {
+        close(self->fd);
+    }
+    PyObject_Del(self);
+}
+
+static PyObject *
+UnixFd_tp_repr(DBusPyUnixFd *self)
+{
+    if (self->variant_level > 0) {
+        return PyString_FromFormat("%s(%d, variant_level=%ld)",
+                                   self->ob_type->tp_name, self->fd,
+                                   self->variant_level);
+    }
+    return PyString_FromFormat("%s(%d)", self->ob_type->tp_name, self->fd);
+}
+
+PyDoc_STRVAR(UnixFd_fileno__doc__,
+"fileno() -> int\n\n"
+"Return the file descriptor, which remains owned by this object.\n");
+static PyObject *
+UnixFd_fileno(DBusPyUnixFd *self, PyObject *unused UNUSED)
+{
+    if (self->fd < 0) {
+        PyErr_SetString(PyExc_ValueError, "The UnixFd has been closed "
+                        "or taken");
+        return NULL;
+    }
+    return PyInt_FromLong(self->fd);
+}
+
+PyDoc_STRVAR(UnixFd_take__doc__,
+"take() -> int\n\n"
+"Return the file descriptor. The caller becomes responsible for closing\n"
+"it, and this object can no longer be used.\n");
+static PyObject *
+UnixFd_take(DBusPyUnixFd *self, PyObject *unused UNUSED)
+{
+    PyObject *ret = UnixFd_fileno(self, NULL);
+
+    if (ret) {
+        self->fd = -1;
+    }
+    return ret;
+}
+
+PyDoc_STRVAR(UnixFd_close__doc__,
+"close()\n\n"
+"Close the file descriptor, if this object still owns it.\n");
+static PyObject *
+UnixFd_close(DBusPyUnixFd *self, PyObject *unused UNUSED)
+{
+    int fd = self->fd;
+
+    if (fd >= 0) {
+        self->fd = -1;
+        if (close(fd) < 0) return PyErr_SetFromErrno(PyExc_OSError);
+    }
+    Py_RETURN_NONE;
+}
+
+static PyMethodDef UnixFd_tp_methods[] = {
+    {"fileno", (PyCFunction)UnixFd_fileno, METH_NOARGS,
+     UnixFd_fileno__doc__},
+    {"take", (PyCFunction)UnixFd_take, METH_NOARGS, UnixFd_take__doc__},
+    {"close", (PyCFunction)UnixFd_close, METH_NOARGS, UnixFd_close__doc__},
+    {NULL}
+};
+
+static PyMemberDef UnixFd_tp_members[] = {
+    {"variant_level", T_LONG, offsetof(DBusPyUnixFd, variant_level),
+     READONLY,
+     "The number of nested variants wrapping the real data. "
+     "0 if not in a variant"},
+    {NULL},
+};
+
+PyTypeObject DBusPyUnixFd_Type = {
+    PyObject_HEAD_INIT(DEFERRED_ADDRESS(&PyType_Type))
+    0,
+    "dbus.UnixFd",
+    sizeof(DBusPyUnixFd),
+    0,
+    (destructor)UnixFd_tp_dealloc,          /* tp_dealloc */
+    0,                                      /* tp_print */
+    0,                                      /* tp_getattr */
+    0,                                      /* tp_setattr */
+    0,                                      /* tp_compare */
+    (reprfunc)UnixFd_tp_repr,               /* tp_repr */
+    0,                                      /* tp_as_number */
+    0,                                      /* tp_as_sequence */
+    0,                                      /* tp_as_mapping */
+    0,                                      /* tp_hash */
+    0,                                      /* tp_call */
+    0,                                      /* tp_str */
+    0,                                      /* tp_getattro */
+    dbus_py_immutable_setattro,             /* tp_setattro */
+    0,                                      /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,                     /* tp_flags */
+    UnixFd_tp_doc,                          /* tp_doc */
+    0,                                      /* tp_traverse */
+    0,                                      /* tp_clear */
+    0,                                      /* tp_richcompare */
+    0,                                      /* tp_weaklistoffset */
+    0,                                      /* tp_iter */
+    0,                                      /* tp_iternext */
+    UnixFd_tp_methods,                      /* tp_methods */
+    UnixFd_tp_members,                      /* tp_members */
+    0,                                      /* tp_getset */
+    0,                                      /* tp_base */
+    0,                                      /* tp_dict */
+    0,                                      /* tp_descr_get */
+    0,                                      /* tp_descr_set */
+    0,                                      /* tp_dictoffset */
+    0,                                      /* tp_init */
+    0,                                      /* tp_alloc */
+    UnixFd_tp_new,                          /* tp_new */
+    0,                                      /* tp_free */
+};
+
+dbus_bool_t
+dbus_py_init_unixfd_type(void)
+{
+    if (PyType_Ready(&DBusPyUnixFd_Type) < 0) return 0;
+    DBusPyUnixFd_Type.tp_print = NULL;
+    return 1;
+}
+
+dbus_bool_t
+dbus_py_insert_unixfd_type(PyObject *this_module)
+{
+    Py_INCREF(&DBusPyUnixFd_Type);
+    if (PyModule_AddObject(this_module, "UnixFd",
+                           (PyObject *)&DBusPyUnixFd_Type) < 0) return 0;
+    return 1;
+}
+
+/* vim:set ft=c cino< sw=4 sts=4 et: */
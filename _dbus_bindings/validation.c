@@ -242,4 +242,78 @@ dbus_py_validate_object_path(const char *path)
     return TRUE;
 }
 
+/* Strings which are known to be valid ============================= */
+
+/* Python code (proxies, proxy methods, signal matches) validates the same
+ * few hundred names over and over again. For each kind of name, a dict used
+ * as a set remembers the str objects which have already passed validation,
+ * so validating them again costs one lookup with the str's cached hash.
+ * A set is emptied when it reaches VALIDATION_CACHE_MAX_SIZE entries, so
+ * programs which validate an unbounded number of distinct names (e.g.
+ * object paths) can't make it grow without limit.
+ */
+#define VALIDATION_CACHE_MAX_SIZE 1024
+
+static PyObject *validated[DBUS_PY_N_VALIDATED];
+
+/* Return TRUE if name is a str which has already passed the given kind
+ * of validation. Never raises an exception. */
+dbus_bool_t
+dbus_py_validation_cache_contains(DBusPyValidatedKind kind, PyObject *name)
+{
+    if (!PyString_Check(name) || !validated[kind]) {
+        return FALSE;
+    }
+    /* PyDict_GetItem suppresses any exception */
+    return (PyDict_GetItem(validated[kind], name) != NULL);
+}
+
+/* Remember that name, which must have passed the given kind of validation,
+ * is valid. Only instances of str (or a subclass) are remembered. Never
+ * raises an exception. */
+void
+dbus_py_validation_cache_add(DBusPyValidatedKind kind, PyObject *name)
+{
+    PyObject *cache = validated[kind];
+    PyObject *key;
+
+    if (!PyString_Check(name) || !cache) {
+        return;
+    }
+
+    if (PyString_CheckExact(name)) {
+        Py_INCREF(name);
+        key = name;
+    }
+    else {
+        /* don't keep subclass instances (ObjectPath etc.) alive */
+        key = PyString_FromStringAndSize(PyString_AS_STRING(name),
+                                         PyString_GET_SIZE(name));
+        if (!key) {
+            PyErr_Clear();
+            return;
+        }
+    }
+
+    if (PyDict_Size(cache) >= VALIDATION_CACHE_MAX_SIZE) {
+        PyDict_Clear(cache);
+    }
+    if (PyDict_SetItem(cache, key, Py_None) < 0) {
+        PyErr_Clear();
+    }
+    Py_DECREF(key);
+}
+
+dbus_bool_t
+dbus_py_init_validation(void)
+{
+    int i;
+
+    for (i = 0; i < DBUS_PY_N_VALIDATED; i++) {
+        validated[i] = PyDict_New();
+        if (!validated[i]) return FALSE;
+    }
+    return TRUE;
+}
+
 /* vim:set ft=c cino< sw=4 sts=4 et: */
@@ -52,17 +52,20 @@ __all__ = (
 
            'BUS_DAEMON_NAME', 'BUS_DAEMON_PATH', 'BUS_DAEMON_IFACE',
            'LOCAL_PATH', 'LOCAL_IFACE', 'PEER_IFACE',
-           'INTROSPECTABLE_IFACE', 'PROPERTIES_IFACE',
+           'INTROSPECTABLE_IFACE', 'PROPERTIES_IFACE', 'OBJECT_MANAGER_IFACE',
 
            'ObjectPath', 'ByteArray', 'Signature', 'Byte', 'Boolean',
            'Int16', 'UInt16', 'Int32', 'UInt32', 'Int64', 'UInt64',
            'Double', 'String', 'Array', 'Struct', 'Dictionary', 'UTF8String',
+           'UnixFd',
 
            # from exceptions
            'DBusException',
            'MissingErrorHandlerException', 'MissingReplyHandlerException',
            'ValidationException', 'IntrospectionParserException',
            'UnknownMethodException', 'NameExistsException',
+           'UnknownPropertyException', 'ReadOnlyPropertyException',
+           'UnknownObjectException', 'InvalidArgsException',
 
            # submodules
            'service', 'mainloop', 'lowlevel'
@@ -84,7 +87,8 @@ from _dbus_bindings import get_default_main_loop, set_default_main_loop,\
                            validate_error_name
 from _dbus_bindings import BUS_DAEMON_NAME, BUS_DAEMON_PATH, BUS_DAEMON_IFACE,\
                            LOCAL_PATH, LOCAL_IFACE, PEER_IFACE,\
-                           INTROSPECTABLE_IFACE, PROPERTIES_IFACE
+                           INTROSPECTABLE_IFACE, PROPERTIES_IFACE,\
+                           OBJECT_MANAGER_IFACE
 
 from dbus.exceptions import MissingErrorHandlerException, \
                             MissingReplyHandlerException, \
@@ -92,11 +96,15 @@ from dbus.exceptions import MissingErrorHandlerException, \
                             IntrospectionParserException, \
                             UnknownMethodException, \
                             NameExistsException, \
+                            UnknownPropertyException, \
+                            ReadOnlyPropertyException, \
+                            UnknownObjectException, \
+                            InvalidArgsException, \
                             DBusException
 from _dbus_bindings import ObjectPath, ByteArray, Signature, Byte, Boolean,\
                            Int16, UInt16, Int32, UInt32, Int64, UInt64,\
                            Double, String, Array, Struct, Dictionary, \
-                           UTF8String
+                           UTF8String, UnixFd
 from dbus._dbus import Bus, SystemBus, SessionBus, StarterBus
 from dbus.proxies import Interface
 
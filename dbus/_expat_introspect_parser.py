@@ -26,60 +26,170 @@
 from xml.parsers.expat import ExpatError, ParserCreate
 from dbus.exceptions import IntrospectionParserException
 
+
+class _Interface(object):
+    """The members of an interface, as described by introspection data.
+    The dicts must not be modified, since they may be shared.
+    """
+    __slots__ = ('name', 'methods', 'signals', 'properties')
+
+    def __init__(self, name):
+        self.name = name
+        #: Map from method name to (in-signature, out-signature)
+        self.methods = {}
+        #: Map from signal name to signature
+        self.signals = {}
+        #: Map from property name to (type, access)
+        self.properties = {}
+
+
+class _Introspection(object):
+    """The result of parsing introspection data. All the names and
+    signatures are interned strings, and the dicts must not be modified,
+    since the same object is returned for identical introspection data.
+    """
+    __slots__ = ('interfaces', 'children', 'method_map', 'reply_map')
+
+    def __init__(self, interfaces, children, method_map, reply_map):
+        #: Map from interface name to `_Interface`
+        self.interfaces = interfaces
+        #: Tuple of the names of the child nodes, relative to this one
+        self.children = children
+        #: Map from ``interface.method`` to in-signature, as returned by
+        #: `process_introspection_data`
+        self.method_map = method_map
+        #: Map from ``interface.method`` to out-signature
+        self.reply_map = reply_map
+
+
 class _Parser(object):
-    __slots__ = ('map', 'in_iface', 'in_method', 'sig')
+    __slots__ = ('interfaces', 'children', 'method_map', 'reply_map',
+                 'depth', 'iface', 'kind', 'member', 'in_args', 'out_args')
+
     def __init__(self):
-        self.map = {}
-        self.in_iface = ''
-        self.in_method = ''
-        self.sig = ''
+        self.interfaces = {}
+        self.children = []
+        self.method_map = {}
+        self.reply_map = {}
+        # number of <node> elements we're in: we only describe the
+        # outermost node, and just record the names of its children
+        self.depth = 0
+        self.iface = None
+        # 'method' or 'signal' while in one of those, else None
+        self.kind = None
+        self.member = None
+        self.in_args = None
+        self.out_args = None
 
     def parse(self, data):
         parser = ParserCreate('UTF-8', ' ')
-        parser.buffer_text = True
+        # the names and signatures are ASCII, and str is faster to make,
+        # compare and intern than unicode
+        parser.returns_unicode = False
         parser.StartElementHandler = self.StartElementHandler
         parser.EndElementHandler = self.EndElementHandler
-        parser.Parse(data)
-        return self.map
+        parser.Parse(data, True)
+        return _Introspection(self.interfaces, tuple(self.children),
+                              self.method_map, self.reply_map)
 
     def StartElementHandler(self, name, attributes):
-        if not self.in_iface:
-            if (not self.in_method and name == 'interface'):
-                self.in_iface = attributes['name']
-        else:
-            if (not self.in_method and name == 'method'):
-                self.in_method = attributes['name']
-            elif (self.in_method and name == 'arg'):
-                if attributes.get('direction', 'in') == 'in':
-                    self.sig += attributes['type']
+        if name == 'node':
+            self.depth += 1
+            if self.depth == 2 and 'name' in attributes:
+                self.children.append(intern(attributes['name']))
+        elif self.depth > 1:
+            return
+        elif self.iface is None:
+            if name == 'interface':
+                self.iface = _Interface(intern(attributes['name']))
+        elif self.kind is None:
+            if name == 'method' or name == 'signal':
+                self.kind = name
+                self.member = intern(attributes['name'])
+                self.in_args = []
+                self.out_args = []
+            elif name == 'property':
+                self.iface.properties[intern(attributes['name'])] = (
+                        intern(attributes['type']),
+                        intern(attributes.get('access', 'readwrite')))
+        elif name == 'arg':
+            if (self.kind == 'signal'
+                or attributes.get('direction', 'in') == 'in'):
+                self.in_args.append(attributes['type'])
+            else:
+                self.out_args.append(attributes['type'])
 
     def EndElementHandler(self, name):
-        if self.in_iface:
-            if (not self.in_method and name == 'interface'):
-                self.in_iface = ''
-            elif (self.in_method and name == 'method'):
-                self.map[self.in_iface + '.' + self.in_method] = self.sig
-                self.in_method = ''
-                self.sig = ''
+        if name == 'node':
+            self.depth -= 1
+        elif self.depth > 1 or self.iface is None:
+            return
+        elif name == self.kind:
+            iface = self.iface
+            in_sig = intern(''.join(self.in_args))
+            if name == 'method':
+                out_sig = intern(''.join(self.out_args))
+                iface.methods[self.member] = (in_sig, out_sig)
+                key = iface.name + '.' + self.member
+                self.method_map[key] = in_sig
+                self.reply_map[key] = out_sig
+            else:
+                iface.signals[self.member] = in_sig
+            self.kind = self.member = self.in_args = self.out_args = None
+        elif name == 'interface' and self.kind is None:
+            self.interfaces[self.iface.name] = self.iface
+            self.iface = None
+
+
+def _parse_introspection_data(data):
+    try:
+        return _Parser().parse(data)
+    except Exception, e:
+        raise IntrospectionParserException('%s: %s' % (e.__class__, e))
+
+
+# Objects of the same class usually have identical introspection data, so
+# remember the results for the most recent documents
+_CACHE_SIZE = 32
+_cache = {}
+
+
+def parse_introspection_data(data):
+    """Return an `_Introspection` describing the methods, signals and
+    properties of each interface, and the child nodes, in the given
+    introspection XML (an 8-bit string of UTF-8). Child nodes' own
+    interfaces, if included, are ignored.
+
+    The result may be shared with other callers parsing the same data, so
+    it must not be modified.
+
+    :Raises IntrospectionParserException: if the data can't be parsed
+    """
+    info = _cache.get(data)
+    if info is None:
+        info = _parse_introspection_data(data)
+        if len(_cache) >= _CACHE_SIZE:
+            _cache.clear()
+        _cache[data] = info
+    return info
+
 
 def process_introspection_data(data):
     """Return a dict mapping ``interface.method`` strings to the
-    concatenation of all their 'in' parameters, and mapping
-    ``interface.signal`` strings to the concatenation of all their
-    parameters.
+    concatenation of all their 'in' parameters.
 
     Example output::
 
         {
-            'com.example.SignalEmitter.OneString': 's',
             'com.example.MethodImplementor.OneInt32Argument': 'i',
+            'com.example.MethodImplementor.TwoStrings': 'ss',
         }
 
+    The dict may be shared with other callers parsing the same data, so it
+    must not be modified.
+
     :Parameters:
         `data` : str
             The introspection XML. Must be an 8-bit string of UTF-8.
     """
-    try:
-        return _Parser().parse(data)
-    except Exception, e:
-        raise IntrospectionParserException('%s: %s' % (e.__class__, e))
+    return parse_introspection_data(data).method_map
@@ -0,0 +1,106 @@
+# Copyright (C) 2008 Collabora Ltd. <http://www.collabora.co.uk/>
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use, copy,
+# modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+"""A least-recently-used cache, shared by the proxies' property caches
+and `dbus.service.VirtualSubtree`.
+"""
+
+__docformat__ = 'restructuredtext'
+
+
+class LRUCache(object):
+    """A mapping holding at most `size` items, which discards the least
+    recently used item when another is added.
+    """
+    __slots__ = ('_size', '_map', '_head')
+
+    def __init__(self, size):
+        self._size = size
+        #: Map from key to link
+        self._map = {}
+        #: Sentinel of a circular doubly-linked list of links
+        #: [previous link, next link, key, value], most recently used first
+        self._head = head = []
+        head[:] = [head, head, None, None]
+
+    def __len__(self):
+        return len(self._map)
+
+    def __contains__(self, key):
+        return key in self._map
+
+    def _unlink(self, link):
+        link[0][1] = link[1]
+        link[1][0] = link[0]
+
+    def _push(self, link):
+        head = self._head
+        link[0] = head
+        link[1] = head[1]
+        head[1][0] = link
+        head[1] = link
+
+    def get(self, key, default=None):
+        link = self._map.get(key)
+        if link is None:
+            return default
+        if self._head[1] is not link:
+            self._unlink(link)
+            self._push(link)
+        return link[3]
+
+    def __setitem__(self, key, value):
+        link = self._map.get(key)
+        if link is not None:
+            self._unlink(link)
+            link[3] = value
+        else:
+            link = self._map[key] = [None, None, key, value]
+        self._push(link)
+
+        while len(self._map) > self._size:
+            last = self._head[0]
+            self._unlink(last)
+            del self._map[last[2]]
+
+    def pop(self, key, default=None):
+        link = self._map.pop(key, None)
+        if link is None:
+            return default
+        self._unlink(link)
+        return link[3]
+
+    def clear(self):
+        self._map.clear()
+        head = self._head
+        head[:] = [head, head, None, None]
+
+    def peek(self, key, default=None):
+        """Return the value for `key` without marking it as used."""
+        link = self._map.get(key)
+        if link is None:
+            return default
+        return link[3]
+
+    def keys(self):
+        return self._map.keys()
@@ -20,11 +20,20 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
-__all__ = ('BusConnection',)
+__all__ = ('BusConnection', 'BusConnectionPool')
 __docformat__ = 'reStructuredText'
 
+import itertools
 import logging
 import weakref
+try:
+    import thread
+except ImportError:
+    import dummy_thread as thread
+try:
+    from threading import Condition, local
+except ImportError:
+    from dummy_threading import Condition, local
 
 from _dbus_bindings import validate_interface_name, validate_member_name,\
                            validate_bus_name, validate_object_path,\
@@ -187,7 +196,8 @@ class BusConnection(Connection):
             return bus_name
 
     def get_object(self, bus_name, object_path, introspect=True,
-                   follow_name_owner_changes=False, **kwargs):
+                   follow_name_owner_changes=False, cache_properties=False,
+                   **kwargs):
         """Return a local proxy for the given remote object.
 
         Method calls on the proxy are translated into method calls on the
@@ -217,6 +227,10 @@ class BusConnection(Connection):
 
                 If the given object path is a unique name, this parameter
                 has no effect.
+            `cache_properties` : bool
+                If true (default is false), the proxy keeps a local cache of
+                the remote object's properties; see
+                `dbus.proxies.ProxyObject.get_cached_property`.
 
         :Returns: a `dbus.proxies.ProxyObject`
         :Raises `DBusException`: if resolving the well-known name to a
@@ -241,7 +255,8 @@ class BusConnection(Connection):
 
         return self.ProxyObjectClass(self, bus_name, object_path,
                                      introspect=introspect,
-                                     follow_name_owner_changes=follow_name_owner_changes)
+                                     follow_name_owner_changes=follow_name_owner_changes,
+                                     cache_properties=cache_properties)
 
     def get_unix_user(self, bus_name):
         """Get the numeric uid of the process owning the given bus name.
@@ -437,3 +452,157 @@ class BusConnection(Connection):
         self.call_async(BUS_DAEMON_NAME, BUS_DAEMON_PATH,
                         BUS_DAEMON_IFACE, 'RemoveMatch', 's', (rule,),
                         None, None)
+
+
+class BusConnectionPool(object):
+    """A fixed-size pool of private connections to the same bus.
+
+    A single connection serializes blocking calls made from several
+    threads, both on libdbus' connection lock and on its socket. A pool
+    gives each concurrent caller its own connection, so one slow reply
+    does not hold up the others.
+
+    Connections can be leased for a single call (`call_blocking`), for
+    as long as the caller likes (`acquire` and `release`), or for the
+    lifetime of a thread (`get_thread_connection`, used by `get_object`).
+
+    :Since: 0.84.0
+    """
+
+    def __init__(self, address_or_type=BusConnection.TYPE_SESSION, size=4,
+                 mainloop=None, connection_class=BusConnection):
+        """Constructor. Connects all the pool's connections immediately.
+
+        :Parameters:
+            `address_or_type` : str or int
+                The bus address, or one of the `BusConnection.TYPE_*`
+                constants, as for the `BusConnection` constructor.
+            `size` : int
+                The number of private connections to make.
+            `mainloop` : dbus.mainloop.NativeMainLoop or None
+                The main loop to use for every connection; the default is
+                the default main loop, if any.
+            `connection_class` : type
+                The subclass of `BusConnection` to instantiate.
+        """
+        if size < 1:
+            raise ValueError('A BusConnectionPool needs at least one '
+                             'connection, not %d' % size)
+
+        self._connections = []
+        try:
+            for i in xrange(size):
+                self._connections.append(connection_class(address_or_type,
+                                                          mainloop=mainloop))
+        except:
+            for conn in self._connections:
+                conn.close()
+            raise
+
+        #: Connections not currently leased by `acquire`
+        self._idle = list(self._connections)
+        #: Signalled whenever a connection is returned to `_idle`
+        self._idle_cond = Condition(thread.allocate_lock())
+
+        #: Per-thread storage for the connection each thread was given by
+        #: `get_thread_connection`, which goes away with the thread
+        self._thread_local = local()
+        #: Counts the threads given a connection, for round-robin
+        #: assignment (count.next is atomic, so needs no lock)
+        self._thread_counter = itertools.count()
+
+    connections = property(lambda self: tuple(self._connections), None, None,
+            """A tuple of all the connections in this pool.""")
+
+    def __len__(self):
+        return len(self._connections)
+
+    def acquire(self, blocking=True):
+        """Lease a connection for the caller's exclusive use until it is
+        passed to `release`.
+
+        :Parameters:
+            `blocking` : bool
+                If true (default), wait for a connection to become free if
+                all of them are leased. If false, return None instead.
+        :Returns: a `BusConnection`, or None
+        """
+        self._idle_cond.acquire()
+        try:
+            while not self._idle:
+                if not blocking:
+                    return None
+                self._idle_cond.wait()
+            return self._idle.pop()
+        finally:
+            self._idle_cond.release()
+
+    def release(self, conn):
+        """Return a connection leased by `acquire` to the pool."""
+        self._idle_cond.acquire()
+        try:
+            if conn in self._idle or conn not in self._connections:
+                raise ValueError('%r was not leased from %r' % (conn, self))
+            self._idle.append(conn)
+            self._idle_cond.notify()
+        finally:
+            self._idle_cond.release()
+
+    def get_thread_connection(self):
+        """Return the connection associated with the calling thread,
+        assigning one (round-robin) if this thread has not asked before.
+
+        The connection is shared with any other threads that were assigned
+        it, and is not removed from the pool used by `acquire`, so it is
+        only suitable for operations that are safe on a shared connection,
+        such as making proxies and method calls.
+        """
+        conn = getattr(self._thread_local, 'connection', None)
+        if conn is None:
+            conn = self._connections[self._thread_counter.next()
+                                     % len(self._connections)]
+            self._thread_local.connection = conn
+        return conn
+
+    def call_blocking(self, bus_name, object_path, dbus_interface, method,
+                      signature, args, timeout=-1.0, utf8_strings=False,
+                      byte_arrays=False, shared_memory=False,
+                      args_view=False, native=False, reply_signature=None):
+        """Call the given method synchronously on whichever connection is
+        free, as for `dbus.connection.Connection.call_blocking`.
+        """
+        conn = self.acquire()
+        try:
+            return conn.call_blocking(bus_name, object_path, dbus_interface,
+                                      method, signature, args, timeout,
+                                      utf8_strings=utf8_strings,
+                                      byte_arrays=byte_arrays,
+                                      shared_memory=shared_memory,
+                                      args_view=args_view, native=native,
+                                      reply_signature=reply_signature)
+        finally:
+            self.release(conn)
+
+    def get_object(self, bus_name, object_path, introspect=True,
+                   follow_name_owner_changes=False, cache_properties=False):
+        """Return a proxy for the given remote object, bound to the calling
+        thread's connection (see `get_thread_connection`).
+
+        The parameters are the same as for `BusConnection.get_object`.
+        """
+        return self.get_thread_connection().get_object(bus_name,
+                object_path, introspect=introspect,
+                follow_name_owner_changes=follow_name_owner_changes,
+                cache_properties=cache_properties)
+
+    def close(self):
+        """Close every connection in the pool."""
+        self._thread_local = local()
+        for conn in self._connections:
+            conn.close()
+
+    def __repr__(self):
+        return '<%s.%s of %d connections at %#x>' % (
+            self.__class__.__module__, self.__class__.__name__,
+            len(self._connections), id(self))
+    __str__ = __repr__
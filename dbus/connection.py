@@ -28,18 +28,22 @@ try:
     import thread
 except ImportError:
     import dummy_thread as thread
+import time
 import weakref
 
-from _dbus_bindings import Connection as _Connection, \
+from _dbus_bindings import Connection as _Connection, _ReplyPlan, \
                            LOCAL_PATH, LOCAL_IFACE, \
                            validate_interface_name, validate_member_name,\
                            validate_bus_name, validate_object_path,\
                            validate_error_name, \
                            UTF8String
 from dbus.exceptions import DBusException
+from dbus.mainloop import _get_timeout_add
 from dbus.lowlevel import ErrorMessage, MethodCallMessage, SignalMessage, \
                           MethodReturnMessage, HANDLER_RESULT_NOT_YET_HANDLED
-from dbus.proxies import ProxyObject
+from dbus.proxies import ProxyObject, ObjectManagerClient
+from dbus.profiling import _call_profiled
+from dbus.shm import _map_unix_fds
 
 
 _logger = logging.getLogger('dbus.connection')
@@ -49,10 +53,421 @@ def _noop(*args, **kwargs):
     pass
 
 
+class _PathNode(object):
+    __slots__ = ('obj', 'children')
+
+    def __init__(self):
+        self.obj = None
+        self.children = None
+
+
+class _ObjectPathTree(object):
+    """A trie of the objects exported on a connection, keyed by object-path
+    component, so that finding an object, its nearest exported ancestor or
+    its exported descendants costs time proportional to the depth of the
+    path (plus the size of the result) rather than to the number of
+    exported objects.
+    """
+    __slots__ = ('_root', '_len')
+
+    def __init__(self):
+        self._root = _PathNode()
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    @staticmethod
+    def _split(path):
+        if path == '/':
+            return ()
+        return path[1:].split('/')
+
+    def _find(self, path):
+        node = self._root
+        for component in self._split(path):
+            if node.children is None:
+                return None
+            node = node.children.get(component)
+            if node is None:
+                return None
+        return node
+
+    def get(self, path, default=None):
+        node = self._find(path)
+        if node is None or node.obj is None:
+            return default
+        return node.obj
+
+    def __setitem__(self, path, obj):
+        node = self._root
+        for component in self._split(path):
+            if node.children is None:
+                node.children = {}
+            child = node.children.get(component)
+            if child is None:
+                child = node.children[component] = _PathNode()
+            node = child
+        if node.obj is None:
+            self._len += 1
+        node.obj = obj
+
+    def remove(self, path, obj):
+        """Remove the object at `path` if it is `obj`, pruning nodes that
+        no longer lead to an object. Return True if it was removed.
+        """
+        trail = []
+        node = self._root
+        for component in self._split(path):
+            if node.children is None:
+                return False
+            trail.append((node, component))
+            node = node.children.get(component)
+            if node is None:
+                return False
+        if node.obj is not obj:
+            return False
+        node.obj = None
+        self._len -= 1
+
+        while trail and node.obj is None and not node.children:
+            parent, component = trail.pop()
+            del parent.children[component]
+            if not parent.children:
+                parent.children = None
+            node = parent
+        return True
+
+    def nearest(self, path):
+        """Return a tuple (object path, object) for the object exported at
+        `path` or its deepest exported ancestor, or None.
+        """
+        found = None
+        node = self._root
+        prefix = ''
+        if node.obj is not None:
+            found = ('/', node.obj)
+        for component in self._split(path):
+            if node.children is None:
+                break
+            node = node.children.get(component)
+            if node is None:
+                break
+            prefix += '/' + component
+            if node.obj is not None:
+                found = (prefix, node.obj)
+        return found
+
+    def ancestors(self, path):
+        """Return a list of tuples (object path, object) for the exported
+        strict ancestors of `path`, outermost first.
+        """
+        found = []
+        node = self._root
+        prefix = ''
+        components = self._split(path)
+        if components and node.obj is not None:
+            found.append(('/', node.obj))
+        for component in components[:-1]:
+            if node.children is None:
+                break
+            node = node.children.get(component)
+            if node is None:
+                break
+            prefix += '/' + component
+            if node.obj is not None:
+                found.append((prefix, node.obj))
+        return found
+
+    def descendants(self, path):
+        """Return a list of tuples (object path, object) for the exported
+        strict descendants of `path`.
+        """
+        found = []
+        node = self._find(path)
+        if node is None or node.children is None:
+            return found
+        if path == '/':
+            path = ''
+        stack = [(path, node)]
+        while stack:
+            prefix, node = stack.pop()
+            for (component, child) in node.children.iteritems():
+                child_path = prefix + '/' + component
+                if child.obj is not None:
+                    found.append((child_path, child.obj))
+                if child.children is not None:
+                    stack.append((child_path, child))
+        return found
+
+
+# libdbus's timeout for method calls, in seconds, if none is given
+_DEFAULT_TIMEOUT = 25.0
+_INFINITE_TIMEOUT = float('inf')
+
+_NO_REPLY_ERROR = 'org.freedesktop.DBus.Error.NoReply'
+_NO_REPLY_MESSAGE = ('Did not receive a reply. Possible causes include: '
+                     'the remote application did not send a reply, the '
+                     'message bus security policy blocked the reply, the '
+                     'reply timeout expired, or the network connection was '
+                     'broken.')
+
+
+def _timed_append(metrics, message, signature, args):
+    start = time.time()
+    message.append(signature=signature, *args)
+    metrics.record_append(time.time() - start)
+
+
+def _timed_get_args_list(metrics, message, **kwargs):
+    start = time.time()
+    args = message.get_args_list(**kwargs)
+    metrics.record_get_args(time.time() - start)
+    return args
+
+
+# Map from reply signature to _ReplyPlan, so each signature is only
+# compiled once
+_REPLY_PLANS_MAX_SIZE = 256
+_reply_plans = {}
+
+
+def _get_reply_plan(signature):
+    plan = _reply_plans.get(signature)
+    if plan is None:
+        plan = _ReplyPlan(signature)
+        if len(_reply_plans) >= _REPLY_PLANS_MAX_SIZE:
+            _reply_plans.clear()
+        _reply_plans[signature] = plan
+    return plan
+
+
+def _get_native_args_list(message, reply_signature, metrics=None):
+    """Return the arguments of the message as plain Python types, using
+    the plan for `reply_signature` if that's the message's signature.
+    """
+    if metrics is not None:
+        start = time.time()
+    args = None
+    if reply_signature is not None:
+        args = _get_reply_plan(reply_signature).decode(message)
+    if args is None:
+        args = _get_reply_plan(message.get_signature()).decode(message)
+    if metrics is not None:
+        metrics.record_get_args(time.time() - start)
+    return args
+
+
+class _PendingCallInfo(object):
+    __slots__ = ('destination', 'interface', 'member', 'start', 'deadline',
+                 'pending', 'on_timeout')
+
+
+class _PendingCallRegistry(object):
+    """The method calls made on a connection which are awaiting a reply.
+
+    If a coalescing interval is set, calls made with a main loop are sent
+    with no libdbus timeout, and are instead timed out by a single timer
+    wheel which ticks once per interval while there are such calls, rather
+    than by one main loop timeout source per call.
+    """
+
+    __slots__ = ('_lock', '_calls', '_next_token', '_started', '_timed_out',
+                 '_interval', '_tick', '_wheel', '_next_slot', '_coalesced',
+                 '_orphans')
+
+    def __init__(self):
+        self._lock = thread.allocate_lock()
+        # token => _PendingCallInfo
+        self._calls = {}
+        self._next_token = 0
+        self._started = 0
+        self._timed_out = 0
+        self._interval = None
+        # the interval at which the timer is running, or None if it isn't
+        self._tick = None
+        # slot number => list of tokens whose deadline is in that slot
+        self._wheel = {}
+        self._next_slot = 0
+        # number of calls in self._calls which are on the wheel
+        self._coalesced = 0
+        # tokens of calls which timed out before they had a PendingCall
+        self._orphans = set()
+
+    def set_coalesce_interval(self, interval):
+        if interval is not None:
+            if interval <= 0:
+                raise ValueError('interval must be positive')
+            # fail early if there's no main loop timer
+            _get_timeout_add()
+        self._interval = interval
+
+    coalesce_interval = property(lambda self: self._interval)
+
+    def add(self, destination, interface, member, timeout, on_timeout=None):
+        """Record that a call is about to be sent. If on_timeout is not
+        None and calls are being coalesced, it will be called when the
+        timeout expires, instead of libdbus generating an error reply.
+
+        :Returns: a tuple (token, coalesced), where token is passed to
+            `set_pending` and `complete`, and coalesced is true if on_timeout
+            will be used.
+        """
+        now = time.time()
+        if timeout is None or timeout < 0:
+            timeout = _DEFAULT_TIMEOUT
+        info = _PendingCallInfo()
+        info.destination = destination
+        info.interface = interface
+        info.member = member
+        info.start = now
+        info.deadline = now + timeout
+        info.pending = None
+        info.on_timeout = None
+        start_timer = None
+
+        self._lock.acquire()
+        try:
+            token = self._next_token
+            self._next_token += 1
+            self._started += 1
+            self._calls[token] = info
+
+            if (on_timeout is not None and info.deadline < _INFINITE_TIMEOUT
+                and (self._tick is not None or self._interval is not None)):
+                if self._tick is None:
+                    # a change of interval takes effect when the wheel is
+                    # next started
+                    self._tick = start_timer = self._interval
+                    self._next_slot = int(now / self._tick)
+                info.on_timeout = on_timeout
+                # round up, so a call never times out early
+                slot = max(int(info.deadline / self._tick) + 1,
+                           self._next_slot)
+                self._wheel.setdefault(slot, []).append(token)
+                self._coalesced += 1
+        finally:
+            self._lock.release()
+
+        if start_timer is not None:
+            _get_timeout_add()(max(1, int(start_timer * 1000)), self._expire)
+        return token, info.on_timeout is not None
+
+    def set_pending(self, token, pending):
+        """Record the PendingCall for a call, once it has been sent."""
+        self._lock.acquire()
+        try:
+            info = self._calls.get(token)
+            if info is not None:
+                info.pending = pending
+                return
+            if token not in self._orphans:
+                return
+            self._orphans.discard(token)
+        finally:
+            self._lock.release()
+        # the call timed out while it was being sent
+        pending.cancel()
+
+    def complete(self, token):
+        """Forget about a call. Return None if it had already timed out
+        (so the reply should be ignored), or its _PendingCallInfo otherwise.
+        """
+        self._lock.acquire()
+        try:
+            info = self._calls.pop(token, None)
+            if info is not None and info.on_timeout is not None:
+                self._coalesced -= 1
+            return info
+        finally:
+            self._lock.release()
+
+    def _prune_cancelled(self):
+        # must be called with the lock held
+        for token, info in self._calls.items():
+            if info.pending is not None and info.pending.get_cancelled():
+                del self._calls[token]
+                if info.on_timeout is not None:
+                    self._coalesced -= 1
+
+    def _expire(self):
+        expired = []
+        self._lock.acquire()
+        try:
+            self._prune_cancelled()
+            now_slot = int(time.time() / self._tick)
+            for slot in xrange(self._next_slot, now_slot + 1):
+                for token in self._wheel.pop(slot, ()):
+                    info = self._calls.pop(token, None)
+                    if info is None:
+                        # already completed
+                        continue
+                    self._coalesced -= 1
+                    self._timed_out += 1
+                    if info.pending is None:
+                        self._orphans.add(token)
+                    expired.append(info)
+            self._next_slot = now_slot + 1
+            keep_going = (self._coalesced > 0)
+            if not keep_going:
+                self._tick = None
+                self._wheel.clear()
+        finally:
+            self._lock.release()
+
+        for info in expired:
+            if info.pending is not None:
+                info.pending.cancel()
+            try:
+                info.on_timeout()
+            except:
+                logging.basicConfig()
+                _logger.error('Exception in error handler for timed-out '
+                              'call to %s.%s:', info.interface, info.member,
+                              exc_info=1)
+        return keep_going
+
+    def get_stats(self):
+        now = time.time()
+        self._lock.acquire()
+        try:
+            self._prune_cancelled()
+            calls = self._calls.values()
+            started = self._started
+            timed_out = self._timed_out
+        finally:
+            self._lock.release()
+
+        by_destination = {}
+        details = []
+        for info in calls:
+            by_destination[info.destination] = by_destination.get(
+                    info.destination, 0) + 1
+            details.append((info.destination, info.interface, info.member,
+                            now - info.start, info.deadline - now))
+        # oldest first
+        details.sort(key=lambda call: call[3], reverse=True)
+        if details:
+            oldest_age = details[0][3]
+            next_deadline = min([call[4] for call in details])
+        else:
+            oldest_age = next_deadline = None
+
+        return {'in_flight': len(details),
+                'started': started,
+                'timed_out': timed_out,
+                'by_destination': by_destination,
+                'oldest_age': oldest_age,
+                'next_deadline': next_deadline,
+                'coalesce_interval': self._interval,
+                'calls': details}
+
+
 class SignalMatch(object):
     __slots__ = ('_sender_name_owner', '_member', '_interface', '_sender',
                  '_path', '_handler', '_args_match', '_rule',
-                 '_utf8_strings', '_byte_arrays', '_conn_weakref',
+                 '_utf8_strings', '_byte_arrays', '_args_view',
+                 '_conn_weakref',
                  '_destination_keyword', '_interface_keyword',
                  '_message_keyword', '_member_keyword',
                  '_sender_keyword', '_path_keyword', '_int_args_match')
@@ -86,6 +501,7 @@ class SignalMatch(object):
 
         self._utf8_strings = utf8_strings
         self._byte_arrays = byte_arrays
+        self._args_view = kwargs.pop('args_view', False)
         self._sender_keyword = sender_keyword
         self._path_keyword = path_keyword
         self._member_keyword = member_keyword
@@ -168,7 +584,7 @@ class SignalMatch(object):
             return False
         return True
 
-    def maybe_handle_message(self, message):
+    def maybe_handle_message(self, message, metrics=None, profiler=None):
         args = None
 
         # these haven't been checked yet by the match tree
@@ -195,9 +611,19 @@ class SignalMatch(object):
             # minor optimization: if we already extracted the args with the
             # right calling convention to do the args match, don't bother
             # doing so again
-            if args is None or not self._utf8_strings or not self._byte_arrays:
-                args = message.get_args_list(utf8_strings=self._utf8_strings,
+            if self._args_view:
+                args = message.get_args_view(utf8_strings=self._utf8_strings,
                                              byte_arrays=self._byte_arrays)
+            elif (args is None or not self._utf8_strings
+                  or not self._byte_arrays):
+                if metrics is None:
+                    args = message.get_args_list(
+                            utf8_strings=self._utf8_strings,
+                            byte_arrays=self._byte_arrays)
+                else:
+                    args = _timed_get_args_list(metrics, message,
+                            utf8_strings=self._utf8_strings,
+                            byte_arrays=self._byte_arrays)
             kwargs = {}
             if self._sender_keyword is not None:
                 kwargs[self._sender_keyword] = message.get_sender()
@@ -211,7 +637,11 @@ class SignalMatch(object):
                 kwargs[self._interface_keyword] = message.get_interface()
             if self._message_keyword is not None:
                 kwargs[self._message_keyword] = message
-            self._handler(*args, **kwargs)
+            if profiler is None:
+                self._handler(*args, **kwargs)
+            else:
+                _call_profiled(profiler, 'signal', self._handler, message,
+                               args, kwargs)
         except:
             # basicConfig is a no-op if logging is already configured
             logging.basicConfig()
@@ -255,6 +685,25 @@ class Connection(_Connection):
             self._signals_lock = thread.allocate_lock()
             """Lock used to protect signal data structures"""
 
+            self._object_tree = _ObjectPathTree()
+            """Trie of the dbus.service.Object instances exported on this
+            connection, maintained by Object.add_to_connection and
+            Object.remove_from_connection."""
+
+            self._object_managers = {}
+            """Map from object path to the dbus.service.Object exported
+            there, for objects implementing org.freedesktop.DBus.ObjectManager
+            """
+
+            self._pending_calls = _PendingCallRegistry()
+            """The method calls awaiting a reply: see
+            get_pending_calls_stats."""
+
+            self._handler_profiler = None
+            """The dbus.profiling.HandlerProfiler timing method
+            implementations and signal receivers, or None: see
+            set_handler_profiler."""
+
             self.add_message_filter(self.__class__._signal_func)
 
     def activate_name_owner(self, bus_name):
@@ -274,7 +723,7 @@ class Connection(_Connection):
         return bus_name
 
     def get_object(self, bus_name=None, object_path=None, introspect=True,
-                   **kwargs):
+                   cache_properties=False, **kwargs):
         """Return a local proxy for the given remote object.
 
         Method calls on the proxy are translated into method calls on the
@@ -290,6 +739,10 @@ class Connection(_Connection):
             `introspect` : bool
                 If true (default), attempt to introspect the remote
                 object to find out supported methods and their signatures
+            `cache_properties` : bool
+                If true (default is false), the proxy keeps a local cache of
+                the remote object's properties; see
+                `dbus.proxies.ProxyObject.get_cached_property`.
 
         :Returns: a `dbus.proxies.ProxyObject`
         """
@@ -308,7 +761,25 @@ class Connection(_Connection):
                             'arguments: %s' % ', '.join(kwargs.iterkeys()))
 
         return self.ProxyObjectClass(self, bus_name, object_path,
-                                     introspect=introspect)
+                                     introspect=introspect,
+                                     cache_properties=cache_properties)
+
+    def get_object_manager(self, bus_name, object_path):
+        """Return a local mirror of the objects managed by the remote
+        ``org.freedesktop.DBus.ObjectManager`` at the given bus name and
+        object path, from which proxies for the managed objects can be
+        obtained without introspecting them.
+
+        :Parameters:
+            `bus_name` : str
+                A bus name (either the unique name or a well-known name)
+                of the application owning the object manager.
+            `object_path` : str
+                The object path of the object manager.
+        :Returns: a `dbus.proxies.ObjectManagerClient`
+        :Since: 0.84.0
+        """
+        return ObjectManagerClient(self, bus_name, object_path)
 
     def add_signal_receiver(self, handler_function,
                                   signal_name=None,
@@ -350,6 +821,15 @@ class Connection(_Connection):
                 If False (default) it will receive any byte-array
                 arguments as a dbus.Array of dbus.Byte (subclasses of:
                 a list of ints).
+            `args_view` : bool
+                If True, the handler function will receive read-only
+                views of the signal's arguments, as returned by
+                `dbus.lowlevel.Message.get_args_view`, which only convert
+                the parts of each argument that are accessed: a handler
+                for PropertiesChanged which looks up one property in the
+                ``a{sv}`` doesn't pay for converting the others. Views must
+                not be kept after the handler returns if the message is
+                large. New in 0.84.0.
             `sender_keyword` : str
                 If not None (the default), the handler function will receive
                 the unique name of the sending endpoint as a keyword
@@ -507,9 +987,11 @@ class Connection(_Connection):
         path = message.get_path()
         signal_name = message.get_member()
 
+        metrics = self._metrics
+        profiler = self._handler_profiler
         for match in self._iter_easy_matches(path, dbus_interface,
                                              signal_name):
-            match.maybe_handle_message(message)
+            match.maybe_handle_message(message, metrics, profiler)
 
         if (dbus_interface == LOCAL_IFACE and
             path == LOCAL_PATH and
@@ -528,13 +1010,21 @@ class Connection(_Connection):
     def call_async(self, bus_name, object_path, dbus_interface, method,
                    signature, args, reply_handler, error_handler,
                    timeout=-1.0, utf8_strings=False, byte_arrays=False,
-                   require_main_loop=True):
+                   require_main_loop=True, shared_memory=False,
+                   native=False, reply_signature=None):
         """Call the given method, asynchronously.
 
         If the reply_handler is None, successful replies will be ignored.
         If the error_handler is None, failures will be ignored. If both
         are None, the implementation may request that no reply is sent.
 
+        If `shared_memory` is true (new in 0.84.0), each Unix file
+        descriptor in the reply is passed to the reply_handler as a
+        read-only `dbus.shm.SharedBuffer` instead of a `dbus.UnixFd`.
+
+        If `native` is true (new in 0.84.0), the reply_handler is passed
+        plain Python types, as described for `call_blocking`.
+
         :Returns: The dbus.lowlevel.PendingCall.
         :Since: 0.81.0
         """
@@ -553,9 +1043,13 @@ class Connection(_Connection):
                                     path=object_path,
                                     interface=dbus_interface,
                                     method=method)
+        metrics = self._metrics
         # Add the arguments to the function
         try:
-            message.append(signature=signature, *args)
+            if metrics is None:
+                message.append(signature=signature, *args)
+            else:
+                _timed_append(metrics, message, signature, args)
         except Exception, e:
             logging.basicConfig()
             _logger.error('Unable to set arguments %r according to '
@@ -573,23 +1067,83 @@ class Connection(_Connection):
         if error_handler is None:
             error_handler = _noop
 
+        def on_timeout():
+            error_handler(DBusException(_NO_REPLY_MESSAGE,
+                                        name=_NO_REPLY_ERROR))
+
+        registry = self._pending_calls
+        if require_main_loop:
+            # without a main loop, nothing would run the timer wheel
+            token, coalesced = registry.add(bus_name, dbus_interface, method,
+                                            timeout, on_timeout)
+        else:
+            token, coalesced = registry.add(bus_name, dbus_interface, method,
+                                            timeout)
+        if coalesced:
+            timeout = _INFINITE_TIMEOUT
+
         def msg_reply_handler(message):
+            info = registry.complete(token)
+            if info is None:
+                # it already timed out
+                return
+            if metrics is not None:
+                metrics.record_call(dbus_interface, method,
+                                    time.time() - info.start)
+                metrics.count_received(message)
             if isinstance(message, MethodReturnMessage):
-                reply_handler(*message.get_args_list(**get_args_opts))
+                if native:
+                    args_list = _get_native_args_list(message,
+                                                      reply_signature,
+                                                      metrics)
+                elif metrics is None:
+                    args_list = message.get_args_list(**get_args_opts)
+                else:
+                    args_list = _timed_get_args_list(metrics, message,
+                                                     **get_args_opts)
+                if shared_memory:
+                    args_list = _map_unix_fds(args_list)
+                reply_handler(*args_list)
             elif isinstance(message, ErrorMessage):
                 error_handler(DBusException(name=message.get_error_name(),
                                             *message.get_args_list()))
             else:
                 error_handler(TypeError('Unexpected type for reply '
                                         'message: %r' % message))
-        return self.send_message_with_reply(message, msg_reply_handler,
-                                        timeout,
-                                        require_main_loop=require_main_loop)
+        try:
+            pending = self.send_message_with_reply(message,
+                    msg_reply_handler, timeout,
+                    require_main_loop=require_main_loop)
+        except:
+            registry.complete(token)
+            raise
+        registry.set_pending(token, pending)
+        return pending
 
     def call_blocking(self, bus_name, object_path, dbus_interface, method,
                       signature, args, timeout=-1.0, utf8_strings=False,
-                      byte_arrays=False):
+                      byte_arrays=False, shared_memory=False,
+                      args_view=False, native=False, reply_signature=None):
         """Call the given method, synchronously.
+
+        If `shared_memory` is true (new in 0.84.0), each Unix file
+        descriptor in the reply is returned as a read-only
+        `dbus.shm.SharedBuffer` instead of a `dbus.UnixFd`.
+
+        If `args_view` is true (new in 0.84.0), structs, arrays and dicts
+        in the reply are returned as read-only views which only convert
+        the items that are accessed, as returned by
+        `dbus.lowlevel.Message.get_args_view`, rather than as
+        `dbus.Struct`, `dbus.Array` and `dbus.Dictionary`.
+
+        If `native` is true (new in 0.84.0), the reply is returned as
+        plain Python types rather than the `dbus.types` subclasses: int,
+        bool, float, str (of UTF-8) for strings and for byte arrays, list,
+        dict and tuple, with variants replaced by their contents. If the
+        caller knows the signature of the reply, for instance from
+        introspection, passing it as `reply_signature` lets the reply be
+        decoded without looking up its signature first.
+
         :Since: 0.81.0
         """
         if object_path == LOCAL_PATH:
@@ -607,9 +1161,13 @@ class Connection(_Connection):
                                     path=object_path,
                                     interface=dbus_interface,
                                     method=method)
+        metrics = self._metrics
         # Add the arguments to the function
         try:
-            message.append(signature=signature, *args)
+            if metrics is None:
+                message.append(signature=signature, *args)
+            else:
+                _timed_append(metrics, message, signature, args)
         except Exception, e:
             logging.basicConfig()
             _logger.error('Unable to set arguments %r according to '
@@ -618,9 +1176,28 @@ class Connection(_Connection):
             raise
 
         # make a blocking call
-        reply_message = self.send_message_with_reply_and_block(
-            message, timeout)
-        args_list = reply_message.get_args_list(**get_args_opts)
+        token = self._pending_calls.add(bus_name, dbus_interface, method,
+                                        timeout)[0]
+        try:
+            reply_message = self.send_message_with_reply_and_block(
+                message, timeout)
+        finally:
+            info = self._pending_calls.complete(token)
+            if metrics is not None:
+                metrics.record_call(dbus_interface, method,
+                                    time.time() - info.start)
+        if args_view:
+            args_list = reply_message.get_args_view(**get_args_opts)
+        elif native:
+            args_list = _get_native_args_list(reply_message, reply_signature,
+                                              metrics)
+        elif metrics is None:
+            args_list = reply_message.get_args_list(**get_args_opts)
+        else:
+            args_list = _timed_get_args_list(metrics, reply_message,
+                                             **get_args_opts)
+        if shared_memory:
+            args_list = _map_unix_fds(args_list)
         if len(args_list) == 0:
             return None
         elif len(args_list) == 1:
@@ -628,6 +1205,179 @@ class Connection(_Connection):
         else:
             return tuple(args_list)
 
+    def call_many(self, calls, timeout=-1.0, utf8_strings=False,
+                  byte_arrays=False):
+        """Call several methods, synchronously, without waiting for each
+        reply before sending the next call.
+
+        All the method calls are queued for sending first, then this
+        method blocks until every reply (or error, or timeout) has arrived,
+        so the total time taken is roughly that of the slowest call rather
+        than the sum of all of them. Like `call_blocking`, this does not
+        re-enter the main loop.
+
+        :Parameters:
+            `calls` : iterable
+                Tuples (bus_name, object_path, dbus_interface, method,
+                signature, args) with the same meanings as the
+                corresponding arguments to `call_blocking`.
+            `timeout` : float
+                Timeout in seconds for each call, as for `call_blocking`.
+        :Returns: a list with one item per call, in the same order as
+            `calls`. Each item is what `call_blocking` would have returned
+            for that call, or the exception it would have raised (usually
+            a `DBusException`).
+        :Since: 0.84.0
+        """
+        get_args_opts = {'utf8_strings': utf8_strings,
+                         'byte_arrays': byte_arrays}
+        registry = self._pending_calls
+        metrics = self._metrics
+        results = []
+        pending = []
+
+        def make_reply_handler(index, token):
+            def msg_reply_handler(message):
+                info = registry.complete(token)
+                if metrics is not None:
+                    metrics.record_call(info.interface, info.member,
+                                        time.time() - info.start)
+                    metrics.count_received(message)
+                if isinstance(message, MethodReturnMessage):
+                    if metrics is None:
+                        args_list = message.get_args_list(**get_args_opts)
+                    else:
+                        args_list = _timed_get_args_list(metrics, message,
+                                                         **get_args_opts)
+                    if len(args_list) == 0:
+                        results[index] = None
+                    elif len(args_list) == 1:
+                        results[index] = args_list[0]
+                    else:
+                        results[index] = tuple(args_list)
+                elif isinstance(message, ErrorMessage):
+                    results[index] = DBusException(
+                            name=message.get_error_name(),
+                            *message.get_args_list())
+                else:
+                    results[index] = TypeError('Unexpected type for reply '
+                                               'message: %r' % message)
+            return msg_reply_handler
+
+        for (bus_name, object_path, dbus_interface, method, signature,
+             args) in calls:
+            index = len(results)
+            results.append(None)
+
+            if object_path == LOCAL_PATH:
+                results[index] = DBusException('Methods may not be called '
+                                               'on the reserved path %s'
+                                               % LOCAL_PATH)
+                continue
+            if dbus_interface == LOCAL_IFACE:
+                results[index] = DBusException('Methods may not be called '
+                                               'on the reserved interface %s'
+                                               % LOCAL_IFACE)
+                continue
+
+            token = None
+            try:
+                message = MethodCallMessage(destination=bus_name,
+                                            path=object_path,
+                                            interface=dbus_interface,
+                                            method=method)
+                if metrics is None:
+                    message.append(signature=signature, *args)
+                else:
+                    _timed_append(metrics, message, signature, args)
+                token = registry.add(bus_name, dbus_interface, method,
+                                     timeout)[0]
+                pending.append(self.send_message_with_reply(message,
+                        make_reply_handler(index, token), timeout,
+                        require_main_loop=False))
+            except Exception, e:
+                if token is not None:
+                    registry.complete(token)
+                results[index] = e
+
+        for pending_call in pending:
+            pending_call.block()
+
+        return results
+
+    def get_pending_calls_stats(self):
+        """Return a snapshot of the method calls made with `call_async`,
+        `call_blocking` or `call_many` which are awaiting a reply, as a
+        dict with these keys:
+
+        `in_flight` : int
+            The number of calls awaiting a reply
+        `started` : int
+            The number of calls made since the connection was created
+        `timed_out` : int
+            The number of calls timed out by the coalescing timer (see
+            `set_timeout_coalescing`); calls timed out by libdbus are
+            not counted
+        `by_destination` : dict
+            Map from destination bus name (None on peer-to-peer
+            connections) to the number of calls awaiting a reply from it
+        `oldest_age` : float or None
+            The number of seconds the oldest call has been waiting, or None
+            if there are no calls
+        `next_deadline` : float or None
+            The number of seconds until the next call times out, or None if
+            there are no calls
+        `coalesce_interval` : float or None
+            As passed to `set_timeout_coalescing`
+        `calls` : list
+            A tuple (destination, interface, member, age, seconds until
+            deadline) for each call, oldest first
+
+        Calls whose `dbus.lowlevel.PendingCall` has been cancelled are not
+        included.
+
+        :Since: 0.84.0
+        """
+        return self._pending_calls.get_stats()
+
+    def set_timeout_coalescing(self, interval):
+        """If `interval` is not None, time out calls made with `call_async`
+        (and so, asynchronous calls to proxy methods) using a single timer
+        which runs every `interval` seconds while there are calls awaiting
+        a reply, rather than a separate main loop timeout per call. Calls
+        then time out up to `interval` seconds late, and their error
+        handler receives a DBusException named
+        ``org.freedesktop.DBus.Error.NoReply``, as for libdbus timeouts.
+
+        The timer is started with the function set by
+        `dbus.mainloop.set_timeout_add`, such as ``gobject.timeout_add``
+        once `dbus.mainloop.glib` has been imported. It only applies to
+        calls made with ``require_main_loop=True`` (the default)
+        afterwards; if the interval is changed while the timer is running,
+        the change takes effect once the calls already using the timer
+        have finished. If `interval` is None (the default), libdbus times
+        out each call.
+
+        :Since: 0.84.0
+        """
+        self._pending_calls.set_coalesce_interval(interval)
+
+    def set_handler_profiler(self, profiler):
+        """Time each call to the implementation of a `dbus.service.method`
+        exported on this connection, and to each signal receiver added
+        with `add_signal_receiver`, by calling the ``before`` and ``after``
+        methods of `profiler`, a `dbus.profiling.HandlerProfiler`. For
+        instance, to log handlers which stall the main loop for more than
+        50ms::
+
+            conn.set_handler_profiler(dbus.profiling.SlowHandlerLogger(0.05))
+
+        If `profiler` is None (the default), handlers are not timed.
+
+        :Since: 0.84.0
+        """
+        self._handler_profiler = profiler
+
     def call_on_disconnection(self, callable):
         """Arrange for `callable` to be called with one argument (this
         Connection object) when the Connection becomes
@@ -25,12 +25,20 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
-__all__ = ('method', 'signal')
+__all__ = ('method', 'signal', 'property')
 __docformat__ = 'restructuredtext'
 
 import inspect
-
+import itertools
+import weakref
+try:
+    import thread
+except ImportError:
+    import dummy_thread as thread
+
+import dbus.mainloop
 from dbus import validate_interface_name, Signature, validate_member_name
+from dbus.connection import _timed_append
 from dbus.lowlevel import SignalMessage
 from dbus.exceptions import DBusException
 
@@ -40,7 +48,7 @@ def method(dbus_interface, in_signature=None, out_signature=None,
         sender_keyword=None, path_keyword=None, destination_keyword=None,
         message_keyword=None, connection_keyword=None,
         utf8_strings=False, byte_arrays=False,
-        rel_path_keyword=None):
+        rel_path_keyword=None, shared_memory=False):
     """Factory for decorators used to mark methods of a `dbus.service.Object`
     to be exported on the D-Bus.
 
@@ -150,6 +158,20 @@ def method(dbus_interface, in_signature=None, out_signature=None,
             consistent.
 
             :Since: 0.80.0
+
+        `shared_memory` : bool
+            If False (default), Unix file descriptors (signature 'h') are
+            passed to the decorated method as `dbus.UnixFd` objects.
+
+            If True, each Unix file descriptor in the arguments, including
+            those inside arrays, structs and dicts, is passed to the
+            decorated method as a read-only `dbus.shm.SharedBuffer`,
+            mapping the memory the caller sent. Use this with
+            ``in_signature`` containing 'h' for methods which accept large
+            payloads; methods returning one just return a
+            `dbus.shm.SharedBuffer` where the ``out_signature`` has 'h'.
+
+            :Since: 0.84.0
     """
     validate_interface_name(dbus_interface)
 
@@ -200,13 +222,47 @@ def method(dbus_interface, in_signature=None, out_signature=None,
         func._dbus_args = args
         func._dbus_get_args_options = {'byte_arrays': byte_arrays,
                                        'utf8_strings': utf8_strings}
+        func._dbus_shared_memory = shared_memory
         return func
 
     return decorator
 
 
+def _send_signal(obj, locations, dbus_interface, member_name, signature,
+                 args, abs_path=None, rel_path=None):
+    """Emit a signal from the `dbus.service.Object` `obj` at each of
+    `locations`, a sequence of tuples starting with a Connection and an
+    object path, as in `dbus.service.Object.locations`.
+    """
+    for location in locations:
+        if abs_path is None:
+            # non-deprecated case
+            if rel_path is None or rel_path in ('/', ''):
+                object_path = location[1]
+            else:
+                # will be validated by SignalMessage ctor in a moment
+                object_path = location[1] + rel_path
+        else:
+            object_path = abs_path
+
+        message = SignalMessage(object_path, dbus_interface, member_name)
+        metrics = location[0]._metrics
+        if metrics is None:
+            message.append(signature=signature, *args)
+        else:
+            _timed_append(metrics, message, signature, args)
+
+        batch = obj._signal_batch
+        if batch is None:
+            location[0].send_message(message)
+        else:
+            batch.queue(location[0], message,
+                        (object_path, dbus_interface, member_name))
+
+
 def signal(dbus_interface, signature=None, path_keyword=None,
-           rel_path_keyword=None):
+           rel_path_keyword=None, coalesce_interval=None,
+           coalesce_key=None):
     """Factory for decorators used to mark methods of a `dbus.service.Object`
     to emit signals on the D-Bus.
 
@@ -255,9 +311,41 @@ def signal(dbus_interface, signature=None, path_keyword=None,
             on connection 1, and /x/y/z/foo on connection 2.
 
             :Since: 0.82.0
+
+        `coalesce_interval` : float or None
+            If not None, rate-limit this signal: after it has been emitted,
+            further emissions within this many seconds are not sent
+            immediately. Instead, only the arguments of the most recent
+            emission (per `coalesce_key`) are kept, and sent when the
+            interval expires. The decorated method itself is still called
+            on every emission.
+
+            The held-back emissions are sent in the order in which they
+            were made, by a timer started with the function set by
+            `dbus.mainloop.set_timeout_add`, such as ``gobject.timeout_add``
+            once `dbus.mainloop.glib` has been imported.
+
+            :Since: 0.84.0
+
+        `coalesce_key` : int or None
+            If not None, the index of a signal argument (which must be
+            hashable). Emissions with different values for that argument
+            are coalesced separately, so the latest value for each key is
+            emitted. If None (the default), all emissions of the signal from
+            the same object path are coalesced together.
+
+            :Since: 0.84.0
     """
     validate_interface_name(dbus_interface)
 
+    if coalesce_interval is not None:
+        if coalesce_interval <= 0:
+            raise ValueError('coalesce_interval must be positive')
+        coalesce_interval_ms = max(1, int(coalesce_interval * 1000))
+    elif coalesce_key is not None:
+        raise TypeError('dbus.service.signal::coalesce_key cannot be used '
+                        'without coalesce_interval')
+
     if path_keyword is not None:
         from warnings import warn
         warn(DeprecationWarning('dbus.service.signal::path_keyword has been '
@@ -292,24 +380,66 @@ def signal(dbus_interface, signature=None, path_keyword=None,
 
             func(self, *args, **keywords)
 
-            for location in self.locations:
-                if abs_path is None:
-                    # non-deprecated case
-                    if rel_path is None or rel_path in ('/', ''):
-                        object_path = location[1]
-                    else:
-                        # will be validated by SignalMessage ctor in a moment
-                        object_path = location[1] + rel_path
-                else:
-                    object_path = abs_path
-
-                message = SignalMessage(object_path,
-                                                       dbus_interface,
-                                                       member_name)
-                message.append(signature=signature, *args)
-
-                location[0].send_message(message)
-        # end emit_signal
+            if coalesce_interval is None:
+                send_signal(self, args, abs_path, rel_path)
+                return
+
+            if coalesce_key is None:
+                key = (abs_path, rel_path)
+            else:
+                key = (abs_path, rel_path, args[coalesce_key])
+
+            coalesced_lock.acquire()
+            try:
+                latest = coalesced.get(self)
+                if latest is not None:
+                    latest[key] = (serials.next(), args, abs_path, rel_path)
+                    return
+                # nothing sent recently: send now, and hold back anything
+                # else until the interval has passed
+                timeout_add = dbus.mainloop._get_timeout_add()
+                coalesced[self] = {}
+            finally:
+                coalesced_lock.release()
+            send_signal(self, args, abs_path, rel_path)
+            timeout_add(coalesce_interval_ms, flush_coalesced,
+                        weakref.ref(self))
+
+        def flush_coalesced(ref):
+            self = ref()
+            if self is None:
+                return False
+            coalesced_lock.acquire()
+            try:
+                latest = coalesced.get(self)
+                if not latest:
+                    # nothing happened during the interval: stop the timer,
+                    # so the next emission is sent immediately
+                    coalesced.pop(self, None)
+                    return False
+                coalesced[self] = {}
+            finally:
+                coalesced_lock.release()
+            pending = latest.values()
+            pending.sort()
+            for serial, args, abs_path, rel_path in pending:
+                send_signal(self, args, abs_path, rel_path)
+            return True
+
+        def send_signal(self, args, abs_path, rel_path):
+            _send_signal(self, self.locations, dbus_interface, member_name,
+                         signature, args, abs_path, rel_path)
+
+        #: Map from Object to a dict mapping coalescing keys to the serial
+        #: number, arguments and paths of the emission held back; an Object
+        #: is present if and only if a timer to flush its held-back
+        #: emissions is running
+        coalesced = weakref.WeakKeyDictionary()
+        #: Lock protecting `coalesced`, which is shared by the emitting
+        #: threads and the timer
+        coalesced_lock = thread.allocate_lock()
+        #: Serial numbers recording the order of held-back emissions
+        serials = itertools.count()
 
         args = inspect.getargspec(func)[0]
         args.pop(0)
@@ -335,6 +465,106 @@ def signal(dbus_interface, signature=None, path_keyword=None,
         emit_signal._dbus_interface = dbus_interface
         emit_signal._dbus_signature = signature
         emit_signal._dbus_args = args
+        emit_signal._dbus_coalesce_interval = coalesce_interval
         return emit_signal
 
     return decorator
+
+
+class _Property(object):
+    """A D-Bus property of a `dbus.service.Object`, which also behaves like
+    a Python property. See `dbus.service.property`.
+    """
+
+    def __init__(self, fget, fset, dbus_interface, signature,
+                 emits_changed_signal):
+        self.fget = fget
+        self.fset = fset
+        self.__name__ = fget.__name__
+        self.__doc__ = fget.__doc__
+        self._dbus_is_property = True
+        self._dbus_interface = dbus_interface
+        self._dbus_signature = signature
+        self._dbus_emits_changed_signal = emits_changed_signal
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return self.fget(obj)
+
+    def __set__(self, obj, value):
+        if self.fset is None:
+            raise AttributeError('D-Bus property %s is read-only'
+                                 % self.__name__)
+        self.fset(obj, value)
+        # only objects implementing org.freedesktop.DBus.Properties
+        # cache values and emit change notifications
+        changed = getattr(obj, '_dbus_property_changed', None)
+        if changed is not None:
+            changed(self, value)
+
+    def setter(self, fset):
+        """Decorator to make this property writable, for use as::
+
+            @dbus.service.property(IFACE, signature='s')
+            def Name(self):
+                return self._name
+
+            @Name.setter
+            def Name(self, value):
+                self._name = value
+        """
+        return _Property(self.fget, fset, self._dbus_interface,
+                         self._dbus_signature,
+                         self._dbus_emits_changed_signal)
+
+
+def property(dbus_interface, signature, emits_changed_signal=True):
+    """Factory for decorators used to mark getter methods of a
+    `dbus.service.Object` as D-Bus properties.
+
+    The decorated method is exported as the read-only property of the same
+    name on the given D-Bus interface; use the ``setter`` method of the
+    result (in the same way as with Python's built-in ``property``) to make
+    it writable. Within Python, the property can be read and assigned like
+    any other attribute.
+
+    The object must also inherit from `dbus.service.PropertiesInterface`
+    for the properties to be accessible over D-Bus.
+
+    :Parameters:
+        `dbus_interface` : str
+            Name of a D-Bus interface
+        `signature` : str
+            The signature of the property's value, which must be a single
+            complete type
+        `emits_changed_signal` : bool, 'invalidates' or 'const'
+            If True (default), setting the property emits a
+            PropertiesChanged signal including its new value. If
+            'invalidates', the signal only says that the property has
+            changed. If 'const', the value never changes. If False,
+            no signal is emitted, and the value may change at any time.
+
+            Properties that emit PropertiesChanged or are constant have
+            their values cached by GetAll, so if their value changes other
+            than by being set, the object must call
+            `dbus.service.PropertiesInterface.properties_changed`.
+
+    :Since: 0.84.0
+    """
+    validate_interface_name(dbus_interface)
+
+    if len(tuple(Signature(signature))) != 1:
+        raise ValueError('property signature must be a single complete '
+                         'type, not %r' % signature)
+    if emits_changed_signal not in (True, False, 'invalidates', 'const'):
+        raise ValueError("emits_changed_signal must be True, False, "
+                         "'invalidates' or 'const', not %r"
+                         % emits_changed_signal)
+
+    def decorator(func):
+        validate_member_name(func.__name__)
+        return _Property(func, None, dbus_interface, signature,
+                         emits_changed_signal)
+
+    return decorator
@@ -25,7 +25,9 @@
 __all__ = ('DBusException', 'MissingErrorHandlerException',
            'MissingReplyHandlerException', 'ValidationException',
            'IntrospectionParserException', 'UnknownMethodException',
-           'NameExistsException')
+           'NameExistsException', 'UnknownPropertyException',
+           'ReadOnlyPropertyException', 'UnknownObjectException',
+           'InvalidArgsException')
 
 class DBusException(Exception):
 
@@ -104,3 +106,28 @@ class NameExistsException(DBusException):
 
     def __init__(self, name):
         DBusException.__init__(self, "Bus name already exists: %s"%name)
+
+class UnknownPropertyException(DBusException):
+
+    _dbus_error_name = 'org.freedesktop.DBus.Error.UnknownProperty'
+
+    def __init__(self, property):
+        DBusException.__init__(self, "Unknown property: %s"%property)
+
+class ReadOnlyPropertyException(DBusException):
+
+    _dbus_error_name = 'org.freedesktop.DBus.Error.PropertyReadOnly'
+
+    def __init__(self, property):
+        DBusException.__init__(self, "Property is read-only: %s"%property)
+
+class UnknownObjectException(DBusException):
+
+    _dbus_error_name = 'org.freedesktop.DBus.Error.UnknownObject'
+
+    def __init__(self, object_path):
+        DBusException.__init__(self, "Unknown object: %s"%object_path)
+
+class InvalidArgsException(DBusException):
+
+    _dbus_error_name = 'org.freedesktop.DBus.Error.InvalidArgs'
@@ -0,0 +1,381 @@
+# Copyright (C) 2008 Collabora Ltd. <http://www.collabora.co.uk/>
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use, copy,
+# modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+"""Generating load on a D-Bus service, to find how many calls per second
+it can handle and how long they take.
+
+Usage::
+
+    python -m dbus.loadgen [OPTIONS] BUS_NAME OBJECT_PATH INTERFACE.METHOD
+
+This keeps ``--concurrency`` calls to the given method in flight on each of
+``--connections`` connections for ``--duration`` seconds (or until
+``--requests`` calls have completed), using
+`dbus.connection.Connection.call_async` and the GLib main loop. The
+arguments of each call are generated at random to match ``--signature``;
+see `ArgumentGenerator`. Use ``-`` as the bus name to call an object on a
+peer-to-peer connection to ``--address``.
+
+The results are printed as lines of the form ``<measurement> <value>``, as
+for the benchmarks in the ``test`` directory: the number of calls and
+errors, the error rate, the throughput in calls per second and the 50th,
+99th and 99.9th percentile latencies in seconds, followed by a line
+``error <name> <count>`` for each kind of error.
+
+:Since: 0.84.0
+"""
+
+__all__ = ('ArgumentGenerator', 'main')
+__docformat__ = 'restructuredtext'
+
+import optparse
+import random
+import sys
+import time
+
+from _dbus_bindings import BUS_SESSION, BUS_SYSTEM, validate_bus_name, \
+                           validate_interface_name, validate_member_name, \
+                           validate_object_path
+from dbus.exceptions import DBusException
+from dbus.types import ByteArray, Int32, ObjectPath, Signature, String
+
+
+_LETTERS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+
+# signature character -> (minimum, maximum)
+_INTEGERS = {
+    'n': (-0x8000, 0x7fff),
+    'q': (0, 0xffff),
+    'i': (-0x80000000, 0x7fffffff),
+    'u': (0, 0xffffffffL),
+    'x': (-0x8000000000000000L, 0x7fffffffffffffffL),
+    't': (0, 0xffffffffffffffffL),
+}
+
+
+class ArgumentGenerator(object):
+    """A callable returning a new tuple of random arguments matching a
+    D-Bus signature each time it is called.
+
+    Integers are chosen from the whole range of their type, doubles from
+    [0, 1), strings are `string_length` random letters and digits, object
+    paths have one such component, signatures are 's', arrays and
+    dictionaries have `array_length` items, and variants contain a string
+    or a 32-bit integer. Dictionary keys are distinct, so a dictionary
+    whose key type has fewer possible values than `array_length` (such as
+    'b', 'y', or strings when `string_length` is small) has fewer items.
+    File descriptors ('h') are not supported.
+
+    The signature is only examined once, so generating arguments costs
+    little more than making the values.
+
+    :Since: 0.84.0
+    """
+
+    def __init__(self, signature, array_length=4, string_length=8,
+                 seed=None):
+        """Constructor.
+
+        :Parameters:
+            `signature` : str
+                The signature of the arguments
+            `array_length` : int
+                The number of items in each array or dictionary
+            `string_length` : int
+                The number of characters in each string
+            `seed`
+                If not None, seed the random number generator with this,
+                so the same arguments are generated every time
+        :Raises ValueError: if the signature is invalid or contains 'h'
+        """
+        if array_length < 0 or string_length < 0:
+            raise ValueError('lengths must be non-negative')
+        self._random = random.Random(seed)
+        self._array_length = array_length
+        self._string_length = string_length
+        self.signature = Signature(signature)
+        self._makers = tuple([self._compile(t) for t in self.signature])
+
+    def __call__(self):
+        return tuple([make() for make in self._makers])
+
+    def _string(self):
+        choice = self._random.choice
+        return ''.join([choice(_LETTERS)
+                        for i in xrange(self._string_length)])
+
+    def _compile(self, signature):
+        rand = self._random
+        code = signature[0]
+        if code in _INTEGERS:
+            lower, upper = _INTEGERS[code]
+            return lambda: rand.randint(lower, upper)
+        if code == 'y':
+            return lambda: rand.randint(0, 255)
+        if code == 'b':
+            return lambda: rand.random() < 0.5
+        if code == 'd':
+            return rand.random
+        if code == 's':
+            return self._string
+        if code == 'o':
+            return lambda: ObjectPath('/' + (self._string() or 'x'))
+        if code == 'g':
+            return lambda: Signature('s')
+        if code == 'v':
+            string = self._string
+            def make_variant():
+                if rand.random() < 0.5:
+                    return String(string())
+                else:
+                    return Int32(rand.randint(-0x80000000, 0x7fffffff))
+            return make_variant
+        if code == '(':
+            makers = [self._compile(t) for t in Signature(signature[1:-1])]
+            return lambda: tuple([make() for make in makers])
+        if code == 'a':
+            length = self._array_length
+            if signature[1] == '{':
+                key, value = [self._compile(t)
+                              for t in Signature(signature[2:-1])]
+                def make_dict():
+                    result = {}
+                    # keys can collide, and some key types have fewer
+                    # than `length` values, so don't try forever
+                    for i in xrange(4 * length):
+                        if len(result) >= length:
+                            break
+                        result[key()] = value()
+                    return result
+                return make_dict
+            if signature[1] == 'y':
+                return lambda: ByteArray(''.join([chr(rand.randint(0, 255))
+                                                  for i in xrange(length)]))
+            item = self._compile(signature[1:])
+            return lambda: [item() for i in xrange(length)]
+        raise ValueError('Unable to generate arguments of type %r' % code)
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return None
+    index = int(fraction * len(ordered) + 0.5) - 1
+    return ordered[min(max(index, 0), len(ordered) - 1)]
+
+
+class _Load(object):
+    """The state of a run: the calls in flight and the results so far."""
+
+    def __init__(self, loop, bus_name, object_path, interface, method,
+                 generator, timeout, max_calls):
+        self.loop = loop
+        self.bus_name = bus_name
+        self.object_path = object_path
+        self.interface = interface
+        self.method = method
+        self.generator = generator
+        self.timeout = timeout
+        self.max_calls = max_calls
+        self.started = 0
+        self.in_flight = 0
+        self.stopping = False
+        self.latencies = []
+        self.errors = {}
+
+    def start_call(self, conn):
+        if self.stopping or (self.max_calls is not None
+                             and self.started >= self.max_calls):
+            if self.in_flight == 0:
+                self.loop.quit()
+            return
+        self.started += 1
+        self.in_flight += 1
+        start = time.time()
+
+        def reply_handler(*args):
+            self.latencies.append(time.time() - start)
+            self.finish_call(conn)
+
+        def error_handler(e):
+            if isinstance(e, DBusException):
+                name = e.get_dbus_name()
+            else:
+                name = e.__class__.__name__
+            self.errors[name] = self.errors.get(name, 0) + 1
+            self.finish_call(conn)
+
+        try:
+            conn.call_async(self.bus_name, self.object_path, self.interface,
+                            self.method, self.generator.signature,
+                            self.generator(), reply_handler, error_handler,
+                            timeout=self.timeout, utf8_strings=True,
+                            byte_arrays=True)
+        except Exception, e:
+            # the call couldn't even be sent (perhaps we've been
+            # disconnected), and the next one probably can't either
+            self.errors[e.__class__.__name__] = \
+                    self.errors.get(e.__class__.__name__, 0) + 1
+            self.in_flight -= 1
+            self.stop()
+
+    def finish_call(self, conn):
+        self.in_flight -= 1
+        self.start_call(conn)
+
+    def stop(self):
+        self.stopping = True
+        if self.in_flight == 0:
+            self.loop.quit()
+        return False
+
+
+def _report(name, value):
+    if value is None:
+        print '%s -' % name
+    elif isinstance(value, float):
+        print '%s %.9f' % (name, value)
+    else:
+        print '%s %d' % (name, value)
+
+
+def main(argv=None):
+    """Run the load generator with the given command-line arguments (by
+    default, ``sys.argv[1:]``).
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+
+    parser = optparse.OptionParser(
+            usage='%prog [OPTIONS] BUS_NAME OBJECT_PATH INTERFACE.METHOD')
+    parser.add_option('--system', action='store_const', dest='address',
+                      const=BUS_SYSTEM, help='connect to the system bus')
+    parser.add_option('--session', action='store_const', dest='address',
+                      const=BUS_SESSION,
+                      help='connect to the session bus (the default)')
+    parser.add_option('--address', dest='address',
+                      help='connect to the bus or peer at this address')
+    parser.add_option('-c', '--connections', type='int', default=1,
+                      help='number of connections [default: %default]')
+    parser.add_option('-n', '--concurrency', type='int', default=10,
+                      help='calls in flight per connection '
+                           '[default: %default]')
+    parser.add_option('-d', '--duration', type='float', default=10.0,
+                      help='seconds to run for [default: %default]')
+    parser.add_option('-r', '--requests', type='int',
+                      help='stop after this many calls')
+    parser.add_option('-t', '--timeout', type='float', default=-1.0,
+                      help='seconds to wait for each reply '
+                           '[default: libdbus default]')
+    parser.add_option('-s', '--signature', default='',
+                      help='signature of the generated arguments '
+                           '[default: none]')
+    parser.add_option('--array-length', type='int', default=4,
+                      help='items per generated array [default: %default]')
+    parser.add_option('--string-length', type='int', default=8,
+                      help='characters per generated string '
+                           '[default: %default]')
+    parser.add_option('--seed', type='int',
+                      help='seed for the argument generator')
+    options, args = parser.parse_args(argv)
+
+    if len(args) != 3:
+        parser.error('expected BUS_NAME OBJECT_PATH INTERFACE.METHOD')
+    bus_name, object_path, method = args
+    if '.' not in method:
+        parser.error('the method must be qualified by its interface')
+    interface, method = method.rsplit('.', 1)
+    if options.connections < 1 or options.concurrency < 1:
+        parser.error('--connections and --concurrency must be positive')
+    try:
+        if bus_name == '-':
+            if options.address in (None, BUS_SESSION, BUS_SYSTEM):
+                raise ValueError('--address is required for a peer-to-peer '
+                                 'connection')
+            bus_name = None
+        else:
+            validate_bus_name(bus_name)
+        validate_object_path(object_path)
+        validate_interface_name(interface)
+        validate_member_name(method)
+        generator = ArgumentGenerator(options.signature,
+                                      options.array_length,
+                                      options.string_length, options.seed)
+    except (TypeError, ValueError), e:
+        parser.error(str(e))
+
+    import gobject
+    from dbus.bus import BusConnection
+    from dbus.connection import Connection
+    from dbus.mainloop.glib import DBusGMainLoop
+
+    mainloop = DBusGMainLoop()
+    address = options.address
+    if address is None:
+        address = BUS_SESSION
+    conns = []
+    for i in xrange(options.connections):
+        if bus_name is None:
+            conns.append(Connection(address, mainloop=mainloop))
+        else:
+            conns.append(BusConnection(address, mainloop=mainloop))
+
+    loop = gobject.MainLoop()
+    load = _Load(loop, bus_name, object_path, interface, method, generator,
+                 options.timeout, options.requests)
+    gobject.timeout_add(int(options.duration * 1000), load.stop)
+
+    start = time.time()
+    for conn in conns:
+        for i in xrange(options.concurrency):
+            load.start_call(conn)
+    if load.in_flight:
+        loop.run()
+    elapsed = time.time() - start
+
+    for conn in conns:
+        conn.close()
+
+    latencies = load.latencies
+    latencies.sort()
+    n_errors = sum(load.errors.values())
+    n_calls = len(latencies) + n_errors
+    _report('calls', n_calls)
+    _report('errors', n_errors)
+    _report('error_rate', n_calls and float(n_errors) / n_calls or 0.0)
+    if elapsed > 0:
+        _report('throughput', n_calls / elapsed)
+    else:
+        _report('throughput', None)
+    _report('latency_p50', _percentile(latencies, 0.5))
+    _report('latency_p99', _percentile(latencies, 0.99))
+    _report('latency_p999', _percentile(latencies, 0.999))
+    names = load.errors.keys()
+    names.sort()
+    for name in names:
+        print 'error %s %d' % (name, load.errors[name])
+    sys.stdout.flush()
+    return n_errors == 0 and 0 or 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -52,11 +52,38 @@ WATCH_ERROR = _dbus_bindings.WATCH_ERROR
 """Represents an error condition on a file descriptor.
 Used to implement file descriptor watches."""
 
+_timeout_add = None
+
+def set_timeout_add(function):
+    """Set the function dbus-python uses to run timers on the main loop,
+    for instance to flush coalesced signals (see `dbus.service.signal`).
+
+    `function` is called as ``function(milliseconds, callback, *args)``,
+    and must arrange for ``callback(*args)`` to be called from the main
+    loop every `milliseconds` until it returns false, like
+    ``gobject.timeout_add``. Importing `dbus.mainloop.glib` sets it to
+    ``gobject.timeout_add`` unless another function has already been set.
+
+    :Since: 0.84.0
+    """
+    global _timeout_add
+    _timeout_add = function
+
+def _get_timeout_add():
+    if _timeout_add is None:
+        raise RuntimeError('This feature needs a main loop timer: import '
+                           'dbus.mainloop.glib or call '
+                           'dbus.mainloop.set_timeout_add(...)')
+    return _timeout_add
+
 __all__ = (
            # Imported into this module
            'NativeMainLoop', 'WATCH_READABLE', 'WATCH_WRITABLE',
            'WATCH_HANGUP', 'WATCH_ERROR', 'NULL_MAIN_LOOP',
 
+           # Defined in this module
+           'set_timeout_add',
+
            # Submodules
            'glib'
            )
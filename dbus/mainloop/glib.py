@@ -27,6 +27,7 @@
 __all__ = ('DBusGMainLoop', 'threads_init')
 
 from _dbus_glib_bindings import DBusGMainLoop, gthreads_init
+import dbus.mainloop
 
 _dbus_gthreads_initialized = False
 def threads_init():
@@ -39,3 +40,10 @@ def threads_init():
     if not _dbus_gthreads_initialized:
         gthreads_init()
         _dbus_gthreads_initialized = True
+
+def _timeout_add(milliseconds, callback, *args):
+    import gobject
+    return gobject.timeout_add(milliseconds, callback, *args)
+
+if dbus.mainloop._timeout_add is None:
+    dbus.mainloop.set_timeout_add(_timeout_add)
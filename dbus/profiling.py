@@ -0,0 +1,160 @@
+# Copyright (C) 2008 Collabora Ltd. <http://www.collabora.co.uk/>
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use, copy,
+# modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+"""Timing the Python code run when messages are dispatched: the
+implementations of exported methods and signal receivers.
+
+A slow handler delays every other message waiting in the main loop. To
+find out which handlers those are, give a connection a `HandlerProfiler`
+with `dbus.connection.Connection.set_handler_profiler`; `SlowHandlerLogger`
+is one which logs every handler that takes longer than a threshold.
+
+:Since: 0.84.0
+"""
+
+__all__ = ('HandlerProfiler', 'SlowHandlerLogger')
+__docformat__ = 'restructuredtext'
+
+import logging
+import sys
+import time
+
+
+_logger = logging.getLogger('dbus.profiling')
+
+
+class HandlerProfiler(object):
+    """Base class for objects which are told about each call to a method
+    implementation or signal receiver on a connection. This base class
+    does nothing.
+
+    For a method with asynchronous callbacks, only the time taken before
+    the method returns is measured.
+
+    If `before` or `after` raises an exception, it is logged and the
+    handler's result is unaffected.
+
+    :Since: 0.84.0
+    """
+
+    def before(self, kind, handler, message):
+        """Called just before a handler is called.
+
+        :Parameters:
+            `kind` : str
+                'method' for the implementation of an exported method, or
+                'signal' for a signal receiver
+            `handler` : callable
+                The function about to be called
+            `message` : `dbus.lowlevel.Message`
+                The method call or signal being handled
+        :Returns: anything, which is passed to `after` as `context`
+        """
+        return None
+
+    def after(self, kind, handler, message, seconds, context, exc_info):
+        """Called just after a handler has returned or raised an exception.
+
+        :Parameters:
+            `kind`, `handler`, `message`
+                As for `before`
+            `seconds` : float
+                The time taken by the handler
+            `context`
+                What `before` returned
+            `exc_info` : tuple or None
+                None if the handler returned, or ``sys.exc_info()`` for
+                the exception it raised, which will be handled as usual
+                after this method returns
+        """
+        pass
+
+
+def _describe(kind, handler, message):
+    return '%s %s.%s at %s (%s.%s)' % (kind, message.get_interface(),
+                                       message.get_member(),
+                                       message.get_path(),
+                                       getattr(handler, '__module__', '?'),
+                                       getattr(handler, '__name__', handler))
+
+
+class SlowHandlerLogger(HandlerProfiler):
+    """A profiler which logs a warning for each handler that takes longer
+    than the given threshold, naming the method or signal and the Python
+    function.
+
+    :Since: 0.84.0
+    """
+
+    def __init__(self, threshold=0.1, logger=None):
+        """Constructor.
+
+        :Parameters:
+            `threshold` : float
+                Handlers taking this many seconds or more are logged
+            `logger` : logging.Logger
+                The logger to use; the default is the ``dbus.profiling``
+                logger
+        """
+        if threshold < 0:
+            raise ValueError('threshold must be non-negative')
+        self.threshold = threshold
+        if logger is None:
+            logger = _logger
+        self.logger = logger
+
+    def after(self, kind, handler, message, seconds, context, exc_info):
+        if seconds >= self.threshold:
+            self.logger.warning('Slow D-Bus handler: %s took %.3fs',
+                                _describe(kind, handler, message), seconds)
+
+
+def _call_profiled(profiler, kind, handler, message, args, kwargs):
+    # Exceptions raised by the profiler are logged, and never change what
+    # the handler returns or raises.
+    try:
+        context = profiler.before(kind, handler, message)
+    except:
+        _logger.exception('Ignoring exception in %r.before for %s',
+                          profiler, _describe(kind, handler, message))
+        context = None
+    start = time.time()
+    try:
+        ret = handler(*args, **kwargs)
+    except:
+        exc_info = sys.exc_info()
+        _call_after(profiler, kind, handler, message, time.time() - start,
+                    context, exc_info)
+        raise exc_info[0], exc_info[1], exc_info[2]
+    _call_after(profiler, kind, handler, message, time.time() - start,
+                context, None)
+    return ret
+
+
+def _call_after(profiler, kind, handler, message, seconds, context,
+                exc_info):
+    try:
+        profiler.after(kind, handler, message, seconds, context, exc_info)
+    except:
+        _logger.exception('Ignoring exception in %r.after for %s',
+                          profiler, _describe(kind, handler, message))
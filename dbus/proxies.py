@@ -32,7 +32,8 @@ except ImportError:
     from dummy_threading import RLock
 
 import _dbus_bindings
-from dbus._expat_introspect_parser import process_introspection_data
+from dbus._expat_introspect_parser import parse_introspection_data
+from dbus._lru import LRUCache
 from dbus.exceptions import MissingReplyHandlerException, MissingErrorHandlerException, IntrospectionParserException, DBusException
 
 __docformat__ = 'restructuredtext'
@@ -40,15 +41,21 @@ __docformat__ = 'restructuredtext'
 
 _logger = logging.getLogger('dbus.proxies')
 
+#: The introspection data of a proxy which has not been introspected
+_EMPTY_METHOD_MAP = {}
+
 from _dbus_bindings import LOCAL_PATH, \
                            BUS_DAEMON_NAME, BUS_DAEMON_PATH, BUS_DAEMON_IFACE,\
-                           INTROSPECTABLE_IFACE
+                           INTROSPECTABLE_IFACE, PROPERTIES_IFACE, \
+                           OBJECT_MANAGER_IFACE
 
 
-class _DeferredMethod:
+class _DeferredMethod(object):
     """A proxy method which will only get called once we have its
     introspection reply.
     """
+    __slots__ = ('_proxy_method', '_method_name', '_append', '_block')
+
     def __init__(self, proxy_method, append, block):
         self._proxy_method = proxy_method
         # the test suite relies on the existence of this property
@@ -71,13 +78,16 @@ class _DeferredMethod:
         self._append(self._proxy_method, args, keywords)
 
 
-class _ProxyMethod:
+class _ProxyMethod(object):
     """A proxy method.
 
     Typically a member of a ProxyObject. Calls to the
     method produce messages that travel over the Bus and are routed
     to a specific named Service.
     """
+    __slots__ = ('_proxy', '_connection', '_named_service', '_object_path',
+                 '_method_name', '_dbus_interface')
+
     def __init__(self, proxy, connection, bus_name, object_path, method_name,
                  iface):
         if object_path == LOCAL_PATH:
@@ -119,6 +129,8 @@ class _ProxyMethod:
         else:
             key = dbus_interface + '.' + self._method_name
         introspect_sig = self._proxy._introspect_method_map.get(key, None)
+        if keywords.get('native'):
+            self._proxy._add_reply_signature(key, keywords)
 
         if ignore_reply or reply_handler is not None:
             self._connection.call_async(self._named_service,
@@ -150,6 +162,8 @@ class _ProxyMethod:
         else:
             key = self._method_name
         introspect_sig = self._proxy._introspect_method_map.get(key, None)
+        if keywords.get('native'):
+            self._proxy._add_reply_signature(key, keywords)
 
         self._connection.call_async(self._named_service,
                                     self._object_path,
@@ -167,7 +181,27 @@ class ProxyObject(object):
 
     A ProxyObject is provided by the Bus. ProxyObjects
     have member functions, and can be called like normal Python objects.
+
+    Changed in 0.84.0: ProxyObject uses ``__slots__``, so arbitrary
+    attributes can only be set on instances of subclasses.
+
+    Since 0.84.0, proxy methods can be called with the keyword argument
+    ``native=True`` to get the reply as plain Python types, as described
+    for `dbus.connection.Connection.call_blocking`; once the object has
+    been introspected, the reply is decoded by a plan compiled from the
+    method's out-signature.
     """
+    __slots__ = ('_bus', '_named_service', '_requested_bus_name',
+                 '__dbus_object_path__', '_introspect_state',
+                 '_pending_introspect', '_pending_introspect_queue',
+                 '_introspect_method_map', '_introspect_data',
+                 '_introspect_lock',
+                 '_method_cache',
+                 '_property_cache',
+                 '_property_cache_match', '_property_cache_lock',
+                 '_property_cache_source',
+                 '__weakref__')
+
     ProxyMethodClass = _ProxyMethod
     DeferredMethodClass = _DeferredMethod
 
@@ -175,8 +209,18 @@ class ProxyObject(object):
     INTROSPECT_STATE_INTROSPECT_IN_PROGRESS = 1
     INTROSPECT_STATE_INTROSPECT_DONE = 2
 
+    #: The maximum number of interfaces whose properties are cached by a
+    #: proxy with ``cache_properties`` set; the least recently used
+    #: interface is evicted when this is exceeded.
+    PROPERTY_CACHE_MAX_INTERFACES = 16
+
+    #: The maximum number of proxy methods cached by `get_dbus_method` on
+    #: each proxy; methods requested after that are not cached.
+    METHOD_CACHE_MAX_SIZE = 64
+
     def __init__(self, conn=None, bus_name=None, object_path=None,
-                 introspect=True, follow_name_owner_changes=False, **kwargs):
+                 introspect=True, follow_name_owner_changes=False,
+                 cache_properties=False, **kwargs):
         """Initialize the proxy object.
 
         :Parameters:
@@ -196,6 +240,11 @@ class ProxyObject(object):
             `follow_name_owner_changes` : bool
                 If true (default is false) and the `bus_name` is a
                 well-known name, follow ownership changes for that name
+            `cache_properties` : bool
+                If true (default is false), keep a local cache of the remote
+                object's D-Bus properties, filled by one GetAll call per
+                interface and kept up to date by the PropertiesChanged
+                signal; see `get_cached_property`. This requires a main loop.
         """
         bus = kwargs.pop('bus', None)
         if bus is not None:
@@ -221,7 +270,7 @@ class ProxyObject(object):
                             'keyword arguments: %s'
                             % ', '.join(kwargs.iterkeys()))
 
-        if follow_name_owner_changes:
+        if follow_name_owner_changes or cache_properties:
             # we don't get the signals unless the Bus has a main loop
             # XXX: using Bus internals
             conn._require_main_loop()
@@ -242,19 +291,44 @@ class ProxyObject(object):
 
         #PendingCall object for Introspect call
         self._pending_introspect = None
-        #queue of async calls waiting on the Introspect to return
-        self._pending_introspect_queue = []
-        #dictionary mapping method names to their input signatures
-        self._introspect_method_map = {}
-
-        # must be a recursive lock because block() is called while locked,
-        # and calls the callback which re-takes the lock
-        self._introspect_lock = RLock()
+        #queue of async calls waiting on the Introspect to return, or None
+        #if we are not introspecting
+        self._pending_introspect_queue = None
+        #dictionary mapping method names to their input signatures; shared
+        #and never modified until the Introspect reply replaces it
+        self._introspect_method_map = _EMPTY_METHOD_MAP
+        #the dbus._expat_introspect_parser._Introspection from which
+        #_introspect_method_map came, or None
+        self._introspect_data = None
+        #lock for the introspection state, or None if we are not
+        #introspecting
+        self._introspect_lock = None
+        #dictionary mapping (member, interface) to proxy method, or None
+        self._method_cache = None
+
+        #: None if property caching is disabled, or a dbus._lru.LRUCache
+        #: mapping interface names to dicts mapping property names to
+        #: their values
+        self._property_cache = None
+        #: SignalMatch for PropertiesChanged, or None if not yet connected
+        self._property_cache_match = None
+        self._property_cache_lock = None
+        #: The ObjectManagerClient whose match rule keeps the cache up to
+        #: date, for proxies made by one, or None
+        self._property_cache_source = None
+        if cache_properties:
+            self._property_cache = LRUCache(
+                    self.PROPERTY_CACHE_MAX_INTERFACES)
+            self._property_cache_lock = RLock()
 
         if not introspect or self.__dbus_object_path__ == LOCAL_PATH:
             self._introspect_state = self.INTROSPECT_STATE_DONT_INTROSPECT
         else:
             self._introspect_state = self.INTROSPECT_STATE_INTROSPECT_IN_PROGRESS
+            self._pending_introspect_queue = []
+            # must be a recursive lock because block() is called while
+            # locked, and calls the callback which re-takes the lock
+            self._introspect_lock = RLock()
 
             self._pending_introspect = self._Introspect()
 
@@ -361,6 +435,127 @@ class ProxyObject(object):
                                       path=self.__dbus_object_path__,
                                       **keywords)
 
+    def _require_property_cache(self):
+        if self._property_cache is None:
+            raise RuntimeError('%r was not created with cache_properties=True'
+                               % self)
+
+    def _property_cache_fill(self, dbus_interface):
+        # subscribe before fetching, so no change can slip in between; an
+        # ObjectManagerClient has already subscribed for all its objects
+        source = self._property_cache_source
+        if source is None and self._property_cache_match is None:
+            self._property_cache_match = self.connect_to_signal(
+                    'PropertiesChanged', self._property_cache_changed,
+                    PROPERTIES_IFACE)
+        values = dict(self._bus.call_blocking(self._named_service,
+                                              self.__dbus_object_path__,
+                                              PROPERTIES_IFACE, 'GetAll',
+                                              's', (dbus_interface,)))
+        if source is not None:
+            values = source._property_cache_fetched(
+                    self.__dbus_object_path__, dbus_interface, values)
+        self._property_cache[dbus_interface] = values
+        return values
+
+    def _property_cache_seed(self, dbus_interface, values):
+        # used by ObjectManagerClient: the dict is shared with the mirror,
+        # which keeps it up to date
+        self._property_cache_lock.acquire()
+        try:
+            self._property_cache[dbus_interface] = values
+        finally:
+            self._property_cache_lock.release()
+
+    def _property_cache_changed(self, dbus_interface, changed, invalidated):
+        self._property_cache_lock.acquire()
+        try:
+            values = self._property_cache.peek(dbus_interface)
+            if values is None:
+                return
+            values.update(changed)
+            for name in invalidated:
+                values.pop(name, None)
+        finally:
+            self._property_cache_lock.release()
+
+    def get_cached_property(self, dbus_interface, property_name):
+        """Return the value of a property of the remote object, from the
+        local cache if possible.
+
+        The first access to each interface fetches all its properties with
+        a blocking GetAll call; after that, values are served locally and
+        updated by the PropertiesChanged signal. Properties which the
+        remote object only reports as invalidated are fetched again with a
+        blocking Get call the next time they are accessed.
+
+        :Raises RuntimeError: if the proxy was not created with
+            ``cache_properties=True``
+        :Raises DBusException: if the property cannot be fetched
+        :Since: 0.84.0
+        """
+        self._require_property_cache()
+        self._property_cache_lock.acquire()
+        try:
+            values = self._property_cache.get(dbus_interface)
+            if values is None:
+                values = self._property_cache_fill(dbus_interface)
+
+            if property_name not in values:
+                values[property_name] = self._bus.call_blocking(
+                        self._named_service, self.__dbus_object_path__,
+                        PROPERTIES_IFACE, 'Get', 'ss',
+                        (dbus_interface, property_name))
+            return values[property_name]
+        finally:
+            self._property_cache_lock.release()
+
+    def get_cached_properties(self, dbus_interface):
+        """Return a dict of all the properties of the given interface,
+        from the local cache if possible. See `get_cached_property`.
+
+        :Since: 0.84.0
+        """
+        self._require_property_cache()
+        self._property_cache_lock.acquire()
+        try:
+            values = self._property_cache.get(dbus_interface)
+            if values is None:
+                values = self._property_cache_fill(dbus_interface)
+            return dict(values)
+        finally:
+            self._property_cache_lock.release()
+
+    def invalidate_cached_properties(self, dbus_interface=None):
+        """Discard the cached properties of the given interface, or of
+        all interfaces if `dbus_interface` is None, so they are fetched again
+        when next accessed.
+
+        :Since: 0.84.0
+        """
+        self._require_property_cache()
+        self._property_cache_lock.acquire()
+        try:
+            if dbus_interface is None:
+                self._property_cache.clear()
+            else:
+                self._property_cache.pop(dbus_interface)
+        finally:
+            self._property_cache_lock.release()
+
+    def refresh_cached_properties(self, dbus_interface):
+        """Fetch all the properties of the given interface again,
+        replacing any cached values.
+
+        :Since: 0.84.0
+        """
+        self._require_property_cache()
+        self._property_cache_lock.acquire()
+        try:
+            self._property_cache_fill(dbus_interface)
+        finally:
+            self._property_cache_lock.release()
+
     def _Introspect(self):
         return self._bus.call_async(self._named_service,
                                     self.__dbus_object_path__,
@@ -370,24 +565,39 @@ class ProxyObject(object):
                                     utf8_strings=True,
                                     require_main_loop=False)
 
+    def _add_reply_signature(self, key, keywords):
+        # the out-signature from introspection, if any, lets the reply be
+        # decoded by a plan compiled in advance
+        info = self._introspect_data
+        if info is not None:
+            reply_signature = info.reply_map.get(key)
+            if reply_signature is not None:
+                keywords.setdefault('reply_signature', reply_signature)
+
     def _introspect_execute_queue(self):
         # FIXME: potential to flood the bus
         # We should make sure mainloops all have idle handlers
         # and do one message per idle
-        for (proxy_method, args, keywords) in self._pending_introspect_queue:
-            proxy_method(*args, **keywords)
+        queue = self._pending_introspect_queue
+        self._pending_introspect_queue = None
+        if queue:
+            for (proxy_method, args, keywords) in queue:
+                proxy_method(*args, **keywords)
 
     def _introspect_reply_handler(self, data):
         self._introspect_lock.acquire()
         try:
             try:
-                self._introspect_method_map = process_introspection_data(data)
+                info = parse_introspection_data(data)
             except IntrospectionParserException, e:
                 self._introspect_error_handler(e)
                 return
 
+            self._introspect_data = info
+            self._introspect_method_map = info.method_map
             self._introspect_state = self.INTROSPECT_STATE_INTROSPECT_DONE
             self._pending_introspect = None
+            self._method_cache = None
             self._introspect_execute_queue()
         finally:
             self._introspect_lock.release()
@@ -403,6 +613,7 @@ class ProxyObject(object):
             _logger.debug('Executing introspect queue due to error')
             self._introspect_state = self.INTROSPECT_STATE_DONT_INTROSPECT
             self._pending_introspect = None
+            self._method_cache = None
             self._introspect_execute_queue()
         finally:
             self._introspect_lock.release()
@@ -456,7 +667,17 @@ class ProxyObject(object):
 
         For services which follow the D-Bus convention of CamelCaseMethodNames
         this won't be a problem.
+
+        Changed in 0.84.0: once introspection has finished (or if it
+        is disabled), the same proxy method object is returned for
+        repeated requests for the same method and interface.
         """
+        key = (member, dbus_interface)
+        cache = self._method_cache
+        if cache is not None:
+            ret = cache.get(key)
+            if ret is not None:
+                return ret
 
         ret = self.ProxyMethodClass(self, self._bus,
                                     self._named_service,
@@ -468,9 +689,15 @@ class ProxyObject(object):
         # finishing introspection, in which case _introspect_add_to_queue and
         # _introspect_block will do the right thing anyway
         if self._introspect_state == self.INTROSPECT_STATE_INTROSPECT_IN_PROGRESS:
-            ret = self.DeferredMethodClass(ret, self._introspect_add_to_queue,
-                                           self._introspect_block)
-
+            return self.DeferredMethodClass(ret, self._introspect_add_to_queue,
+                                            self._introspect_block)
+
+        # the introspection state can't change any more, so the method
+        # can be reused
+        if cache is None:
+            cache = self._method_cache = {}
+        if len(cache) < self.METHOD_CACHE_MAX_SIZE:
+            cache[key] = ret
         return ret
 
     def __repr__(self):
@@ -555,3 +782,259 @@ class Interface(object):
         return '<Interface %r implementing %r at %#x>'%(
         self._obj, self._dbus_interface, id(self))
     __str__ = __repr__
+
+
+class ObjectManagerClient(object):
+    """A local mirror of the objects managed by a remote
+    ``org.freedesktop.DBus.ObjectManager``.
+
+    The mirror is filled by a single GetManagedObjects call and kept up
+    to date by the InterfacesAdded, InterfacesRemoved and PropertiesChanged
+    signals, using three match rules however many objects there are.
+    `ProxyObject` instances are only created when `get_object` is called;
+    they are not introspected, and their property caches (see
+    `ProxyObject.get_cached_property`) are pre-seeded from the mirror.
+    Properties they fetch themselves are kept up to date by the mirror's
+    match rules too, rather than by a match rule per proxy.
+
+    The PropertiesChanged match rule covers every object of the remote
+    application, since match rules cannot be restricted to the object
+    manager's subtree on every bus daemon; changes to objects the mirror
+    does not manage are ignored.
+
+    The bus name is resolved to a unique name once, when the mirror is
+    created; if the remote service is restarted, a new mirror is needed.
+    This requires a main loop.
+
+    :Since: 0.84.0
+    """
+
+    def __init__(self, conn, bus_name, object_path):
+        """Constructor.
+
+        :Parameters:
+            `conn` : `dbus.connection.Connection`
+                The bus or connection on which to find the object manager.
+            `bus_name` : str
+                A bus name for the application owning the object manager.
+            `object_path` : str
+                The object path at which the application exports the
+                object manager.
+        """
+        # we don't get the signals unless the Bus has a main loop
+        # XXX: using Bus internals
+        conn._require_main_loop()
+
+        if bus_name is not None:
+            _dbus_bindings.validate_bus_name(bus_name)
+        _dbus_bindings.validate_object_path(object_path)
+
+        self._bus = conn
+        self._named_service = conn.activate_name_owner(bus_name)
+        self._object_path = object_path
+
+        self.on_interfaces_added = []
+        """A list of callbacks to invoke when an object gains interfaces.
+        They receive two arguments: the object path and a dict mapping the
+        new interface names to dicts of their properties."""
+
+        self.on_interfaces_removed = []
+        """A list of callbacks to invoke when an object loses interfaces.
+        They receive two arguments: the object path and a list of the
+        removed interface names."""
+
+        #: Map from object path to dict mapping interface name to dict
+        #: mapping property name to value
+        self._objects = {}
+        #: Map from object path to ProxyObject, for objects whose proxy
+        #: has been created
+        self._proxies = {}
+        #: Lock protecting _objects and _proxies; the proxies' property
+        #: caches share the dicts in _objects, so they use it too
+        self._lock = RLock()
+
+        # subscribe before fetching, so no change can slip in between
+        self._matches = [
+            conn.add_signal_receiver(self._interfaces_added,
+                                     'InterfacesAdded', OBJECT_MANAGER_IFACE,
+                                     self._named_service, object_path),
+            conn.add_signal_receiver(self._interfaces_removed,
+                                     'InterfacesRemoved',
+                                     OBJECT_MANAGER_IFACE,
+                                     self._named_service, object_path),
+            conn.add_signal_receiver(self._properties_changed,
+                                     'PropertiesChanged', PROPERTIES_IFACE,
+                                     self._named_service,
+                                     path_keyword='path'),
+            ]
+        self.refresh()
+
+    bus_name = property(lambda self: self._named_service, None, None,
+            """The unique name of the application owning the object
+            manager.""")
+
+    object_path = property(lambda self: self._object_path, None, None,
+            """The object-path of the object manager.""")
+
+    def refresh(self):
+        """Replace the mirror's contents with the result of a new
+        GetManagedObjects call. Proxies already returned by `get_object`
+        are re-seeded, or forgotten if their object has gone away.
+        """
+        managed = self._bus.call_blocking(self._named_service,
+                                          self._object_path,
+                                          OBJECT_MANAGER_IFACE,
+                                          'GetManagedObjects', '', ())
+        self._lock.acquire()
+        try:
+            self._objects = {}
+            for (path, interfaces) in managed.iteritems():
+                self._objects[path] = dict([(name, dict(values))
+                                            for (name, values)
+                                            in interfaces.iteritems()])
+            for (path, proxy) in self._proxies.items():
+                interfaces = self._objects.get(path)
+                if interfaces is None:
+                    del self._proxies[path]
+                    continue
+                proxy.invalidate_cached_properties()
+                for (name, values) in interfaces.iteritems():
+                    proxy._property_cache_seed(name, values)
+        finally:
+            self._lock.release()
+
+    def close(self):
+        """Stop updating the mirror."""
+        for match in self._matches:
+            match.remove()
+        self._matches = []
+
+    def __contains__(self, object_path):
+        return object_path in self._objects
+
+    def __len__(self):
+        return len(self._objects)
+
+    def get_object_paths(self):
+        """Return a list of the paths of the managed objects."""
+        return self._objects.keys()
+
+    def get_interfaces(self, object_path):
+        """Return a list of the interfaces implemented by the given
+        managed object.
+
+        :Raises KeyError: if the object is not managed
+        """
+        return self._objects[object_path].keys()
+
+    def get_properties(self, object_path, dbus_interface):
+        """Return a dict of the properties of a managed object on the
+        given interface, from the mirror.
+
+        :Raises KeyError: if the object is not managed or does not
+            implement the interface
+        """
+        self._lock.acquire()
+        try:
+            return dict(self._objects[object_path][dbus_interface])
+        finally:
+            self._lock.release()
+
+    def get_object(self, object_path):
+        """Return a `ProxyObject` for the given managed object, creating
+        it if necessary. The proxy is created with ``introspect=False``,
+        so methods should be called with an explicit interface (for
+        instance through `Interface`), and with ``cache_properties=True``,
+        its cache already holding the mirrored properties.
+
+        :Raises KeyError: if the object is not managed
+        """
+        self._lock.acquire()
+        try:
+            proxy = self._proxies.get(object_path)
+            if proxy is None:
+                interfaces = self._objects[object_path]
+                proxy = self._bus.ProxyObjectClass(self._bus,
+                                                   self._named_service,
+                                                   object_path,
+                                                   introspect=False,
+                                                   cache_properties=True)
+                proxy._property_cache_lock = self._lock
+                proxy._property_cache_source = self
+                for (name, values) in interfaces.iteritems():
+                    proxy._property_cache_seed(name, values)
+                self._proxies[object_path] = proxy
+            return proxy
+        finally:
+            self._lock.release()
+
+    def _interfaces_added(self, object_path, interfaces):
+        self._lock.acquire()
+        try:
+            mirrored = self._objects.setdefault(object_path, {})
+            proxy = self._proxies.get(object_path)
+            for (name, values) in interfaces.iteritems():
+                values = mirrored[name] = dict(values)
+                if proxy is not None:
+                    proxy._property_cache_seed(name, values)
+        finally:
+            self._lock.release()
+
+        for cb in self.on_interfaces_added:
+            cb(object_path, interfaces)
+
+    def _interfaces_removed(self, object_path, interfaces):
+        self._lock.acquire()
+        try:
+            mirrored = self._objects.get(object_path)
+            if mirrored is None:
+                return
+            proxy = self._proxies.get(object_path)
+            for name in interfaces:
+                mirrored.pop(name, None)
+                if proxy is not None:
+                    proxy.invalidate_cached_properties(name)
+            if not mirrored:
+                del self._objects[object_path]
+                self._proxies.pop(object_path, None)
+        finally:
+            self._lock.release()
+
+        for cb in self.on_interfaces_removed:
+            cb(object_path, interfaces)
+
+    def _property_cache_fetched(self, object_path, dbus_interface, values):
+        # Called, with the lock held, when a proxy from get_object fetches
+        # all the properties of an interface: return the dict it should
+        # cache, which is the mirror's own if the interface is mirrored.
+        mirrored = self._objects.get(object_path, {}).get(dbus_interface)
+        if mirrored is None:
+            return values
+        mirrored.clear()
+        mirrored.update(values)
+        return mirrored
+
+    def _properties_changed(self, dbus_interface, changed, invalidated,
+                            path):
+        self._lock.acquire()
+        try:
+            values = self._objects.get(path, {}).get(dbus_interface)
+            if values is None:
+                # unmanaged objects are ignored; for an interface the
+                # mirror doesn't hold, the object's proxy may have fetched
+                # the properties itself
+                proxy = self._proxies.get(path)
+                if proxy is not None:
+                    proxy._property_cache_changed(dbus_interface, changed,
+                                                  invalidated)
+                return
+            values.update(changed)
+            for name in invalidated:
+                values.pop(name, None)
+        finally:
+            self._lock.release()
+
+    def __repr__(self):
+        return '<ObjectManagerClient for %s %s at %#x>' % (
+            self._named_service, self._object_path, id(self))
+    __str__ = __repr__
@@ -24,9 +24,17 @@
 __all__ = ('Server', )
 __docformat__ = 'reStructuredText'
 
+import errno
+import logging
+import os
+import select
+
 from _dbus_bindings import _Server
 from dbus.connection import Connection
 
+
+_logger = logging.getLogger('dbus.server')
+
 class Server(_Server):
     """An opaque object representing a server that listens for connections from
     other applications.
@@ -71,12 +79,228 @@ class Server(_Server):
         disconnected. They receive two arguments: this Server and the removed
         Connection."""
 
+        self.on_worker_connection_added = []
+        """In the parent process of a `fork_workers` Server, a list of
+        callbacks to invoke when a worker process accepts a connection.
+        They receive two arguments: the worker's process ID and a serial
+        number identifying the connection within that worker."""
+
+        self.on_worker_connection_removed = []
+        """In the parent process of a `fork_workers` Server, a list of
+        callbacks to invoke when a connection in a worker process becomes
+        disconnected, including each of its remaining connections when a
+        worker exits or is killed. They receive the same arguments as the
+        callbacks in `on_worker_connection_added`."""
+
+        #: Map from the PID of each running worker to the number of
+        #: connections it is serving (parent process only)
+        self.worker_connection_counts = {}
+
+        #: Map from the read end of each worker's report pipe to its PID
+        #: (parent process only)
+        self.__worker_pipes = {}
+        #: Map from worker PID to its index (parent process only)
+        self.__worker_indices = {}
+        #: Map from worker PID to the set of serial numbers of the
+        #: connections it has reported and not yet reported removed
+        #: (parent process only)
+        self.__worker_serials = {}
+        #: Write end of the report pipe (worker processes only)
+        self.__report_fd = None
+        #: Map from Connection to its serial number (worker processes only)
+        self.__connection_serials = {}
+        self.__next_serial = 0
+
     # This method name is hard-coded in _dbus_bindings._Server.
     # This is not public API.
     def _on_new_connection(self, conn):
         conn.call_on_disconnection(self.connection_removed)
+        if self.__report_fd is not None:
+            conn.call_on_disconnection(self.__report_connection_removed)
+            self.__next_serial += 1
+            self.__connection_serials[conn] = self.__next_serial
+            self.__report('+', self.__next_serial)
         self.connection_added(conn)
 
+    def __report(self, event, serial):
+        try:
+            os.write(self.__report_fd, '%s %d\n' % (event, serial))
+        except OSError, e:
+            # the parent has gone away; carry on serving regardless
+            _logger.debug('Unable to report %s%d to parent: %s',
+                          event, serial, e)
+
+    def __report_connection_removed(self, conn):
+        serial = self.__connection_serials.pop(conn, None)
+        if serial is not None:
+            self.__report('-', serial)
+
+    def fork_workers(self, n_workers, respawn=False):
+        """Fork `n_workers` worker processes which share this Server's
+        listening socket, so that each new connection is accepted by
+        exactly one of them.
+
+        This must be called before the main loop starts running. Each
+        worker should then export its objects (usually from a callback in
+        `on_connection_added`) and run its own main loop; the parent
+        should call `supervise_workers` instead of running a main loop,
+        so that it never accepts connections itself.
+
+        :Parameters:
+            `n_workers` : int
+                The number of worker processes to start.
+            `respawn` : bool
+                If true, the parent does not return until every worker
+                has exited, supervising them as `supervise_workers` does
+                (so it should not be called), and replaces any worker
+                killed by a signal with a new worker process with the
+                same index. The new worker returns from this method like
+                the original ones.
+        :Returns: 0 in the parent process, or the index of the worker
+            (1 to `n_workers` inclusive) in each worker process.
+        :Since: 0.84.0
+        """
+        if n_workers < 1:
+            raise ValueError('n_workers must be at least 1, not %d'
+                             % n_workers)
+        if self.__report_fd is not None:
+            raise RuntimeError('fork_workers cannot be called in a worker '
+                               'process')
+
+        for index in xrange(1, n_workers + 1):
+            if self.__fork_worker(index):
+                return index
+
+        if respawn:
+            return self.__supervise(True)[0]
+        return 0
+
+    def __fork_worker(self, index):
+        # Return True in the new worker process, False in the parent.
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # in the worker: we don't want to hold the parent's view
+            # of the other workers open
+            os.close(read_fd)
+            for fd in self.__worker_pipes:
+                os.close(fd)
+            self.__worker_pipes = {}
+            self.__worker_indices = {}
+            self.__worker_serials = {}
+            self.worker_connection_counts = {}
+            self.__report_fd = write_fd
+            return True
+
+        os.close(write_fd)
+        self.__worker_pipes[read_fd] = pid
+        self.__worker_indices[pid] = index
+        self.__worker_serials[pid] = set()
+        self.worker_connection_counts[pid] = 0
+        return False
+
+    def supervise_workers(self):
+        """In the parent process after `fork_workers`, block until every
+        worker process has exited, invoking the callbacks in
+        `on_worker_connection_added` and `on_worker_connection_removed`
+        as the workers report their connections.
+
+        :Returns: a dict mapping the PID of each worker to its exit status
+            as returned by `os.waitpid`.
+        :Since: 0.84.0
+        """
+        if self.__report_fd is not None:
+            raise RuntimeError('supervise_workers cannot be called in a '
+                               'worker process')
+        return self.__supervise(False)[1]
+
+    def __supervise(self, respawn):
+        # Return (0, statuses) in the parent once every worker has exited,
+        # or (index, None) in a worker started to replace a killed one.
+        buffers = dict.fromkeys(self.__worker_pipes, '')
+        statuses = {}
+
+        while self.__worker_pipes:
+            try:
+                readable = select.select(self.__worker_pipes.keys(),
+                                         [], [])[0]
+            except select.error, e:
+                if e.args[0] == errno.EINTR:
+                    continue
+                raise
+
+            for fd in readable:
+                pid = self.__worker_pipes[fd]
+                data = os.read(fd, 4096)
+
+                if not data:
+                    os.close(fd)
+                    del self.__worker_pipes[fd]
+                    del buffers[fd]
+                    index = self.__worker_indices.pop(pid)
+                    status = statuses[pid] = os.waitpid(pid, 0)[1]
+                    # the worker's connections went away with it, whether
+                    # or not it managed to report that
+                    for serial in sorted(self.__worker_serials.pop(pid)):
+                        self.__run_callbacks(
+                                self.on_worker_connection_removed, pid,
+                                serial)
+                    del self.worker_connection_counts[pid]
+                    if respawn and os.WIFSIGNALED(status):
+                        _logger.warning('Worker %d (process %d) was killed '
+                                        'by signal %d: starting a new one',
+                                        index, pid, os.WTERMSIG(status))
+                        if self.__fork_worker(index):
+                            return index, None
+                        for new_fd in self.__worker_pipes:
+                            buffers.setdefault(new_fd, '')
+                    continue
+
+                lines = (buffers[fd] + data).split('\n')
+                buffers[fd] = lines.pop()
+                for line in lines:
+                    self.__handle_report(pid, line)
+
+        return 0, statuses
+
+    def __handle_report(self, pid, line):
+        try:
+            event, serial = line.split(' ', 1)
+            serial = int(serial)
+        except ValueError:
+            _logger.warning('Ignoring malformed report %r from worker %d',
+                            line, pid)
+            return
+
+        serials = self.__worker_serials[pid]
+        if event == '+':
+            serials.add(serial)
+            callbacks = self.on_worker_connection_added
+        elif event == '-':
+            if serial not in serials:
+                _logger.warning('Ignoring removal of unknown connection %d '
+                                'from worker %d', serial, pid)
+                return
+            serials.discard(serial)
+            callbacks = self.on_worker_connection_removed
+        else:
+            _logger.warning('Ignoring unknown report %r from worker %d',
+                            line, pid)
+            return
+
+        self.worker_connection_counts[pid] = len(serials)
+        self.__run_callbacks(callbacks, pid, serial)
+
+    def __run_callbacks(self, callbacks, pid, serial):
+        for cb in callbacks:
+            try:
+                cb(pid, serial)
+            except:
+                # basicConfig is a no-op if logging is already configured
+                logging.basicConfig()
+                _logger.error('Exception in worker connection callback:',
+                              exc_info=1)
+
     def connection_added(self, conn):
         """Respond to the creation of a new Connection.
 
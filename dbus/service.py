@@ -23,7 +23,8 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
-__all__ = ('BusName', 'Object', 'method', 'signal')
+__all__ = ('BusName', 'Object', 'VirtualSubtree', 'PropertiesInterface',
+           'ObjectManagerInterface', 'method', 'signal', 'property')
 __docformat__ = 'restructuredtext'
 
 import sys
@@ -37,13 +38,24 @@ except ImportError:
 
 import _dbus_bindings
 from dbus import SessionBus, Signature, Struct, validate_bus_name, \
-                 validate_object_path, INTROSPECTABLE_IFACE, ObjectPath
-from dbus.decorators import method, signal
+                 validate_object_path, INTROSPECTABLE_IFACE, ObjectPath, \
+                 PROPERTIES_IFACE, OBJECT_MANAGER_IFACE, Dictionary, Array
+from dbus.decorators import method, signal, _send_signal
+from dbus.decorators import property as _property_decorator
 from dbus.exceptions import DBusException, \
                             NameExistsException, \
-                            UnknownMethodException
-from dbus.lowlevel import ErrorMessage, MethodReturnMessage, MethodCallMessage
+                            UnknownMethodException, \
+                            UnknownPropertyException, \
+                            ReadOnlyPropertyException, \
+                            UnknownObjectException, \
+                            InvalidArgsException
+from dbus.lowlevel import ErrorMessage, MethodReturnMessage, \
+                          MethodCallMessage, SignalMessage
 from dbus.proxies import LOCAL_PATH
+from dbus.connection import _timed_append, _timed_get_args_list
+from dbus.profiling import _call_profiled
+from dbus.shm import _map_unix_fds
+from dbus._lru import LRUCache
 
 
 _logger = logging.getLogger('dbus.service')
@@ -248,8 +260,12 @@ def _method_lookup(self, method_name, dbus_interface):
 
 def _method_reply_return(connection, message, method_name, signature, *retval):
     reply = MethodReturnMessage(message)
+    metrics = connection._metrics
     try:
-        reply.append(signature=signature, *retval)
+        if metrics is None:
+            reply.append(signature=signature, *retval)
+        else:
+            _timed_append(metrics, reply, signature, retval)
     except Exception, e:
         logging.basicConfig()
         if signature is None:
@@ -320,6 +336,17 @@ class InterfaceType(type):
 
         super(InterfaceType, cls).__init__(name, bases, dct)
 
+    def __call__(cls, *args, **keywords):
+        obj = super(InterfaceType, cls).__call__(*args, **keywords)
+        # object managers are only told about an Object exported by its
+        # constructor once the whole constructor has returned, so that a
+        # subclass can set up the state its properties depend on after
+        # chaining up
+        announce = getattr(obj, '_dbus_announce', None)
+        if announce is not None:
+            announce()
+        return obj
+
     # methods are different to signals, so we have two functions... :)
     def _reflect_on_method(cls, func):
         args = func._dbus_args
@@ -368,13 +395,198 @@ class InterfaceType(type):
 
         return reflection_data
 
+    def _reflect_on_property(cls, prop):
+        if prop.fset is None:
+            access = 'read'
+        else:
+            access = 'readwrite'
+
+        emits = prop._dbus_emits_changed_signal
+        if emits is True:
+            return ('    <property name="%s" type="%s" access="%s" />\n'
+                    % (prop.__name__, prop._dbus_signature, access))
+
+        if emits is False:
+            emits = 'false'
+        reflection_data = ('    <property name="%s" type="%s" access="%s">\n'
+                           % (prop.__name__, prop._dbus_signature, access))
+        reflection_data += ('      <annotation name="org.freedesktop.DBus.'
+                            'Property.EmitsChangedSignal" value="%s" />\n'
+                            % emits)
+        reflection_data += '    </property>\n'
+
+        return reflection_data
+
 class Interface(object):
     __metaclass__ = InterfaceType
 
+class _SignalBatch(object):
+    """Queues the signals emitted by an Object, so they can all be sent
+    in one pass and flushed once. See `Object.signal_batch`.
+    """
+
+    __slots__ = ('_object', '_coalesce', '_active', '_queue', '_index',
+                 '_lock')
+
+    def __init__(self, obj, coalesce):
+        self._object = obj
+        self._coalesce = coalesce
+        #: True if this batch is the one the object is queueing signals in
+        self._active = False
+        #: List of (connection, message) tuples or None (coalesced away)
+        self._queue = []
+        #: Map from (connection, path, interface, member) to the index
+        #: of the latest such signal in _queue
+        self._index = {}
+        self._lock = thread.allocate_lock()
+
+    def __enter__(self):
+        obj = self._object
+        lock = obj._get_locations_lock()
+        lock.acquire()
+        try:
+            # nested batches are absorbed into the outermost one
+            if obj._signal_batch is None:
+                obj._signal_batch = self
+                self._active = True
+        finally:
+            lock.release()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._active:
+            obj = self._object
+            lock = obj._get_locations_lock()
+            lock.acquire()
+            try:
+                obj._signal_batch = None
+                self._active = False
+            finally:
+                lock.release()
+            # property changes made during the batch were merged, to be
+            # emitted as one PropertiesChanged per interface
+            flush_properties = getattr(obj, '_dbus_flush_properties_changed',
+                                       None)
+            if flush_properties is not None:
+                flush_properties()
+            self.flush()
+        return False
+
+    def queue(self, connection, message, key):
+        """Queue `message` for sending on `connection`. `key` is a tuple
+        (object path, interface, member) used for coalescing.
+        """
+        self._lock.acquire()
+        try:
+            if self._coalesce:
+                key = (connection,) + key
+                previous = self._index.get(key)
+                if previous is not None:
+                    self._queue[previous] = None
+                self._index[key] = len(self._queue)
+            self._queue.append((connection, message))
+        finally:
+            self._lock.release()
+
+    def flush(self):
+        """Send all the signals queued so far, then flush each connection
+        they were sent on.
+        """
+        self._lock.acquire()
+        try:
+            queue = self._queue
+            self._queue = []
+            self._index = {}
+        finally:
+            self._lock.release()
+
+        connections = []
+        for item in queue:
+            if item is None:
+                continue
+            connection, message = item
+            connection.send_message(message)
+            if connection not in connections:
+                connections.append(connection)
+
+        for connection in connections:
+            connection.flush()
+
+
 #: A unique object used as the value of Object._object_path and
 #: Object._connection if it's actually in more than one place
 _MANY = object()
 
+#: Lock held while allocating an Object's _locations_lock
+_locations_lock_allocation = thread.allocate_lock()
+
+def _object_added(connection, path, obj):
+    """Record that `obj` has been exported at `path` on `connection`, and
+    tell any object managers above that path.
+    """
+    tree = getattr(connection, '_object_tree', None)
+    if tree is None:
+        # not a dbus.connection.Connection
+        return
+    tree[path] = obj
+
+    managers = connection._object_managers
+    if getattr(obj, '_dbus_is_object_manager', False):
+        managers[path] = obj
+        obj._dbus_manage(connection, path, tree.descendants(path))
+    if managers:
+        for (root, ancestor) in tree.ancestors(path):
+            if managers.get(root) is ancestor:
+                ancestor._dbus_object_added(connection, root, path, obj)
+
+
+def _object_removed(connection, path, obj):
+    """Undo `_object_added`."""
+    tree = getattr(connection, '_object_tree', None)
+    if tree is None or not tree.remove(path, obj):
+        return
+
+    managers = connection._object_managers
+    if managers.get(path) is obj:
+        del managers[path]
+        obj._dbus_unmanage(connection, path)
+    if managers:
+        for (root, ancestor) in tree.ancestors(path):
+            if managers.get(root) is ancestor:
+                ancestor._dbus_object_removed(connection, root, path, obj)
+
+
+def _introspection_data(obj, object_path, children):
+    """Return introspection XML for the node `object_path`, implemented by
+    `obj` (or by nothing, if `obj` is None) and with the given child names.
+    """
+    reflection_data = _dbus_bindings.DBUS_INTROSPECT_1_0_XML_DOCTYPE_DECL_NODE
+    reflection_data += '<node name="%s">\n' % object_path
+
+    if obj is not None:
+        cls = obj.__class__
+        interfaces = obj._dbus_class_table[cls.__module__ + '.' + cls.__name__]
+        for (name, funcs) in interfaces.iteritems():
+            reflection_data += '  <interface name="%s">\n' % (name)
+
+            for func in funcs.values():
+                if getattr(func, '_dbus_is_method', False):
+                    reflection_data += cls._reflect_on_method(func)
+                elif getattr(func, '_dbus_is_signal', False):
+                    reflection_data += cls._reflect_on_signal(func)
+                elif getattr(func, '_dbus_is_property', False):
+                    reflection_data += cls._reflect_on_property(func)
+
+            reflection_data += '  </interface>\n'
+
+    for name in children:
+        reflection_data += '  <node name="%s"/>\n' % name
+
+    reflection_data += '</node>\n'
+
+    return reflection_data
+
+
 class Object(Interface):
     r"""A base class for exporting your own Objects across the Bus.
 
@@ -418,6 +630,32 @@ class Object(Interface):
     #: have the same object path on all its connections.
     SUPPORTS_MULTIPLE_CONNECTIONS = False
 
+    #: The `_SignalBatch` in which signals are being queued, or None
+    _signal_batch = None
+
+    # The per-instance state below is only stored on the instance when it
+    # differs from these defaults, so that an Object which is not exported
+    # needs no instance dictionary at all.
+
+    #: Either an object path, None or _MANY
+    _object_path = None
+    #: Either a dbus.connection.Connection, None or _MANY
+    _connection = None
+    #: A tuple of tuples (Connection, object path, fallback), replaced
+    #: rather than modified so it can be iterated without locking
+    _locations = ()
+    #: Lock protecting `_locations`, `_connection`, `_object_path` and
+    #: `_signal_batch`, or None if `_get_locations_lock` has not been
+    #: called yet
+    _locations_lock = None
+    #: True if this is a fallback object handling a whole subtree.
+    _fallback = False
+    #: The BusName whose lifetime is tied to this object, or None
+    _name = None
+    #: Tuple of (Connection, object path) at which the constructor exported
+    #: this object, but which have not yet been announced to object managers
+    _dbus_unannounced = ()
+
     def __init__(self, conn=None, object_path=None, bus_name=None):
         """Constructor. Either conn or bus_name is required; object_path
         is also required.
@@ -458,26 +696,28 @@ class Object(Interface):
                 # someone's using the old API but naming arguments, probably
                 conn = bus_name.get_bus()
 
-        #: Either an object path, None or _MANY
-        self._object_path = None
-        #: Either a dbus.connection.Connection, None or _MANY
-        self._connection = None
-        #: A list of tuples (Connection, object path, False) where the False
-        #: is for future expansion (to support fallback paths)
-        self._locations = []
-        #: Lock protecting `_locations`, `_connection` and `_object_path`
-        self._locations_lock = thread.allocate_lock()
-
-        #: True if this is a fallback object handling a whole subtree.
-        self._fallback = False
-
-        self._name = bus_name
+        if bus_name is not None:
+            self._name = bus_name
 
         if conn is None and object_path is not None:
             raise TypeError('If object_path is given, either conn or bus_name '
                             'is required')
         if conn is not None and object_path is not None:
-            self.add_to_connection(conn, object_path)
+            self._dbus_export(conn, object_path)
+            self._dbus_unannounced += ((conn, object_path),)
+
+    def _get_locations_lock(self):
+        lock = self._locations_lock
+        if lock is None:
+            _locations_lock_allocation.acquire()
+            try:
+                # another thread might have got here first
+                lock = self._locations_lock
+                if lock is None:
+                    lock = self._locations_lock = thread.allocate_lock()
+            finally:
+                _locations_lock_allocation.release()
+        return lock
 
     @property
     def __dbus_object_path__(self):
@@ -548,11 +788,16 @@ class Object(Interface):
             object to be exported in the desired way.
         :Since: 0.82.0
         """
+        self._dbus_export(connection, path)
+        _object_added(connection, path, self)
+
+    def _dbus_export(self, connection, path):
         if path == LOCAL_PATH:
             raise ValueError('Objects may not be exported on the reserved '
                              'path %s' % LOCAL_PATH)
 
-        self._locations_lock.acquire()
+        lock = self._get_locations_lock()
+        lock.acquire()
         try:
             if (self._connection is not None and
                 self._connection is not connection and
@@ -580,9 +825,21 @@ class Object(Interface):
             elif self._object_path != path:
                 self._object_path = _MANY
 
-            self._locations.append((connection, path, self._fallback))
+            self._locations += ((connection, path, self._fallback),)
         finally:
-            self._locations_lock.release()
+            lock.release()
+
+    def _dbus_announce(self):
+        unannounced = self._dbus_unannounced
+        if not unannounced:
+            return
+        del self._dbus_unannounced
+        for (connection, path) in unannounced:
+            # the constructor might have removed it again
+            for location in self._locations:
+                if location[0] is connection and location[1] == path:
+                    _object_added(connection, path, self)
+                    break
 
     def remove_from_connection(self, connection=None, path=None):
         """Make this object inaccessible via the given D-Bus connection
@@ -601,20 +858,20 @@ class Object(Interface):
             or path, or (if both are None) was not exported at all.
         :Since: 0.81.1
         """
-        self._locations_lock.acquire()
+        lock = self._get_locations_lock()
+        lock.acquire()
         try:
             if self._object_path is None or self._connection is None:
                 raise LookupError('%r is not exported' % self)
 
-            if connection is not None or path is not None:
-                dropped = []
-                for location in self._locations:
-                    if ((connection is None or location[0] is connection) and
-                        (path is None or location[1] == path)):
-                        dropped.append(location)
-            else:
-                dropped = self._locations
-                self._locations = []
+            dropped = []
+            kept = []
+            for location in self._locations:
+                if ((connection is None or location[0] is connection) and
+                    (path is None or location[1] == path)):
+                    dropped.append(location)
+                else:
+                    kept.append(location)
 
             if not dropped:
                 raise LookupError('%r is not exported at a location matching '
@@ -625,19 +882,78 @@ class Object(Interface):
                     location[0]._unregister_object_path(location[1])
                 except LookupError:
                     pass
-                if self._locations:
-                    try:
-                        self._locations.remove(location)
-                    except ValueError:
-                        pass
+            self._locations = tuple(kept)
         finally:
-            self._locations_lock.release()
+            lock.release()
+
+        for location in dropped:
+            _object_removed(location[0], location[1], self)
+
+    def signal_batch(self, coalesce=False):
+        """Return a context manager which queues the signals emitted by
+        this object while it is active, instead of sending each one
+        immediately. When the outermost batch is exited, the queued
+        signals are sent in order and each connection is flushed once.
+        For example::
+
+            with obj.signal_batch():
+                for key, value in changes:
+                    obj.ValueChanged(key, value)
+
+        or, to send only the last of a series of updates::
+
+            with obj.signal_batch(coalesce=True):
+                for percent in xrange(0, 101, 10):
+                    obj.Progress(percent)
+
+        The batch's ``flush()`` method can also be called to send the
+        signals queued so far without ending the batch.
+
+        :Parameters:
+            `coalesce` : bool
+                If True, when the same signal (same connection, object path,
+                interface and member) is emitted more than once during the
+                batch, only the last emission is sent, whatever its
+                arguments.
+        :Since: 0.84.0
+        """
+        return _SignalBatch(self, coalesce)
 
     def _unregister_cb(self, connection):
         # there's not really enough information to do anything useful here
         _logger.info('Unregistering exported object %r from some path '
                      'on %r', self, connection)
 
+    def _rel_path(self, connection, path):
+        tree = getattr(connection, '_object_tree', None)
+        if tree is not None:
+            # libdbus dispatches to the deepest registered ancestor, which
+            # is normally us
+            found = tree.nearest(path)
+            if found is not None and found[1] is self:
+                if found[0] == '/':
+                    return path
+                return path[len(found[0]):] or '/'
+
+        rel_path = path
+        for exp in self._locations:
+            # pathological case: if we're exported in two places,
+            # one of which is a subtree of the other, then pick the
+            # subtree by preference (i.e. minimize the length of
+            # rel_path)
+            if exp[0] is connection:
+                if path == exp[1]:
+                    return '/'
+                if exp[1] == '/':
+                    # we already have rel_path == path at the beginning
+                    continue
+                if path.startswith(exp[1] + '/'):
+                    # yes we're in this exported subtree
+                    suffix = path[len(exp[1]):]
+                    if len(suffix) < len(rel_path):
+                        rel_path = suffix
+        return rel_path
+
     def _message_cb(self, connection, message):
         if not isinstance(message, MethodCallMessage):
             return
@@ -649,7 +965,15 @@ class Object(Interface):
             (candidate_method, parent_method) = _method_lookup(self, method_name, interface_name)
 
             # set up method call parameters
-            args = message.get_args_list(**parent_method._dbus_get_args_options)
+            metrics = connection._metrics
+            if metrics is None:
+                args = message.get_args_list(
+                        **parent_method._dbus_get_args_options)
+            else:
+                args = _timed_get_args_list(metrics, message,
+                        **parent_method._dbus_get_args_options)
+            if parent_method._dbus_shared_memory:
+                args = _map_unix_fds(args)
             keywords = {}
 
             if parent_method._dbus_out_signature is not None:
@@ -669,26 +993,8 @@ class Object(Interface):
             if parent_method._dbus_path_keyword:
                 keywords[parent_method._dbus_path_keyword] = message.get_path()
             if parent_method._dbus_rel_path_keyword:
-                path = message.get_path()
-                rel_path = path
-                for exp in self._locations:
-                    # pathological case: if we're exported in two places,
-                    # one of which is a subtree of the other, then pick the
-                    # subtree by preference (i.e. minimize the length of
-                    # rel_path)
-                    if exp[0] is connection:
-                        if path == exp[1]:
-                            rel_path = '/'
-                            break
-                        if exp[1] == '/':
-                            # we already have rel_path == path at the beginning
-                            continue
-                        if path.startswith(exp[1] + '/'):
-                            # yes we're in this exported subtree
-                            suffix = path[len(exp[1]):]
-                            if len(suffix) < len(rel_path):
-                                rel_path = suffix
-                rel_path = ObjectPath(rel_path)
+                rel_path = ObjectPath(self._rel_path(connection,
+                                                     message.get_path()))
                 keywords[parent_method._dbus_rel_path_keyword] = rel_path
 
             if parent_method._dbus_destination_keyword:
@@ -699,7 +1005,13 @@ class Object(Interface):
                 keywords[parent_method._dbus_connection_keyword] = connection
 
             # call method
-            retval = candidate_method(self, *args, **keywords)
+            profiler = getattr(connection, '_handler_profiler', None)
+            if profiler is None:
+                retval = candidate_method(self, *args, **keywords)
+            else:
+                retval = _call_profiled(profiler, 'method', candidate_method,
+                                        message, (self,) + tuple(args),
+                                        keywords)
 
             # we're done - the method has got callback functions to reply with
             if parent_method._dbus_async_callbacks:
@@ -753,27 +1065,8 @@ class Object(Interface):
         """Return a string of XML encoding this object's supported interfaces,
         methods and signals.
         """
-        reflection_data = _dbus_bindings.DBUS_INTROSPECT_1_0_XML_DOCTYPE_DECL_NODE
-        reflection_data += '<node name="%s">\n' % object_path
-
-        interfaces = self._dbus_class_table[self.__class__.__module__ + '.' + self.__class__.__name__]
-        for (name, funcs) in interfaces.iteritems():
-            reflection_data += '  <interface name="%s">\n' % (name)
-
-            for func in funcs.values():
-                if getattr(func, '_dbus_is_method', False):
-                    reflection_data += self.__class__._reflect_on_method(func)
-                elif getattr(func, '_dbus_is_signal', False):
-                    reflection_data += self.__class__._reflect_on_signal(func)
-
-            reflection_data += '  </interface>\n'
-
-        for name in connection.list_exported_child_objects(object_path):
-            reflection_data += '  <node name="%s"/>\n' % name
-
-        reflection_data += '</node>\n'
-
-        return reflection_data
+        return _introspection_data(self, object_path,
+                connection.list_exported_child_objects(object_path))
 
     def __repr__(self):
         where = ''
@@ -794,6 +1087,8 @@ class FallbackObject(Object):
 
     SUPPORTS_MULTIPLE_OBJECT_PATHS = True
 
+    _fallback = True
+
     def __init__(self, conn=None, object_path=None):
         """Constructor.
 
@@ -818,7 +1113,6 @@ class FallbackObject(Object):
                 object has been added.
         """
         super(FallbackObject, self).__init__()
-        self._fallback = True
 
         if conn is None:
             if object_path is not None:
@@ -826,4 +1120,448 @@ class FallbackObject(Object):
         elif object_path is None:
             raise TypeError('If conn is given, object_path is required')
         else:
-            self.add_to_connection(conn, object_path)
+            self._dbus_export(conn, object_path)
+            self._dbus_unannounced += ((conn, object_path),)
+
+
+class VirtualSubtree(FallbackObject):
+    """A `FallbackObject` which implements an entire subtree of the
+    object-path tree with objects created on demand, so that a very large
+    tree costs one registration with libdbus rather than one `Object` per
+    path.
+
+    When a method call arrives for an object path below the subtree's
+    own, ``factory(object_path)`` is called to create the `Object`
+    implementing that path, which should not itself be exported; the
+    most recently used objects are cached. The object is then treated as
+    being exported at that path, so it can emit signals. Example::
+
+        def make_device(path):
+            device = devices.get(path.rsplit('/', 1)[-1])
+            if device is not None:
+                return DeviceObject(device)
+
+        def list_devices(path):
+            if path == '/com/example/Devices':
+                return devices.keys()
+            return ()
+
+        VirtualSubtree(bus, '/com/example/Devices', make_device,
+                       list_devices)
+
+    Objects exported normally below the subtree take precedence over its
+    virtual objects, as with any `FallbackObject`.
+
+    :Since: 0.84.0
+    """
+
+    #: The default number of virtual objects to keep in the cache
+    DEFAULT_CACHE_SIZE = 128
+
+    def __init__(self, conn=None, object_path=None, factory=None,
+                 enumerator=None, cache_size=None):
+        """Constructor.
+
+        :Parameters:
+            `conn` : dbus.connection.Connection or None
+                As for `FallbackObject`.
+            `object_path` : str or None
+                As for `FallbackObject`.
+            `factory` : callable
+                Called with an object path below this subtree; returns the
+                `Object` implementing that path, or None if there is no
+                object there.
+            `enumerator` : callable or None
+                If not None, called with an object path in this subtree
+                (including the subtree's own path) to return an iterable
+                over the names of that path's virtual children, for
+                introspection.
+            `cache_size` : int or None
+                The number of virtual objects to cache; the default is
+                `DEFAULT_CACHE_SIZE`.
+        """
+        if factory is None:
+            raise TypeError('VirtualSubtree requires a factory')
+        if cache_size is None:
+            cache_size = self.DEFAULT_CACHE_SIZE
+        if cache_size < 1:
+            raise ValueError('cache_size must be at least 1, not %d'
+                             % cache_size)
+
+        self._factory = factory
+        self._enumerator = enumerator
+        #: Map from (Connection, object path) to virtual Object
+        self._virtual_objects = LRUCache(cache_size)
+
+        super(VirtualSubtree, self).__init__(conn, object_path)
+
+    def get_virtual_object(self, connection, object_path):
+        """Return the `Object` implementing the given path in this subtree
+        on the given connection, creating it with the factory if it is not
+        cached.
+
+        :Raises UnknownObjectException: if the factory returns None
+        """
+        key = (connection, object_path)
+        obj = self._virtual_objects.get(key)
+        if obj is None:
+            obj = self._factory(object_path)
+            if obj is None:
+                raise UnknownObjectException(object_path)
+            if obj._object_path is None:
+                # pretend it's exported without registering it with libdbus
+                obj._connection = connection
+                obj._object_path = object_path
+                obj._locations = ((connection, object_path, False),)
+            self._virtual_objects[key] = obj
+        return obj
+
+    def invalidate(self, object_path=None):
+        """Discard the cached virtual object for the given path, or all
+        cached virtual objects if `object_path` is None, so that the
+        factory is called again when the path is next used.
+        """
+        if object_path is None:
+            self._virtual_objects.clear()
+            return
+        for key in self._virtual_objects.keys():
+            if key[1] == object_path:
+                self._virtual_objects.pop(key)
+
+    def _message_cb(self, connection, message):
+        if not isinstance(message, MethodCallMessage):
+            return
+
+        path = message.get_path()
+        own_path = (self._rel_path(connection, path) == '/')
+
+        if (message.get_member() == 'Introspect' and
+            message.get_interface() in (None, INTROSPECTABLE_IFACE)):
+            try:
+                if own_path:
+                    obj = self
+                else:
+                    try:
+                        obj = self.get_virtual_object(connection, path)
+                    except UnknownObjectException:
+                        # a synthesized ancestor of virtual objects
+                        obj = None
+                children = connection.list_exported_child_objects(path)
+                if self._enumerator is not None:
+                    exported = dict.fromkeys(children)
+                    for name in self._enumerator(path):
+                        if name not in exported:
+                            children.append(name)
+                reflection_data = _introspection_data(obj, path, children)
+            except Exception, exception:
+                _method_reply_error(connection, message, exception)
+            else:
+                _method_reply_return(connection, message, 'Introspect',
+                                     Signature('s'), reflection_data)
+            return
+
+        if own_path:
+            return super(VirtualSubtree, self)._message_cb(connection,
+                                                           message)
+
+        try:
+            obj = self.get_virtual_object(connection, path)
+        except Exception, exception:
+            _method_reply_error(connection, message, exception)
+            return
+        obj._message_cb(connection, message)
+
+
+def _property_value(prop, value):
+    """Return `value` converted to the dbus-python type corresponding to
+    the property's signature, so it is marshalled correctly as a variant.
+    """
+    message = SignalMessage('/', PROPERTIES_IFACE, 'PropertiesChanged')
+    message.append(value, signature=prop._dbus_signature)
+    return message.get_args_list()[0]
+
+
+class PropertiesInterface(Interface):
+    r"""A mixin implementing ``org.freedesktop.DBus.Properties`` for
+    `Object` subclasses with properties declared using
+    @\ `dbus.service.property`.
+
+    Example::
+
+        class Example(dbus.service.Object, dbus.service.PropertiesInterface):
+            @dbus.service.property('com.example.Sample', signature='s')
+            def Name(self):
+                return self._name
+
+            @Name.setter
+            def Name(self, value):
+                self._name = value
+
+    Property values are converted to their D-Bus types and cached per
+    interface by GetAll. Setting a property (from Python or over D-Bus)
+    invalidates the cache and emits PropertiesChanged; changes made inside
+    an `Object.signal_batch` are merged into one PropertiesChanged signal
+    per interface.
+
+    :Since: 0.84.0
+    """
+
+    #: Map from interface name to a tuple (dbus.Dictionary of cached
+    #: values, list of properties which cannot be cached), or None
+    _dbus_properties_cache = None
+
+    #: Map from interface name to a tuple (dict of changed values, list of
+    #: invalidated property names) not yet emitted, or None
+    _dbus_properties_pending = None
+
+    def _dbus_properties(self, interface_name):
+        """Return a dict mapping property names to the properties on the
+        given interface, or on all interfaces if `interface_name` is empty.
+        """
+        interfaces = self._dbus_class_table[self.__class__.__module__ + '.' +
+                                            self.__class__.__name__]
+        if interface_name:
+            tables = (interfaces.get(interface_name, {}),)
+        else:
+            tables = interfaces.values()
+
+        props = {}
+        for table in tables:
+            for (name, func) in table.iteritems():
+                if getattr(func, '_dbus_is_property', False):
+                    props[name] = func
+        return props
+
+    def _dbus_lookup_property(self, interface_name, property_name):
+        prop = self._dbus_properties(interface_name).get(property_name)
+        if prop is None:
+            if interface_name:
+                property_name = interface_name + '.' + property_name
+            raise UnknownPropertyException(property_name)
+        return prop
+
+    @method(PROPERTIES_IFACE, in_signature='ss', out_signature='v')
+    def Get(self, interface_name, property_name):
+        prop = self._dbus_lookup_property(interface_name, property_name)
+        cache = self._dbus_properties_cache
+        if cache is not None:
+            cached = cache.get(prop._dbus_interface)
+            if cached is not None and property_name in cached[0]:
+                return cached[0][property_name]
+        return _property_value(prop, prop.__get__(self))
+
+    @method(PROPERTIES_IFACE, in_signature='s', out_signature='a{sv}')
+    def GetAll(self, interface_name):
+        cache = self._dbus_properties_cache
+        if cache is None:
+            cache = self._dbus_properties_cache = {}
+
+        cached = cache.get(interface_name)
+        if cached is None:
+            values = Dictionary(signature='sv')
+            volatile = []
+            for (name, prop) in self._dbus_properties(interface_name).iteritems():
+                if prop._dbus_emits_changed_signal is False:
+                    volatile.append(prop)
+                else:
+                    values[name] = _property_value(prop, prop.__get__(self))
+            cached = cache[interface_name] = (values, volatile)
+
+        values, volatile = cached
+        if not volatile:
+            # the cached dict is only ever replaced, never modified, so
+            # it's safe to hand it out
+            return values
+
+        values = Dictionary(values, signature='sv')
+        for prop in volatile:
+            values[prop.__name__] = _property_value(prop, prop.__get__(self))
+        return values
+
+    @method(PROPERTIES_IFACE, in_signature='ssv', out_signature='')
+    def Set(self, interface_name, property_name, value):
+        prop = self._dbus_lookup_property(interface_name, property_name)
+        if prop.fset is None:
+            raise ReadOnlyPropertyException(prop._dbus_interface + '.' +
+                                            property_name)
+        # don't call the setter with a value of the wrong type
+        try:
+            value = _property_value(prop, value)
+        except (TypeError, ValueError, OverflowError), e:
+            raise InvalidArgsException('Invalid value for property %s.%s '
+                                       'with signature %s: %s'
+                                       % (prop._dbus_interface, property_name,
+                                          prop._dbus_signature, e))
+        prop.__set__(self, value)
+
+    @signal(PROPERTIES_IFACE, signature='sa{sv}as')
+    def PropertiesChanged(self, interface_name, changed_properties,
+                          invalidated_properties):
+        pass
+
+    def properties_changed(self, interface_name, property_names):
+        """Tell the object that some of its properties have changed other
+        than by being set, so that its cache is invalidated and
+        PropertiesChanged is emitted as appropriate.
+
+        :Parameters:
+            `interface_name` : str
+                The D-Bus interface of the properties.
+            `property_names` : iterable of str
+                The names of the properties that changed.
+        """
+        props = self._dbus_properties(interface_name)
+        for name in property_names:
+            prop = props.get(name)
+            if prop is None:
+                raise UnknownPropertyException(interface_name + '.' + name)
+            self._dbus_queue_property_change(prop)
+        if self._signal_batch is None:
+            self._dbus_flush_properties_changed()
+
+    # Called by dbus.decorators._Property when the property is set.
+    def _dbus_property_changed(self, prop, value):
+        self._dbus_queue_property_change(prop)
+        if self._signal_batch is None:
+            self._dbus_flush_properties_changed()
+
+    def _dbus_queue_property_change(self, prop):
+        interface_name = prop._dbus_interface
+        cache = self._dbus_properties_cache
+        if cache is not None:
+            cache.pop(interface_name, None)
+            cache.pop('', None)
+
+        emits = prop._dbus_emits_changed_signal
+        if emits not in (True, 'invalidates'):
+            return
+
+        pending = self._dbus_properties_pending
+        if pending is None:
+            pending = self._dbus_properties_pending = {}
+        changed, invalidated = pending.setdefault(interface_name, ({}, []))
+        if emits is True:
+            changed[prop.__name__] = _property_value(prop,
+                                                     prop.__get__(self))
+        elif prop.__name__ not in invalidated:
+            invalidated.append(prop.__name__)
+
+    def _dbus_flush_properties_changed(self):
+        pending = self._dbus_properties_pending
+        if not pending:
+            return
+        self._dbus_properties_pending = None
+        for (interface_name, (changed, invalidated)) in pending.iteritems():
+            self.PropertiesChanged(interface_name,
+                                   Dictionary(changed, signature='sv'),
+                                   Array(invalidated, signature='s'))
+
+
+def _interfaces_and_properties(obj, with_properties=True):
+    """Return a dbus.Dictionary mapping the names of the interfaces
+    implemented by `obj` to its properties on each interface, as returned
+    by org.freedesktop.DBus.ObjectManager.GetManagedObjects. If
+    `with_properties` is false, the property dictionaries are empty.
+    """
+    interfaces = obj._dbus_class_table[obj.__class__.__module__ + '.' +
+                                       obj.__class__.__name__]
+    has_properties = (with_properties and
+                      isinstance(obj, PropertiesInterface))
+    result = Dictionary(signature='sa{sv}')
+    for name in interfaces:
+        if has_properties:
+            result[name] = obj.GetAll(name)
+        else:
+            result[name] = Dictionary(signature='sv')
+    return result
+
+
+class ObjectManagerInterface(Interface):
+    r"""A mixin implementing ``org.freedesktop.DBus.ObjectManager`` for
+    `Object` subclasses.
+
+    Every object exported below the manager's object path on the same
+    connection, whether before or after the manager itself, is recorded
+    in an index when it is added with `Object.add_to_connection` and
+    dropped when it is removed with `Object.remove_from_connection`, so
+    GetManagedObjects does not have to visit the object-path tree.
+    InterfacesAdded and InterfacesRemoved are emitted as objects come
+    and go, only at the location of the manager whose subtree contains
+    them; an object exported by its constructor is announced when the
+    constructor returns. Property values are taken from `PropertiesInterface.GetAll`
+    (and its cache) for objects that implement it. Example::
+
+        class Root(dbus.service.Object, dbus.service.ObjectManagerInterface):
+            pass
+
+        root = Root(bus, '/com/example/Devices')
+        Device(bus, '/com/example/Devices/sda')
+
+    :Since: 0.84.0
+    """
+
+    _dbus_is_object_manager = True
+
+    #: Map from (connection, object path of this manager) to dict
+    #: mapping object path to the managed Object, or None
+    _dbus_managed_objects = None
+
+    def _dbus_manage(self, connection, root, descendants):
+        managed = dict(descendants)
+        if self._dbus_managed_objects is None:
+            self._dbus_managed_objects = {}
+        self._dbus_managed_objects[(connection, root)] = managed
+
+    def _dbus_unmanage(self, connection, root):
+        if self._dbus_managed_objects is not None:
+            self._dbus_managed_objects.pop((connection, root), None)
+
+    def _dbus_object_added(self, connection, root, path, obj):
+        managed = self._dbus_managed_objects.get((connection, root))
+        if managed is None:
+            return
+        managed[path] = obj
+        try:
+            interfaces = _interfaces_and_properties(obj)
+        except Exception:
+            _logger.exception('Unable to get the properties of %r at %s: '
+                              'announcing its interfaces without them',
+                              obj, path)
+            interfaces = _interfaces_and_properties(obj, False)
+        _send_signal(self, ((connection, root),), OBJECT_MANAGER_IFACE,
+                     'InterfacesAdded', 'oa{sa{sv}}', (path, interfaces))
+
+    def _dbus_object_removed(self, connection, root, path, obj):
+        managed = self._dbus_managed_objects.get((connection, root))
+        if managed is None or managed.pop(path, None) is None:
+            return
+        interfaces = obj._dbus_class_table[obj.__class__.__module__ + '.' +
+                                           obj.__class__.__name__]
+        _send_signal(self, ((connection, root),), OBJECT_MANAGER_IFACE,
+                     'InterfacesRemoved', 'oas',
+                     (path, Array(interfaces.keys(), signature='s')))
+
+    @method(OBJECT_MANAGER_IFACE, in_signature='',
+            out_signature='a{oa{sa{sv}}}', path_keyword='object_path',
+            connection_keyword='connection')
+    def GetManagedObjects(self, object_path, connection):
+        result = Dictionary(signature='oa{sa{sv}}')
+        if self._dbus_managed_objects is not None:
+            managed = self._dbus_managed_objects.get((connection,
+                                                      object_path), {})
+            for (path, obj) in managed.iteritems():
+                result[path] = _interfaces_and_properties(obj)
+        return result
+
+    @signal(OBJECT_MANAGER_IFACE, signature='oa{sa{sv}}')
+    def InterfacesAdded(self, object_path, interfaces_and_properties):
+        pass
+
+    @signal(OBJECT_MANAGER_IFACE, signature='oas')
+    def InterfacesRemoved(self, object_path, interfaces):
+        pass
+
+
+# Exported as dbus.service.property (see __all__). This alias is bound
+# last so that the rest of this module still sees the built-in property.
+property = _property_decorator
@@ -0,0 +1,330 @@
+# Copyright (C) 2008 Collabora Ltd. <http://www.collabora.co.uk/>
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use, copy,
+# modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""Large payloads in shared memory, passed between processes as Unix file
+descriptors (D-Bus signature 'h').
+
+Sending 100MB through a message body copies it several times; sending a
+`SharedBuffer` only sends a file descriptor, and the recipient maps the
+same memory. This needs a connection on which Unix file descriptors can be
+passed: see `dbus.connection.Connection.can_send_type`.
+
+To receive the buffers, opt in with ``shared_memory=True``: either in the
+`dbus.service.method` decorator, so the method is passed a `SharedBuffer`
+for each 'h' in its arguments, or as a keyword argument when calling a
+proxy method, so a `SharedBuffer` is returned for each 'h' in the reply.
+File descriptors inside arrays, structs, dicts and variants are mapped
+too.
+
+:Since: 0.84.0
+"""
+
+__all__ = ('SharedBuffer',)
+__docformat__ = 'restructuredtext'
+
+import errno
+import fcntl
+import mmap
+import os
+import platform
+import sys
+import tempfile
+
+from _dbus_bindings import Array, Dictionary, Struct, UnixFd
+
+try:
+    import ctypes
+    _libc = ctypes.CDLL(None, use_errno=True)
+except (ImportError, OSError):
+    _libc = None
+
+
+# tmpfs on Linux, so that the memory is never written to disk, for
+# systems without memfd_create
+_SHM_DIR = '/dev/shm'
+
+# from <linux/memfd.h> and <linux/fcntl.h>, which Python 2 doesn't expose
+_MFD_CLOEXEC = 0x0001
+_MFD_ALLOW_SEALING = 0x0002
+_F_ADD_SEALS = 1033
+_F_GET_SEALS = 1034
+_F_SEAL_SEAL = 0x0001
+_F_SEAL_SHRINK = 0x0002
+_F_SEAL_GROW = 0x0004
+_F_SEAL_WRITE = 0x0008
+
+# Linux system call numbers for memfd_create, for C libraries which
+# don't wrap it (glibc only does since 2.27)
+_SYS_MEMFD_CREATE = {
+    'x86_64': 319,
+    'i386': 356,
+    'i686': 356,
+    'aarch64': 279,
+    'armv7l': 385,
+    'ppc64': 360,
+    'ppc64le': 360,
+    's390x': 350,
+}
+
+
+def _memfd_create(name):
+    """Return a new memfd on which seals can be set, or None if this
+    system has no memfd_create.
+    """
+    if _libc is None or not sys.platform.startswith('linux'):
+        return None
+    flags = _MFD_CLOEXEC | _MFD_ALLOW_SEALING
+    function = getattr(_libc, 'memfd_create', None)
+    if function is not None:
+        fd = function(name, flags)
+    else:
+        number = _SYS_MEMFD_CREATE.get(platform.machine())
+        if number is None:
+            return None
+        fd = _libc.syscall(number, name, flags)
+    if fd < 0:
+        e = ctypes.get_errno()
+        # ENOSYS: before Linux 3.17; EINVAL: sealing not supported
+        if e in (errno.ENOSYS, errno.EINVAL):
+            return None
+        raise OSError(e, os.strerror(e))
+    return fd
+
+
+def _get_seals(fd):
+    """Return the seals on a file descriptor, or 0 if it can't have any."""
+    try:
+        return fcntl.fcntl(fd, _F_GET_SEALS)
+    except IOError:
+        return 0
+
+
+class SharedBuffer(object):
+    """A block of memory which can be sent to another process over D-Bus
+    without copying it, as a Unix file descriptor.
+
+    The memory is backed by a memfd (see ``memfd_create(2)``) sealed so
+    that its size can't change, and is exposed as an ``mmap`` object: read
+    or write it with slicing, or get a zero-copy view with `view`. Numeric
+    payloads can be viewed without copying by libraries which accept a
+    buffer, for instance ``numpy.frombuffer(buf.mmap, dtype)``. Call
+    `seal` once the buffer has been filled, so that its contents can't
+    change either.
+
+    A SharedBuffer is sent wherever the signature says 'h'; it can't be
+    guessed from a signature-less call. Buffers received from another
+    process are mapped read-only. A received file descriptor which is not
+    sealed against shrinking could be truncated by the sender while it is
+    mapped, which would crash the recipient, so its contents are copied
+    instead.
+
+    On systems without memfd_create, the memory is backed by an unlinked,
+    unsealed file in ``/dev/shm`` (or the default temporary directory if
+    that doesn't exist), so recipients copy it.
+
+    :Since: 0.84.0
+    """
+
+    __slots__ = ('_fd', '_mmap', '_size', '_writable', '_sealed')
+
+    def __init__(self, size):
+        """Allocate a new, zero-filled, writable buffer of the given size
+        in bytes.
+        """
+        if size < 0:
+            raise ValueError('size must be non-negative')
+        fd = _memfd_create('dbus-python')
+        if fd is None:
+            if os.path.isdir(_SHM_DIR):
+                fd, path = tempfile.mkstemp(prefix='dbus-python-',
+                                            dir=_SHM_DIR)
+            else:
+                fd, path = tempfile.mkstemp(prefix='dbus-python-')
+            os.unlink(path)
+            self._sealed = False
+        else:
+            self._sealed = True
+        try:
+            os.ftruncate(fd, size)
+            if self._sealed:
+                fcntl.fcntl(fd, _F_ADD_SEALS, _F_SEAL_SHRINK | _F_SEAL_GROW)
+            self._setup(UnixFd(fd), size, True)
+        finally:
+            # the UnixFd has its own copy
+            os.close(fd)
+
+    def from_bytes(cls, data):
+        """Return a new writable buffer containing a copy of the given str,
+        buffer or array.
+        """
+        data = buffer(data)
+        self = cls(len(data))
+        if data:
+            self._mmap.write(data)
+            self._mmap.seek(0)
+        return self
+    from_bytes = classmethod(from_bytes)
+
+    def from_unix_fd(cls, fd):
+        """Return a read-only buffer mapping the given file descriptor, which
+        is usually a `dbus.UnixFd` received from another process. The
+        buffer takes over a `dbus.UnixFd`; an integer file descriptor is
+        duplicated.
+
+        If the file descriptor is not sealed against shrinking, the
+        buffer is a copy of its contents rather than a mapping.
+        """
+        if not isinstance(fd, UnixFd):
+            fd = UnixFd(fd)
+        fileno = fd.fileno()
+        size = os.fstat(fileno).st_size
+        sealed = bool(_get_seals(fileno) & _F_SEAL_SHRINK)
+        if size and not sealed:
+            try:
+                return cls._copy(fileno, size)
+            finally:
+                fd.close()
+        self = cls.__new__(cls)
+        self._sealed = sealed
+        self._setup(fd, size, False)
+        return self
+    from_unix_fd = classmethod(from_unix_fd)
+
+    def _copy(cls, fileno, size):
+        self = cls(size)
+        os.lseek(fileno, 0, os.SEEK_SET)
+        offset = 0
+        while offset < size:
+            data = os.read(fileno, min(size - offset, 0x100000))
+            if not data:
+                # truncated by the sender: the rest stays zero-filled
+                break
+            self._mmap[offset:offset + len(data)] = data
+            offset += len(data)
+        self.seal()
+        return self
+    _copy = classmethod(_copy)
+
+    def _setup(self, fd, size, writable):
+        self._fd = fd
+        self._size = size
+        self._writable = writable
+        if size == 0:
+            # mmap can't map an empty file
+            self._mmap = None
+        elif writable:
+            self._mmap = mmap.mmap(fd.fileno(), size, mmap.MAP_SHARED,
+                                   mmap.PROT_READ | mmap.PROT_WRITE)
+        else:
+            self._mmap = mmap.mmap(fd.fileno(), size, mmap.MAP_SHARED,
+                                   mmap.PROT_READ)
+
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        return '<%s.%s of %d bytes (%s) at %#x>' % (
+            self.__class__.__module__, self.__class__.__name__, self._size,
+            self._writable and 'writable' or 'read-only', id(self))
+
+    def fileno(self):
+        """Return the file descriptor backing the buffer. This is what is
+        sent over D-Bus.
+        """
+        return self._fd.fileno()
+
+    mmap = property(lambda self: self._mmap, None, None,
+        """The ``mmap.mmap`` of the buffer's memory, or None if its size
+        is 0.""")
+
+    writable = property(lambda self: self._writable, None, None,
+        """True if the buffer can be written to.""")
+
+    def view(self):
+        """Return a zero-copy, read-only view of the whole buffer: a
+        ``memoryview`` where the mmap supports it, otherwise a ``buffer``.
+        """
+        if self._mmap is None:
+            return buffer('')
+        try:
+            return memoryview(self._mmap)
+        except (NameError, TypeError):
+            # no memoryview before Python 2.7, and Python 2's mmap
+            # only supports the old buffer interface
+            return buffer(self._mmap)
+
+    def seal(self):
+        """Make the buffer read-only, for this process and (if it is a
+        memfd) for every process it is sent to. Call this once the buffer
+        has been filled and before sending it. Views of the memory must
+        not be used afterwards.
+        """
+        if not self._writable:
+            return
+        # the seal can't be added while there's a writable mapping
+        if self._mmap is not None:
+            self._mmap.close()
+        if self._sealed:
+            fcntl.fcntl(self._fd.fileno(), _F_ADD_SEALS,
+                        _F_SEAL_WRITE | _F_SEAL_SEAL)
+        self._setup(self._fd, self._size, False)
+
+    def close(self):
+        """Unmap the memory and close the file descriptor. Views of the
+        memory must not be used afterwards.
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._fd.close()
+
+
+def _map_unix_fds(args):
+    """Return a copy of the list of arguments in which each `dbus.UnixFd`,
+    including those inside arrays, structs and dicts, is replaced by a
+    read-only `SharedBuffer`.
+    """
+    return [_map_unix_fd(arg) for arg in args]
+
+
+def _map_unix_fd(arg):
+    if isinstance(arg, UnixFd):
+        return SharedBuffer.from_unix_fd(arg)
+
+    signature = getattr(arg, 'signature', None)
+    if (signature is not None and 'h' not in signature and
+        'v' not in signature):
+        # no file descriptors in here: don't copy it
+        return arg
+
+    if isinstance(arg, dict):
+        items = dict([(_map_unix_fd(key), _map_unix_fd(value))
+                      for (key, value) in arg.iteritems()])
+    elif isinstance(arg, (list, tuple)):
+        items = [_map_unix_fd(item) for item in arg]
+    else:
+        return arg
+
+    if isinstance(arg, (Array, Struct, Dictionary)):
+        return arg.__class__(items, signature=signature,
+                             variant_level=arg.variant_level)
+    return arg.__class__(items)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+
+# Copyright (C) 2008 Collabora Ltd. <http://www.collabora.co.uk/>
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use, copy,
+# modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""Measure method call round trips, signal delivery and proxy costs.
+
+Usage: bench-calls.py [COUNT]
+
+Each line of output is ``<measurement> <seconds per operation>``, measured
+over COUNT (default 5000) operations. A service is forked into a separate
+process; every measurement is made over a peer-to-peer connection to a
+``dbus.server.Server`` in that process (``_p2p``), and also through the
+session bus (``_bus``) if ``DBUS_SESSION_BUS_ADDRESS`` is set. Run it with
+``run-with-tmp-session-bus.sh`` (``make -C test bench-calls`` does) to get
+a temporary bus which nothing else is using.
+
+``call_ping`` is a blocking call with no arguments, ``call_echo_64k`` a
+blocking call sending and receiving a 64KiB byte array, ``call_async`` an
+asynchronous call with up to 100 calls in flight, ``signal_fanout`` the
+delivery of a signal to one of 100 matching receivers, ``proxy_create``
+the creation of a proxy without introspection, ``introspect_call``
+fetching the introspection XML of an object with 200 methods, and
+``introspect_parse`` parsing it.
+"""
+
+import os
+import sys
+import time
+import traceback
+
+import gobject
+
+import dbus
+import dbus.bus
+import dbus.connection
+import dbus.server
+import dbus.service
+from dbus._expat_introspect_parser import _parse_introspection_data
+from dbus.mainloop.glib import DBusGMainLoop
+
+
+NAME = 'com.example.Bench'
+IFACE = 'com.example.Bench'
+PATH = '/com/example/Bench'
+BIG_PATH = '/com/example/Bench/Big'
+INTROSPECTABLE_IFACE = 'org.freedesktop.DBus.Introspectable'
+RECEIVERS = 100
+WINDOW = 100
+
+
+class BenchObject(dbus.service.Object):
+
+    @dbus.service.method(IFACE, in_signature='', out_signature='')
+    def Ping(self):
+        pass
+
+    @dbus.service.method(IFACE, in_signature='ay', out_signature='ay',
+                         byte_arrays=True)
+    def Echo(self, data):
+        return data
+
+    @dbus.service.method(IFACE, in_signature='u', out_signature='')
+    def EmitSignals(self, count):
+        for i in xrange(count):
+            self.Signal(i)
+
+    @dbus.service.signal(IFACE, signature='u')
+    def Signal(self, serial):
+        pass
+
+
+def _make_method(i):
+    def method(self, name, properties):
+        return name
+    method.__name__ = 'Method%d' % i
+    return dbus.service.method(IFACE, in_signature='sa{sv}',
+                               out_signature='s')(method)
+
+BigObject = type(dbus.service.Object)('BigObject', (dbus.service.Object,),
+        dict([('Method%d' % i, _make_method(i)) for i in xrange(200)]))
+
+
+def run_service(ready_fd):
+    DBusGMainLoop(set_as_default=True)
+    objects = []
+
+    def export(conn):
+        objects.append(BenchObject(conn, PATH))
+        objects.append(BigObject(conn, BIG_PATH))
+
+    server = dbus.server.Server('unix:tmpdir=/tmp')
+    server.on_connection_added.append(lambda server, conn: export(conn))
+    ready = [server.address]
+
+    if os.environ.get('DBUS_SESSION_BUS_ADDRESS'):
+        bus = dbus.SessionBus()
+        bus.request_name(NAME, dbus.bus.NAME_FLAG_DO_NOT_QUEUE)
+        export(bus)
+        ready.append(NAME)
+
+    os.write(ready_fd, ' '.join(ready) + '\n')
+    os.close(ready_fd)
+    gobject.MainLoop().run()
+
+
+def report(name, seconds):
+    print '%s %.9f' % (name, seconds)
+    sys.stdout.flush()
+
+
+def timed(count, func):
+    start = time.time()
+    for i in xrange(count):
+        func()
+    return (time.time() - start) / count
+
+
+def bench_async(loop, conn, dest, count):
+    state = {'sent': 0, 'done': 0, 'error': None}
+
+    def send():
+        state['sent'] += 1
+        conn.call_async(dest, PATH, IFACE, 'Ping', '', (),
+                        reply_handler, error_handler)
+
+    def reply_handler():
+        state['done'] += 1
+        if state['sent'] < count:
+            send()
+        elif state['done'] == count:
+            loop.quit()
+
+    def error_handler(e):
+        state['error'] = e
+        loop.quit()
+
+    start = time.time()
+    for i in xrange(min(WINDOW, count)):
+        send()
+    loop.run()
+    if state['error'] is not None:
+        raise state['error']
+    return (time.time() - start) / count
+
+
+def bench_fanout(loop, conn, dest, count):
+    state = {'received': 0}
+    expected = count * RECEIVERS
+
+    def handler(serial):
+        state['received'] += 1
+        if state['received'] == expected:
+            loop.quit()
+
+    matches = [conn.add_signal_receiver(handler, 'Signal', IFACE, dest,
+                                        PATH)
+               for i in xrange(RECEIVERS)]
+    # make sure the bus has processed the match rules
+    conn.call_blocking(dest, PATH, IFACE, 'Ping', '', ())
+
+    start = time.time()
+    conn.call_async(dest, PATH, IFACE, 'EmitSignals', 'u', (count,),
+                    lambda: None, lambda e: loop.quit())
+    loop.run()
+    elapsed = time.time() - start
+
+    for match in matches:
+        match.remove()
+    if state['received'] != expected:
+        raise AssertionError('received %d signals, expected %d'
+                             % (state['received'], expected))
+    return elapsed / expected
+
+
+def bench_connection(loop, transport, conn, dest, count):
+    # warm up: the first call may have to activate or look up things
+    conn.call_blocking(dest, PATH, IFACE, 'Ping', '', ())
+
+    report('call_ping_%s' % transport,
+           timed(count, lambda: conn.call_blocking(dest, PATH, IFACE, 'Ping',
+                                                   '', ())))
+
+    data = dbus.ByteArray('x' * 65536)
+    report('call_echo_64k_%s' % transport,
+           timed(max(count // 10, 1),
+                 lambda: conn.call_blocking(dest, PATH, IFACE, 'Echo', 'ay',
+                                            (data,), byte_arrays=True)))
+
+    report('call_async_%s' % transport, bench_async(loop, conn, dest, count))
+    report('signal_fanout_%s' % transport,
+           bench_fanout(loop, conn, dest, max(count // RECEIVERS, 1)))
+
+    report('proxy_create_%s' % transport,
+           timed(count, lambda: conn.get_object(dest, PATH,
+                                                introspect=False)))
+
+    introspect = lambda: conn.call_blocking(dest, BIG_PATH,
+                                            INTROSPECTABLE_IFACE,
+                                            'Introspect', '', ())
+    report('introspect_call_%s' % transport,
+           timed(max(count // 10, 1), introspect))
+    return introspect()
+
+
+def main(count):
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            run_service(write_fd)
+        except:
+            traceback.print_exc()
+        os._exit(1)
+
+    os.close(write_fd)
+    try:
+        ready = os.fdopen(read_fd).readline().split()
+        if not ready:
+            raise SystemExit('service failed to start')
+
+        DBusGMainLoop(set_as_default=True)
+        loop = gobject.MainLoop()
+
+        conn = dbus.connection.Connection(ready[0])
+        xml = bench_connection(loop, 'p2p', conn, None, count)
+        conn.close()
+
+        if len(ready) > 1:
+            bus = dbus.SessionBus(private=True)
+            bench_connection(loop, 'bus', bus, ready[1], count)
+            bus.close()
+
+        report('introspect_parse',
+               timed(max(count // 10, 1),
+                     lambda: _parse_introspection_data(xml)))
+    finally:
+        os.kill(pid, 15)
+        os.waitpid(pid, 0)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(5000)
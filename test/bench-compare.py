@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+# Copyright (C) 2008 Collabora Ltd. <http://www.collabora.co.uk/>
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use, copy,
+# modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""Compare two runs of the benchmarks.
+
+Usage: bench-compare.py OLD NEW
+
+OLD and NEW are files containing the output of the bench-*.py scripts
+(``make -C test bench > FILE`` runs them all). Each line of output is
+``<measurement> <old> <new> <change>``, where the change is the percentage
+by which the new value is larger than the old one: since every measurement
+is a time or a size, negative is better. Measurements present in only one
+file are listed with ``-`` for the missing value.
+"""
+
+import sys
+
+
+def load(filename):
+    results = {}
+    order = []
+    f = open(filename)
+    try:
+        for line in f:
+            fields = line.split()
+            if len(fields) != 2:
+                continue
+            try:
+                value = float(fields[1])
+            except ValueError:
+                continue
+            if fields[0] not in results:
+                order.append(fields[0])
+            results[fields[0]] = value
+    finally:
+        f.close()
+    return results, order
+
+
+def main(old_filename, new_filename):
+    old, order = load(old_filename)
+    new, new_order = load(new_filename)
+    order.extend([name for name in new_order if name not in old])
+
+    for name in order:
+        if name not in new:
+            print '%s %g - -' % (name, old[name])
+        elif name not in old:
+            print '%s - %g -' % (name, new[name])
+        elif old[name] == 0:
+            print '%s %g %g -' % (name, old[name], new[name])
+        else:
+            print '%s %g %g %+.1f%%' % (name, old[name], new[name],
+                                       100.0 * (new[name] - old[name])
+                                       / old[name])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.stderr.write(__doc__)
+        sys.exit(2)
+    main(sys.argv[1], sys.argv[2])
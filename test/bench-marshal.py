@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+# Copyright (C) 2008 Collabora Ltd. <http://www.collabora.co.uk/>
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use, copy,
+# modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""Measure the time taken to marshal and demarshal message arguments.
+
+Usage: bench-marshal.py [COUNT]
+
+Each line of output is ``<measurement> <seconds per message>``, the best of
+three runs of COUNT (default 10000) messages. ``marshal_<name>`` appends
+the arguments to a new message, ``demarshal_<name>`` gets them back with
+the default options, and ``demarshal_<name>_native`` with
+``utf8_strings=True, byte_arrays=True``. No bus daemon is needed.
+"""
+
+import sys
+import time
+
+import dbus
+from _dbus_bindings import SignalMessage
+
+
+def struct_list(n):
+    return [(i, 'item %d' % i, i / 3.0) for i in xrange(n)]
+
+# (name, signature, arguments)
+CASES = (
+    ('int32', 'i', (42,)),
+    ('string', 's', ('The quick brown fox jumps over the lazy dog',)),
+    ('object_path', 'o', ('/com/example/Bench/Object',)),
+    ('variant', 'v', (dbus.Int32(42),)),
+    ('int32_array_1k', 'ai', (range(1000),)),
+    ('double_array_1k', 'ad', ([i / 7.0 for i in xrange(1000)],)),
+    ('string_array_100', 'as', (['string %d' % i for i in xrange(100)],)),
+    ('byte_array_64k', 'ay', (dbus.ByteArray('x' * 65536),)),
+    ('struct_array_100', 'a(isd)', (struct_list(100),)),
+    ('properties_20', 'a{sv}',
+     (dict([('Property%d' % i, dbus.String('value %d' % i))
+            for i in xrange(20)]),)),
+    ('nested_dict_array_10', 'aa{ss}',
+     ([dict([('key%d' % j, 'value %d' % j) for j in xrange(10)])
+       for i in xrange(10)],)),
+    ('many_args', 'sssiiiuuuddd',
+     ('a', 'b', 'c', 1, 2, 3, 4, 5, 6, 0.5, 1.5, 2.5)),
+)
+
+
+def best_of_three(count, func):
+    best = None
+    for i in xrange(3):
+        start = time.time()
+        for j in xrange(count):
+            func()
+        t = time.time() - start
+        if best is None or t < best:
+            best = t
+    return best / count
+
+
+def report(name, seconds):
+    print '%s %.9f' % (name, seconds)
+    sys.stdout.flush()
+
+
+def main(count):
+    for name, signature, args in CASES:
+        def marshal():
+            message = SignalMessage('/', 'com.example.Bench', 'Signal')
+            message.append(signature=signature, *args)
+        report('marshal_%s' % name, best_of_three(count, marshal))
+
+        message = SignalMessage('/', 'com.example.Bench', 'Signal')
+        message.append(signature=signature, *args)
+        report('demarshal_%s' % name,
+               best_of_three(count, message.get_args_list))
+        report('demarshal_%s_native' % name,
+               best_of_three(count,
+                             lambda: message.get_args_list(utf8_strings=True,
+                                                           byte_arrays=True)))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(10000)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+
+# Copyright (C) 2008 Collabora Ltd. <http://www.collabora.co.uk/>
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use, copy,
+# modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""Measure the memory used per exported object, proxy and proxy method.
+
+Usage: bench-memory.py [COUNT]
+
+Each line of output is ``<measurement> <bytes per instance>``, measured
+from the growth of the process's resident set size while COUNT (default
+100000) instances are alive. No bus daemon is needed: objects are
+exported on a peer-to-peer connection to a server in this process.
+"""
+
+import gc
+import os
+import sys
+
+import dbus
+import dbus.connection
+import dbus.server
+import dbus.service
+from dbus.mainloop.glib import DBusGMainLoop
+
+
+def resident_size():
+    f = open('/proc/self/statm')
+    try:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    finally:
+        f.close()
+
+
+def measure(name, count, factory):
+    gc.collect()
+    before = resident_size()
+    instances = [factory(i) for i in xrange(count)]
+    gc.collect()
+    after = resident_size()
+    print '%s %d' % (name, (after - before) // count)
+    sys.stdout.flush()
+    return instances
+
+
+def main(count):
+    DBusGMainLoop(set_as_default=True)
+    server = dbus.server.Server('unix:tmpdir=/tmp')
+    conn = dbus.connection.Connection(server.address)
+
+    measure('object_unexported', count,
+            lambda i: dbus.service.Object())
+
+    exported = measure('object_exported', count,
+            lambda i: dbus.service.Object(conn, '/bench/%d' % i))
+    for obj in exported:
+        obj.remove_from_connection()
+    del exported
+
+    proxies = measure('proxy_object', count,
+            lambda i: conn.get_object(None, '/bench/%d' % i,
+                                      introspect=False))
+
+    proxy = proxies[0]
+    del proxies
+    measure('proxy_method', count,
+            lambda i: proxy.get_dbus_method('Method%d' % i,
+                                            'com.example.Bench'))
+
+    conn.close()
+    server.disconnect()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(100000)
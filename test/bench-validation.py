@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+# Copyright (C) 2008 Collabora Ltd. <http://www.collabora.co.uk/>
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use, copy,
+# modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+"""Measure the time taken to validate names.
+
+Usage: bench-validation.py [COUNT]
+
+Each line of output is ``<measurement> <seconds per call>``, the best of
+three runs of COUNT (default 100000) calls. The ``_repeated`` measurements
+validate the same name every time, the ``_distinct`` ones a different name
+every time, so the difference shows the benefit of remembering names
+which have already been validated.
+"""
+
+import sys
+import timeit
+
+
+SETUP = '''
+from _dbus_bindings import validate_bus_name, validate_member_name, \\
+                           validate_interface_name, validate_object_path
+names = ['/com/example/Bench/' + str(i) for i in xrange(%(count)d)]
+members = ['Method' + str(i) for i in xrange(%(count)d)]
+it = iter(names)
+mit = iter(members)
+'''
+
+BENCHMARKS = (
+    ('bus_name_repeated', "validate_bus_name('com.example.Bench')"),
+    ('unique_name_repeated', "validate_bus_name(':1.42')"),
+    ('interface_name_repeated',
+     "validate_interface_name('com.example.Bench.Interface')"),
+    ('member_name_repeated', "validate_member_name('Method')"),
+    ('member_name_distinct', "validate_member_name(mit.next())"),
+    ('object_path_repeated',
+     "validate_object_path('/com/example/Bench/Object')"),
+    ('object_path_distinct', "validate_object_path(it.next())"),
+)
+
+
+def main(count):
+    for name, stmt in BENCHMARKS:
+        best = None
+        for i in xrange(3):
+            timer = timeit.Timer(stmt, SETUP % {'count': count})
+            t = timer.timeit(count)
+            if best is None or t < best:
+                best = t
+        print '%s %.9f' % (name, best / count)
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(100000)
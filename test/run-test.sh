@@ -117,6 +117,9 @@ $PYTHON "$DBUS_TOP_SRCDIR"/test/test-signals.py || die "test-signals.py failed"
 echo "running test-p2p.py"
 $PYTHON "$DBUS_TOP_SRCDIR"/test/test-p2p.py || die "... failed"
 
+echo "running test-server-workers.py"
+$PYTHON "$DBUS_TOP_SRCDIR"/test/test-server-workers.py || die "... failed"
+
 rm -f "$DBUS_TOP_BUILDDIR"/test/test-service.log
 rm -f "$DBUS_TOP_BUILDDIR"/test/cross-client.log
 rm -f "$DBUS_TOP_BUILDDIR"/test/cross-server.log
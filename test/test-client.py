@@ -28,6 +28,7 @@ import os
 import unittest
 import time
 import logging
+import threading
 import weakref
 
 builddir = os.path.normpath(os.environ["DBUS_TOP_BUILDDIR"])
@@ -38,6 +39,7 @@ import _dbus_bindings
 import gobject
 import dbus.glib
 import dbus.service
+import dbus.shm
 
 
 logging.basicConfig()
@@ -104,6 +106,14 @@ class TestDBusBindings(unittest.TestCase):
         self.assertEquals(self.iface.get_dbus_method('AcceptListOfByte')('\1\2\3'), [1,2,3])
         self.assertEquals(self.remote_object.get_dbus_method('AcceptListOfByte', dbus_interface=IFACE)('\1\2\3'), [1,2,3])
 
+    def testProxyMethodCache(self):
+        obj = self.bus.get_object(NAME, OBJECT, introspect=False)
+        self.assert_(obj.Echo is obj.Echo)
+        self.assert_(obj.get_dbus_method('Echo', IFACE) is
+                     dbus.Interface(obj, IFACE).Echo)
+        self.assert_(obj.get_dbus_method('Echo', IFACE) is not obj.Echo)
+        self.assertEquals(obj.get_dbus_method('Echo', IFACE)('x'), 'x')
+
     def testCallingConventionOptions(self):
         self.assertEquals(self.iface.AcceptListOfByte('\1\2\3'), [1,2,3])
         self.assertEquals(self.iface.AcceptListOfByte('\1\2\3', byte_arrays=True), '\1\2\3')
@@ -114,6 +124,38 @@ class TestDBusBindings(unittest.TestCase):
         self.assert_(isinstance(self.iface.AcceptUnicodeString('abc'), unicode))
         self.assert_(isinstance(self.iface.AcceptUnicodeString('abc', utf8_strings=True), str))
 
+    def testNativeReplies(self):
+        ret = self.iface.AcceptListOfByte('\1\2\3', native=True)
+        self.assertEquals(type(ret), str)
+        self.assertEquals(ret, '\1\2\3')
+        ret = self.iface.ReturnArray(5, native=True)
+        self.assertEquals(type(ret), list)
+        self.assertEquals([type(x) for x in ret], [str, str])
+        ret = self.iface.ReturnDict(4, native=True)
+        self.assertEquals(type(ret), dict)
+        ret = self.iface.ReturnStruct(1, native=True)
+        self.assertEquals(type(ret), tuple)
+        self.assertEquals(ret, ('', ''))
+        # Echo has no out-signature, so the reply's own signature is used
+        ret = self.iface.Echo(dbus.Int32(42), native=True)
+        self.assertEquals(type(ret), int)
+        self.assertEquals(ret, 42)
+
+        loop = gobject.MainLoop()
+        replies = []
+        def reply_handler(*args):
+            replies.append(args)
+            loop.quit()
+        def error_handler(e):
+            replies.append(e)
+            loop.quit()
+        self.iface.ReturnTwoStrings(1, native=True,
+                                    reply_handler=reply_handler,
+                                    error_handler=error_handler)
+        loop.run()
+        self.assertEquals(replies, [('', '')])
+        self.assertEquals([type(x) for x in replies[0]], [str, str])
+
     def testIntrospection(self):
         #test introspection
         print "\n********* Introspection Test ************"
@@ -453,6 +495,254 @@ class TestDBusBindings(unittest.TestCase):
         self.assertEquals(rel, '/Badger/Mushroom')
         self.assertEquals(unique_name, obj.bus_name)
 
+    def testProperties(self):
+        obj = self.bus.get_object(NAME, OBJECT + '/Properties')
+        props = dbus.Interface(obj, dbus.PROPERTIES_IFACE)
+
+        self.assertEquals(props.Get(IFACE, 'Name'), 'badger')
+        self.assertEquals(props.Get(IFACE, 'Constant'), 42)
+        self.assertEquals(props.Get(IFACE, 'Constant').__class__,
+                          dbus.UInt32)
+
+        all = props.GetAll(IFACE)
+        self.assertEquals(all['Name'], 'badger')
+        # uncacheable properties are fetched every time
+        self.assert_(props.GetAll(IFACE)['Count'] > all['Count'])
+
+        props.Set(IFACE, 'Name', 'mushroom')
+        self.assertEquals(props.Get(IFACE, 'Name'), 'mushroom')
+        self.assertEquals(props.GetAll(IFACE)['Name'], 'mushroom')
+
+        try:
+            props.Set(IFACE, 'Constant', dbus.UInt32(23))
+        except dbus.DBusException, e:
+            self.assertEquals(e.get_dbus_name(),
+                              'org.freedesktop.DBus.Error.PropertyReadOnly')
+        else:
+            raise AssertionError('Setting a read-only property should fail')
+        try:
+            props.Set(IFACE, 'Name', dbus.Int32(23))
+        except dbus.DBusException, e:
+            self.assertEquals(e.get_dbus_name(),
+                              'org.freedesktop.DBus.Error.InvalidArgs')
+        else:
+            raise AssertionError('Setting a property to a value of the '
+                                 'wrong type should fail')
+        self.assertEquals(props.Get(IFACE, 'Name'), 'mushroom')
+        try:
+            props.Get(IFACE, 'NoSuchProperty')
+        except dbus.DBusException, e:
+            self.assertEquals(e.get_dbus_name(),
+                              'org.freedesktop.DBus.Error.UnknownProperty')
+        else:
+            raise AssertionError('Getting a nonexistent property should fail')
+
+        xml = obj.Introspect(dbus_interface=dbus.INTROSPECTABLE_IFACE)
+        self.assert_('<property name="Name" type="s" access="readwrite" />'
+                     in xml, xml)
+
+    def testCachedProperties(self):
+        obj = self.bus.get_object(NAME, OBJECT + '/Properties',
+                                  cache_properties=True)
+        props = dbus.Interface(obj, dbus.PROPERTIES_IFACE)
+        props.Set(IFACE, 'Name', 'badger')
+
+        self.assertEquals(obj.get_cached_property(IFACE, 'Name'), 'badger')
+        self.assertEquals(obj.get_cached_properties(IFACE)['Constant'], 42)
+
+        loop = gobject.MainLoop()
+        def changed(iface, changed, invalidated):
+            loop.quit()
+        match = obj.connect_to_signal('PropertiesChanged', changed,
+                                      dbus.PROPERTIES_IFACE)
+        props.Set(IFACE, 'Name', 'snake')
+        source_id = gobject.timeout_add(1000, loop.quit)
+        loop.run()
+        gobject.source_remove(source_id)
+        match.remove()
+        self.assertEquals(obj.get_cached_property(IFACE, 'Name'), 'snake')
+
+        obj.invalidate_cached_properties()
+        self.assertEquals(obj.get_cached_property(IFACE, 'Name'), 'snake')
+        self.assertRaises(RuntimeError, self.remote_object.get_cached_property,
+                          IFACE, 'Name')
+
+    def testObjectManager(self):
+        obj = self.bus.get_object(NAME, OBJECT + '/Manager')
+        manager = dbus.Interface(obj, dbus.OBJECT_MANAGER_IFACE)
+
+        managed = manager.GetManagedObjects()
+        self.assertEquals(managed.keys(), [OBJECT + '/Manager/Early'])
+        self.assertEquals(managed[OBJECT + '/Manager/Early'][IFACE]['Name'],
+                          'badger')
+        self.assert_(dbus.PROPERTIES_IFACE in
+                     managed[OBJECT + '/Manager/Early'])
+
+        events = []
+        loop = gobject.MainLoop()
+        def added(path, interfaces):
+            events.append(('+', path, interfaces))
+            loop.quit()
+        def removed(path, interfaces):
+            events.append(('-', path, interfaces))
+            loop.quit()
+        matches = [manager.connect_to_signal('InterfacesAdded', added),
+                   manager.connect_to_signal('InterfacesRemoved', removed)]
+
+        path = obj.AddItem('Late', dbus_interface=IFACE)
+        source_id = gobject.timeout_add(1000, loop.quit)
+        loop.run()
+        gobject.source_remove(source_id)
+        self.assertEquals(events[-1][:2], ('+', path))
+        self.assertEquals(events[-1][2][IFACE]['Constant'], 42)
+        self.assertEquals(events[-1][2][IFACE]['Name'], 'badger')
+        self.assertEquals(sorted(manager.GetManagedObjects().keys()),
+                          [OBJECT + '/Manager/Early', path])
+
+        obj.RemoveItem('Late', dbus_interface=IFACE)
+        source_id = gobject.timeout_add(1000, loop.quit)
+        loop.run()
+        gobject.source_remove(source_id)
+        for match in matches:
+            match.remove()
+        self.assertEquals(events[-1][:2], ('-', path))
+        self.assert_(IFACE in events[-1][2])
+        self.assertEquals(manager.GetManagedObjects().keys(),
+                          [OBJECT + '/Manager/Early'])
+
+    def testVirtualSubtree(self):
+        for i in (5, 999, 5, 7, 0):
+            path = OBJECT + '/Virtual/%d' % i
+            obj = self.bus.get_object(NAME, path, introspect=False)
+            self.assertEquals(obj.GetNumberAndPath(dbus_interface=IFACE),
+                              (i, path))
+
+        root = self.bus.get_object(NAME, OBJECT + '/Virtual')
+        xml = root.Introspect(dbus_interface=dbus.INTROSPECTABLE_IFACE)
+        self.assert_('<node name="2"/>' in xml, xml)
+        obj = self.bus.get_object(NAME, OBJECT + '/Virtual/2')
+        xml = obj.Introspect(dbus_interface=dbus.INTROSPECTABLE_IFACE)
+        self.assert_('<method name="GetNumberAndPath">' in xml, xml)
+
+        obj = self.bus.get_object(NAME, OBJECT + '/Virtual/1000',
+                                  introspect=False)
+        try:
+            obj.GetNumberAndPath(dbus_interface=IFACE)
+        except dbus.DBusException, e:
+            self.assertEquals(e.get_dbus_name(),
+                              'org.freedesktop.DBus.Error.UnknownObject')
+        else:
+            raise AssertionError('Calling a method on a path the factory '
+                                 'rejects should fail')
+
+    def testUnixFdPassing(self):
+        if (not hasattr(_dbus_bindings, 'TYPE_UNIX_FD')
+            or not self.bus.can_send_type('h')):
+            return
+
+        r, w = os.pipe()
+        try:
+            os.write(w, 'hello')
+            os.close(w)
+            w = None
+            self.assertEquals(self.iface.ReadFromFd(dbus.UnixFd(r)), 'hello')
+        finally:
+            os.close(r)
+            if w is not None:
+                os.close(w)
+
+        fd = self.iface.MakePipe('world')
+        self.assert_(isinstance(fd, dbus.UnixFd), repr(fd))
+        f = os.fdopen(fd.take())
+        try:
+            self.assertEquals(f.read(), 'world')
+        finally:
+            f.close()
+
+    def testSharedBuffer(self):
+        if (not hasattr(_dbus_bindings, 'TYPE_UNIX_FD')
+            or not self.bus.can_send_type('h')):
+            return
+
+        buf = dbus.shm.SharedBuffer.from_bytes('payload' * 1000)
+        ret = self.iface.UpperCaseBuffer(buf, shared_memory=True)
+        buf.close()
+        self.assert_(isinstance(ret, dbus.shm.SharedBuffer), repr(ret))
+        self.assertEquals(len(ret), 7000)
+        self.assertEquals(ret.mmap[:14], 'PAYLOADPAYLOAD')
+        ret.close()
+
+        # without opting in, the reply is just a file descriptor
+        buf = dbus.shm.SharedBuffer.from_bytes('x')
+        ret = self.iface.UpperCaseBuffer(buf)
+        buf.close()
+        self.assert_(isinstance(ret, dbus.UnixFd), repr(ret))
+        ret.close()
+
+    def testObjectManagerClient(self):
+        mirror = self.bus.get_object_manager(NAME, OBJECT + '/Manager')
+        self.assert_(OBJECT + '/Manager/Early' in mirror)
+        self.assertEquals(len(mirror), 1)
+        self.assert_(IFACE in mirror.get_interfaces(OBJECT + '/Manager/Early'))
+
+        early = mirror.get_object(OBJECT + '/Manager/Early')
+        self.assert_(mirror.get_object(OBJECT + '/Manager/Early') is early)
+        # served from the pre-seeded cache
+        self.assertEquals(early.get_cached_property(IFACE, 'Constant'), 42)
+        # fetched again into the mirror, without a match rule of its own
+        early.invalidate_cached_properties(IFACE)
+        self.assertEquals(early.get_cached_property(IFACE, 'Constant'), 42)
+        self.assert_(early._property_cache_match is None)
+        self.assertEquals(mirror.get_properties(OBJECT + '/Manager/Early',
+                                                IFACE)['Constant'], 42)
+
+        loop = gobject.MainLoop()
+
+        # changes to objects the mirror doesn't manage are ignored
+        unmanaged = self.bus.get_object(NAME, OBJECT + '/Properties')
+        seen = []
+        def properties_changed(*args):
+            seen.append(args)
+            loop.quit()
+        match = unmanaged.connect_to_signal('PropertiesChanged',
+                                            properties_changed,
+                                            dbus.PROPERTIES_IFACE)
+        unmanaged.Set(IFACE, 'Name', 'stoat',
+                      dbus_interface=dbus.PROPERTIES_IFACE)
+        source_id = gobject.timeout_add(1000, loop.quit)
+        loop.run()
+        gobject.source_remove(source_id)
+        match.remove()
+        unmanaged.Set(IFACE, 'Name', 'badger',
+                      dbus_interface=dbus.PROPERTIES_IFACE)
+        self.assertEquals(len(seen), 1)
+        self.assert_(OBJECT + '/Properties' not in mirror)
+        self.assertEquals(len(mirror), 1)
+
+        def changed(path, interfaces):
+            loop.quit()
+        mirror.on_interfaces_added.append(changed)
+        mirror.on_interfaces_removed.append(changed)
+
+        manager = self.bus.get_object(NAME, OBJECT + '/Manager')
+        path = manager.AddItem('Mirrored', dbus_interface=IFACE)
+        source_id = gobject.timeout_add(1000, loop.quit)
+        loop.run()
+        gobject.source_remove(source_id)
+        self.assert_(path in mirror)
+        self.assertEquals(mirror.get_properties(path, IFACE)['Name'],
+                          'badger')
+
+        props = dbus.Interface(mirror.get_object(path), dbus.PROPERTIES_IFACE)
+        props.Set(IFACE, 'Name', 'weasel')
+        manager.RemoveItem('Mirrored', dbus_interface=IFACE)
+        source_id = gobject.timeout_add(1000, loop.quit)
+        loop.run()
+        gobject.source_remove(source_id)
+        self.assert_(path not in mirror)
+        self.assertRaises(KeyError, mirror.get_object, path)
+        mirror.close()
+
     def testTimeoutSync(self):
         self.assert_(self.iface.BlockFor500ms(timeout=1.0) is None)
         self.assertRaises(dbus.DBusException,
@@ -473,6 +763,50 @@ class TestDBusBindings(unittest.TestCase):
         # fd.o #12096
         dbus.Bus(private=True).close()
 
+    def testBusConnectionPool(self):
+        pool = dbus.bus.BusConnectionPool(size=2)
+        try:
+            self.assertEquals(len(pool), 2)
+            a = pool.acquire()
+            b = pool.acquire()
+            self.assert_(a is not b)
+            self.assert_(pool.acquire(blocking=False) is None)
+            pool.release(a)
+            self.assertRaises(ValueError, pool.release, a)
+            pool.release(b)
+
+            self.assertEquals(pool.call_blocking(NAME, OBJECT, IFACE,
+                                                 'Echo', 'v', ('V',)), 'V')
+            self.assert_(pool.get_thread_connection()
+                         is pool.get_thread_connection())
+            # the next thread to ask is given the other connection
+            others = []
+            t = threading.Thread(target=lambda:
+                    others.append(pool.get_thread_connection()))
+            t.start()
+            t.join()
+            self.assertEquals(len(others), 1)
+            self.assert_(others[0] is not pool.get_thread_connection())
+            iface = dbus.Interface(pool.get_object(NAME, OBJECT), IFACE)
+            self.assertEquals(iface.Echo('V'), 'V')
+        finally:
+            pool.close()
+
+    def testCallMany(self):
+        results = self.bus.call_many([
+            (NAME, OBJECT, IFACE, 'Echo', 'v', ('V',)),
+            (NAME, OBJECT, IFACE, 'RaiseValueError', '', ()),
+            (NAME, OBJECT, IFACE, 'ReturnTwoStrings', 'u', (1,)),
+            (NAME, OBJECT, IFACE, 'BlockFor500ms', '', ()),
+            ], timeout=5.0, utf8_strings=True)
+        self.assertEquals(len(results), 4)
+        self.assertEquals(results[0], 'V')
+        self.assert_(isinstance(results[1], dbus.DBusException), results[1])
+        self.assertEquals(results[1].get_dbus_name(),
+                          'org.freedesktop.DBus.Python.ValueError')
+        self.assertEquals(results[2], ('', ''))
+        self.assert_(results[3] is None, results[3])
+
     def testTimeoutAsyncClient(self):
         loop = gobject.MainLoop()
         passes = []
@@ -508,6 +842,81 @@ class TestDBusBindings(unittest.TestCase):
         self.assertRaises(dbus.DBusException,
                           lambda: self.iface.AsyncWait500ms(timeout=0.25))
 
+    def testPendingCallsStats(self):
+        loop = gobject.MainLoop()
+        stats = self.bus.get_pending_calls_stats()
+        started = stats['started']
+        self.assertEquals(stats['in_flight'], 0)
+        self.assertEquals(stats['oldest_age'], None)
+
+        results = []
+        def returned():
+            results.append('returned')
+            loop.quit()
+        def failed(exc):
+            results.append(exc.get_dbus_name())
+            loop.quit()
+
+        self.bus.set_timeout_coalescing(0.1)
+        try:
+            self.iface.AsyncWait500ms(timeout=0.25, reply_handler=returned,
+                                      error_handler=failed)
+            stats = self.bus.get_pending_calls_stats()
+            self.assertEquals(stats['in_flight'], 1)
+            self.assertEquals(stats['started'], started + 1)
+            owner = self.bus.get_name_owner(NAME)
+            self.assertEquals(stats['by_destination'], {owner: 1})
+            self.assertEquals(stats['calls'][0][:3],
+                              (owner, IFACE, 'AsyncWait500ms'))
+            self.assert_(0 < stats['next_deadline'] <= 0.25,
+                         stats['next_deadline'])
+            loop.run()
+        finally:
+            self.bus.set_timeout_coalescing(None)
+
+        self.assertEquals(results, ['org.freedesktop.DBus.Error.NoReply'])
+        stats = self.bus.get_pending_calls_stats()
+        self.assertEquals(stats['in_flight'], 0)
+        self.assertEquals(stats['timed_out'], 1)
+
+        # cancelled calls are forgotten
+        pending = self.bus.call_async(NAME, OBJECT, IFACE, 'AsyncWait500ms',
+                                      '', (), returned, failed)
+        pending.cancel()
+        self.assert_(pending.get_cancelled())
+        self.assertEquals(self.bus.get_pending_calls_stats()['in_flight'], 0)
+
+    def testMetrics(self):
+        bus = dbus.SessionBus(private=True)
+        try:
+            self.assertEquals(bus.get_metrics(), None)
+            self.assert_(bus._metrics is None)
+            bus.set_metrics_enabled(True)
+            iface = dbus.Interface(bus.get_object(NAME, OBJECT), IFACE)
+            self.assertEquals(iface.Echo('x'), 'x')
+            self.assertRaises(dbus.DBusException, iface.RaiseValueError)
+
+            metrics = bus.get_metrics()
+            self.assert_(metrics['sent']['method_call'] >= 3, metrics)
+            self.assert_(metrics['received']['method_return'] >= 2, metrics)
+            self.assertEquals(metrics['calls'][(IFACE, 'Echo')]['count'], 1)
+            self.assertEquals(
+                    metrics['calls'][(IFACE, 'RaiseValueError')]['count'], 1)
+            echo = metrics['calls'][(IFACE, 'Echo')]
+            self.assertEquals(sum([count for (bound, count)
+                                   in echo['buckets']]), 1)
+            self.assert_(echo['buckets'][0][0] >= echo['max'], echo)
+            self.assert_(metrics['append']['count'] >= 2, metrics)
+            self.assert_(metrics['get_args']['count'] >= 1, metrics)
+            if metrics['bytes_sent'] is not None:
+                self.assert_(metrics['bytes_sent'] > 0, metrics)
+
+            bus.set_metrics_enabled(False)
+            self.assertEquals(bus.get_metrics(), None)
+            self.assertEquals(iface.Echo('x'), 'x')
+        finally:
+            bus.close()
+
     def testExceptions(self):
         #self.assertRaises(dbus.DBusException,
         #                  lambda: self.iface.RaiseValueError)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+
+# Copyright (C) 2004 Red Hat Inc. <http://www.redhat.com/>
+# Copyright (C) 2005-2007 Collabora Ltd. <http://www.collabora.co.uk/>
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation
+# files (the "Software"), to deal in the Software without
+# restriction, including without limitation the rights to use, copy,
+# modify, merge, publish, distribute, sublicense, and/or sell copies
+# of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+# HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import sys
+import os
+import unittest
+import time
+import logging
+import signal
+import select
+
+builddir = os.path.normpath(os.environ["DBUS_TOP_BUILDDIR"])
+pydir = os.path.normpath(os.environ["DBUS_TOP_SRCDIR"])
+
+import dbus
+import dbus.connection
+import dbus.server
+import dbus.service
+import gobject
+import dbus.glib
+
+
+logging.basicConfig()
+logging.getLogger().setLevel(1)
+
+
+IFACE = "org.freedesktop.DBus.TestSuiteInterface"
+OBJECT = "/org/freedesktop/DBus/TestSuitePythonObject"
+
+class WorkerObject(dbus.service.Object):
+
+    @dbus.service.method(IFACE, in_signature='', out_signature='u')
+    def GetPid(self):
+        return os.getpid()
+
+def run_supervisor(address_fd, events_fd):
+    # in a process group of its own, so the test can kill it and all its
+    # workers at once
+    os.setpgid(0, 0)
+    server = dbus.server.Server('unix:tmpdir=/tmp')
+    os.write(address_fd, server.address + '\n')
+    os.close(address_fd)
+
+    # tell the test about each connection event, and which workers are
+    # still being counted afterwards
+    def added(pid, serial):
+        pids = ','.join([str(p) for p in
+                         sorted(server.worker_connection_counts)])
+        os.write(events_fd, '+ %d %d %s\n' % (pid, serial, pids))
+    def removed(pid, serial):
+        os.write(events_fd, '- %d %d\n' % (pid, serial))
+    server.on_worker_connection_added.append(added)
+    server.on_worker_connection_removed.append(removed)
+
+    index = server.fork_workers(2, respawn=True)
+    if index == 0:
+        return
+    os.close(events_fd)
+    server.on_connection_added.append(lambda conn: WorkerObject(conn,
+                                                                OBJECT))
+    gobject.MainLoop().run()
+
+class TestServerWorkers(unittest.TestCase):
+
+    def setUp(self):
+        read_fd, write_fd = os.pipe()
+        self.events_fd, events_write_fd = os.pipe()
+        self.supervisor = os.fork()
+        if self.supervisor == 0:
+            os.close(read_fd)
+            os.close(self.events_fd)
+            try:
+                run_supervisor(write_fd, events_write_fd)
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        os.close(events_write_fd)
+        read_file = os.fdopen(read_fd)
+        self.address = read_file.readline().strip()
+        read_file.close()
+        self.connections = []
+        self.events = []
+        self.events_buffer = ''
+
+    def tearDown(self):
+        for conn in self.connections:
+            conn.close()
+        os.killpg(self.supervisor, signal.SIGKILL)
+        os.waitpid(self.supervisor, 0)
+        os.close(self.events_fd)
+
+    def wait_for_events(self, predicate):
+        # read the supervisor's connection events until predicate(events)
+        # is true, or give up after a while
+        deadline = time.time() + 10
+        while not predicate(self.events):
+            timeout = deadline - time.time()
+            if timeout <= 0 or not select.select([self.events_fd], [], [],
+                                                 timeout)[0]:
+                break
+            data = os.read(self.events_fd, 4096)
+            if not data:
+                break
+            lines = (self.events_buffer + data).split('\n')
+            self.events_buffer = lines.pop()
+            self.events.extend([line.split(' ') for line in lines])
+        self.assert_(predicate(self.events), self.events)
+
+    def get_worker_pid(self):
+        conn = dbus.connection.Connection(self.address)
+        # keep it open, so the worker stays busy with it
+        self.connections.append(conn)
+        return conn.call_blocking(None, OBJECT, IFACE, 'GetPid', '', ())
+
+    def wait_for_pids(self, pids, n_pids):
+        deadline = time.time() + 10
+        while len(pids) < n_pids and time.time() < deadline:
+            try:
+                pids.add(self.get_worker_pid())
+            except dbus.DBusException:
+                # the connection was accepted by a worker as it died
+                time.sleep(0.1)
+        self.assertEquals(len(pids), n_pids, pids)
+
+    def testRespawn(self):
+        pids = set()
+        # each connection is accepted by one of the two workers
+        self.wait_for_pids(pids, 2)
+        for pid in pids:
+            self.assertNotEquals(pid, self.supervisor)
+
+        killed = pids.pop()
+        os.kill(killed, signal.SIGKILL)
+        # the supervisor starts a third worker to replace the killed one
+        survivors = set(pids)
+        self.wait_for_pids(pids, 2)
+        self.assert_(killed not in pids)
+        self.assert_(survivors < pids)
+
+        # the killed worker's connections were reported removed, even
+        # though it never had the chance to report that itself
+        def serials(event, pid):
+            return set([e[2] for e in self.events
+                        if e[0] == event and int(e[1]) == pid])
+        self.wait_for_events(lambda events: serials('-', killed) and
+                                 serials('-', killed) == serials('+', killed))
+        # and it was no longer counted by the time the connections to its
+        # replacement were reported
+        (new_pid,) = pids - survivors
+        self.wait_for_events(lambda events: serials('+', new_pid))
+        last_added = [e for e in self.events if e[0] == '+'][-1]
+        self.assert_(str(killed) not in last_added[3].split(','),
+                     last_added)
+
+
+if __name__ == '__main__':
+    unittest.main()
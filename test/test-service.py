@@ -36,7 +36,9 @@ import dbus
 if not dbus.__file__.startswith(pydir):
     raise Exception("DBus modules are not being picked up from the package")
 
+import _dbus_bindings
 import dbus.service
+import dbus.shm
 import dbus.glib
 import gobject
 import random
@@ -116,6 +118,67 @@ class Fallback(dbus.service.FallbackObject):
             logger.info('Emitting %s from abs %r', signal, path)
             sig('I am', 'a deprecated fallback', path=path)
 
+class PropertiesObject(dbus.service.Object, dbus.service.PropertiesInterface):
+    def __init__(self, conn, object_path=OBJECT + '/Properties'):
+        # Object._name is the BusName, so use another attribute
+        self._item_name = 'badger'
+        self._count = 0
+        super(PropertiesObject, self).__init__(conn, object_path)
+
+    @dbus.service.property(IFACE, signature='s')
+    def Name(self):
+        return self._item_name
+
+    @Name.setter
+    def Name(self, value):
+        self._item_name = value
+
+    @dbus.service.property(IFACE, signature='u', emits_changed_signal='const')
+    def Constant(self):
+        return 42
+
+    @dbus.service.property(IFACE, signature='u', emits_changed_signal=False)
+    def Count(self):
+        self._count += 1
+        return self._count
+
+class ManagerObject(dbus.service.Object,
+                    dbus.service.ObjectManagerInterface):
+    def __init__(self, conn, object_path=OBJECT + '/Manager'):
+        super(ManagerObject, self).__init__(conn, object_path)
+        self._items = {}
+
+    @dbus.service.method(IFACE, in_signature='s', out_signature='o')
+    def AddItem(self, name):
+        path = OBJECT + '/Manager/' + name
+        self._items[name] = PropertiesObject(self._connection, path)
+        return path
+
+    @dbus.service.method(IFACE, in_signature='s', out_signature='')
+    def RemoveItem(self, name):
+        self._items.pop(name).remove_from_connection()
+
+class VirtualItem(dbus.service.Object):
+    def __init__(self, number):
+        super(VirtualItem, self).__init__()
+        self._number = number
+
+    @dbus.service.method(IFACE, in_signature='', out_signature='io',
+                         path_keyword='path')
+    def GetNumberAndPath(self, path):
+        return self._number, path
+
+def make_virtual_item(path):
+    name = path[len(OBJECT + '/Virtual/'):]
+    if name.isdigit() and int(name) < 1000:
+        return VirtualItem(int(name))
+    return None
+
+def list_virtual_items(path):
+    if path == OBJECT + '/Virtual':
+        return [str(i) for i in xrange(3)]
+    return ()
+
 class MultiPathObject(dbus.service.Object):
     SUPPORTS_MULTIPLE_OBJECT_PATHS = True
 
@@ -243,6 +306,28 @@ class TestObject(dbus.service.Object, TestInterface):
         logger.info('Emitting %s with %r', signal, val)
         sig(*val)
 
+    @dbus.service.signal(IFACE, signature='us', coalesce_interval=0.2,
+                         coalesce_key=0)
+    def SignalCoalesced(self, key, value):
+        pass
+
+    @dbus.service.method(IFACE, in_signature='', out_signature='')
+    def EmitSignalCoalesced(self):
+        self.SignalCoalesced(0, 'a')
+        self.SignalCoalesced(0, 'b')
+        self.SignalCoalesced(1, 'c')
+        self.SignalCoalesced(0, 'd')
+
+    @dbus.service.method(IFACE, in_signature='ub', out_signature='')
+    def EmitSignalBatch(self, count, coalesce):
+        batch = self.signal_batch(coalesce=coalesce)
+        batch.__enter__()
+        try:
+            for i in xrange(count):
+                self.SignalOneString(str(i))
+        finally:
+            batch.__exit__(None, None, None)
+
     def CheckInheritance(self):
         return True
 
@@ -335,10 +420,44 @@ class TestObject(dbus.service.Object, TestInterface):
 
         raise_cb(Fdo12403Error())
 
+    if hasattr(_dbus_bindings, 'TYPE_UNIX_FD'):
+        @dbus.service.method(IFACE, in_signature='h', out_signature='s')
+        def ReadFromFd(self, fd):
+            f = os.fdopen(fd.take())
+            try:
+                return f.read()
+            finally:
+                f.close()
+
+        @dbus.service.method(IFACE, in_signature='s', out_signature='h')
+        def MakePipe(self, contents):
+            r, w = os.pipe()
+            os.write(w, contents)
+            os.close(w)
+            # dbus.UnixFd makes its own duplicate
+            fd = dbus.UnixFd(r)
+            os.close(r)
+            return fd
+
+        @dbus.service.method(IFACE, in_signature='h', out_signature='h',
+                             shared_memory=True)
+        def UpperCaseBuffer(self, buf):
+            ret = dbus.shm.SharedBuffer.from_bytes(buf.mmap[:].upper())
+            buf.close()
+            return ret
+
 session_bus = dbus.SessionBus()
 global_name = dbus.service.BusName(NAME, bus=session_bus)
 object = TestObject(global_name)
 g_object = TestGObject(global_name)
 fallback_object = Fallback(session_bus)
+properties_object = PropertiesObject(session_bus)
+# exported before its manager, to check that the manager picks it up
+PropertiesObject(session_bus, OBJECT + '/Manager/Early')
+manager_object = ManagerObject(session_bus)
+virtual_subtree = dbus.service.VirtualSubtree(session_bus, OBJECT + '/Virtual',
+                                              make_virtual_item,
+                                              list_virtual_items,
+                                              cache_size=2)
 loop = gobject.MainLoop()
 loop.run()
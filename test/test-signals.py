@@ -121,6 +121,53 @@ class TestSignals(unittest.TestCase):
                 raise AssertionError('Signal should not have arrived, but did')
             gobject.source_remove(source_id)
 
+    def batch_test_impl(self, coalesce, expected):
+        received = []
+
+        def _signal_handler(s):
+            received.append(s)
+            if len(received) == len(expected):
+                main_loop.quit()
+        def _timeout_handler():
+            main_loop.quit()
+
+        match = self.iface.connect_to_signal('SignalOneString',
+                                             _signal_handler)
+        self.iface.EmitSignalBatch(5, coalesce)
+        source_id = gobject.timeout_add(1000, _timeout_handler)
+        main_loop.run()
+        gobject.source_remove(source_id)
+        match.remove()
+        self.assertEquals(received, expected)
+
+    def testSignalBatch(self):
+        self.batch_test_impl(False, ['0', '1', '2', '3', '4'])
+
+    def testSignalBatchCoalesced(self):
+        self.batch_test_impl(True, ['4'])
+
+    def testSignalCoalesced(self):
+        received = []
+
+        def _signal_handler(key, value):
+            received.append((int(key), str(value)))
+        def _timeout_handler():
+            main_loop.quit()
+
+        match = self.iface.connect_to_signal('SignalCoalesced',
+                                             _signal_handler)
+        self.iface.EmitSignalCoalesced()
+        source_id = gobject.timeout_add(1000, _timeout_handler)
+        main_loop.run()
+        gobject.source_remove(source_id)
+        match.remove()
+        # the first emission is sent at once, then only the latest value
+        # for each key when the interval expires
+        self.assertEquals(received[0], (0, 'a'))
+        received = received[1:]
+        received.sort()
+        self.assertEquals(received, [(0, 'd'), (1, 'c')])
+
     def testFallback(self):
         self.signal_test_impl(self.fallback_iface, 'Fallback')
 
@@ -197,6 +197,92 @@ class TestMessageMarshalling(unittest.TestCase):
         aeq(args[2].variant_level, 1)
         aeq(args[2].signature, 'v')
 
+    def test_iter_args(self):
+        aeq = self.assertEquals
+        from _dbus_bindings import SignalMessage
+        s = SignalMessage('/', 'foo.bar', 'baz')
+        aeq(list(s.iter_args()), [])
+        s.append('a', [(1, {'x': 'y'}), (2, {})], {'k': 1}, 'b',
+                 signature='sa(ia{ss})a{si}s')
+        args = s.iter_args(utf8_strings=True)
+        aeq(args.next(), 'a')
+        aeq(args.next().__class__, types.Array)
+        aeq(list(args), [{'k': 1}, 'b'])
+        aeq(list(args), [])
+        aeq(list(s.iter_args()), s.get_args_list())
+
+        elements = s.iter_array(1, utf8_strings=True)
+        first = elements.next()
+        aeq(first, (1, {'x': 'y'}))
+        aeq(first.__class__, types.Struct)
+        aeq(first[1]['x'].__class__, types.UTF8String)
+        aeq(list(elements), [(2, {})])
+        aeq(list(s.iter_array(2)), [('k', 1)])
+        self.assertRaises(TypeError, s.iter_array, 0)
+        self.assertRaises(IndexError, s.iter_array, 4)
+        self.assertRaises(IndexError, s.iter_array, -1)
+
+        s = SignalMessage('/', 'foo.bar', 'baz')
+        s.append([], 'ab', signature='asay')
+        aeq(list(s.iter_array(0)), [])
+        aeq(list(s.iter_array(1)), [types.Byte('a'), types.Byte('b')])
+
+        # the iterator keeps the message alive
+        args = s.iter_array(1)
+        del s
+        aeq(list(args), [types.Byte('a'), types.Byte('b')])
+
+    def test_get_args_view(self):
+        aeq = self.assertEquals
+        from _dbus_bindings import SignalMessage
+        s = SignalMessage('/', 'foo.bar', 'baz')
+        aeq(len(s.get_args_view()), 0)
+        s.append('a', [(1, {'x': 'y'}), (2, {})],
+                 {'k': types.Int32(1),
+                  'l': types.Array([1, 2], signature='i')}, 'ab',
+                 signature='sa(ia{ss})a{sv}ay')
+        view = s.get_args_view(utf8_strings=True, byte_arrays=True)
+        aeq(view.signature, 'sa(ia{ss})a{sv}ay')
+        aeq(len(view), 4)
+        aeq(view[0], 'a')
+        aeq(view[0].__class__, types.UTF8String)
+        aeq(view[-1], 'ab')
+        aeq(view[-1].__class__, types.ByteArray)
+        self.assertRaises(IndexError, lambda: view[4])
+
+        structs = view[1]
+        aeq(structs.signature, 'a(ia{ss})')
+        aeq(len(structs), 2)
+        aeq(structs[0][0], 1)
+        aeq(structs[0][1]['x'], 'y')
+        aeq([len(struct[1]) for struct in structs], [1, 0])
+
+        props = view[2]
+        aeq(sorted(props.keys()), ['k', 'l'])
+        aeq(props['k'], 1)
+        aeq(props[u'k'], 1)
+        # variants are converted eagerly
+        aeq(props['l'].__class__, types.Array)
+        aeq(props['l'].variant_level, 1)
+        self.assert_('k' in props)
+        self.assert_('z' not in props)
+        self.assert_('k\0' not in props)
+        self.assert_(1 not in props)
+        aeq(props.get('z'), None)
+        aeq(props.get('z', 0), 0)
+        self.assertRaises(KeyError, lambda: props['z'])
+        aeq(sorted(props.items()), [('k', 1), ('l', [1, 2])])
+        aeq(list(view)[0], 'a')
+
+        s = SignalMessage('/', 'foo.bar', 'baz')
+        s.append({1: 'one', 2: 'two'}, signature='a{is}')
+        d = s.get_args_view()[0]
+        aeq(d[2], 'two')
+        self.assert_('2' not in d)
+        # views keep the message alive
+        del s
+        aeq(sorted(d.values()), ['one', 'two'])
+
     def test_guess_signature(self):
         aeq = self.assertEquals
         from _dbus_bindings import Message
@@ -293,5 +379,556 @@ class TestMessageMarshalling(unittest.TestCase):
                                  'should fail')
 
 
+class TestUnixFd(unittest.TestCase):
+
+    def test_UnixFd(self):
+        aeq = self.assertEquals
+        r, w = os.pipe()
+        try:
+            fd = types.UnixFd(w)
+            # the UnixFd owns a duplicate
+            self.assert_(fd.fileno() != w)
+            aeq(fd.variant_level, 0)
+            aeq(types.UnixFd(fd, variant_level=2).variant_level, 2)
+            os.write(fd.fileno(), 'x')
+            aeq(os.read(r, 1), 'x')
+            taken = fd.take()
+            self.assertRaises(ValueError, fd.fileno)
+            self.assertRaises(ValueError, fd.take)
+            os.close(taken)
+            fd.close()
+
+            f = os.fdopen(os.dup(r))
+            fd = types.UnixFd(f)
+            f.close()
+            fd.close()
+            self.assertRaises(ValueError, fd.fileno)
+            self.assertRaises(ValueError, types.UnixFd, -1)
+            self.assertRaises(TypeError, types.UnixFd, 'x')
+        finally:
+            os.close(r)
+            os.close(w)
+
+    def test_append(self):
+        if not hasattr(_dbus_bindings, 'TYPE_UNIX_FD'):
+            return
+        aeq = self.assertEquals
+        from _dbus_bindings import SignalMessage
+        r, w = os.pipe()
+        try:
+            s = SignalMessage('/', 'foo.bar', 'baz')
+            s.append(w, types.UnixFd(w, variant_level=1), signature='hv')
+            aeq(SignalMessage.guess_signature(types.UnixFd(w)), 'h')
+            args = s.get_args_list()
+            aeq(args[0].__class__, types.UnixFd)
+            aeq(args[1].__class__, types.UnixFd)
+            aeq(args[1].variant_level, 1)
+            os.write(args[0].fileno(), 'y')
+            aeq(os.read(r, 1), 'y')
+            os.close(args[1].take())
+        finally:
+            os.close(r)
+            os.close(w)
+
+
+class TestSharedBuffer(unittest.TestCase):
+
+    def test_SharedBuffer(self):
+        from dbus.shm import SharedBuffer
+        aeq = self.assertEquals
+        buf = SharedBuffer.from_bytes('hello world')
+        aeq(len(buf), 11)
+        self.assert_(buf.writable)
+        buf.mmap[:5] = 'HELLO'
+
+        # the same memory, mapped again as a recipient would
+        received = SharedBuffer.from_unix_fd(types.UnixFd(buf))
+        self.assert_(not received.writable)
+        aeq(received.mmap[:], 'HELLO world')
+        aeq(str(received.view()[6:]), 'world')
+        buf.mmap[6:] = 'WORLD'
+        aeq(received.mmap[6:], 'WORLD')
+        self.assertRaises(TypeError, received.mmap.__setitem__, 0, 'x')
+        received.close()
+        buf.close()
+
+        empty = SharedBuffer(0)
+        aeq(len(empty), 0)
+        aeq(empty.mmap, None)
+        aeq(str(empty.view()), '')
+        empty.close()
+
+    def test_sealing(self):
+        from dbus.shm import SharedBuffer, _memfd_create
+        import errno
+        import tempfile
+        aeq = self.assertEquals
+
+        # an unsealed file could be truncated under the recipient, so
+        # it is copied rather than mapped
+        f = tempfile.TemporaryFile()
+        f.write('unsealed')
+        f.flush()
+        received = SharedBuffer.from_unix_fd(f.fileno())
+        f.seek(0)
+        f.write('UNSEALED')
+        f.flush()
+        f.truncate(0)
+        aeq(received.mmap[:], 'unsealed')
+        self.assert_(not received.writable)
+        received.close()
+        f.close()
+
+        fd = _memfd_create('test')
+        if fd is None:
+            print >> sys.stderr, 'memfd_create is not available'
+            return
+        os.close(fd)
+
+        buf = SharedBuffer.from_bytes('hello')
+        # the size is sealed, so the recipient can't be made to crash
+        try:
+            os.ftruncate(buf.fileno(), 1)
+        except OSError, e:
+            aeq(e.errno, errno.EPERM)
+        else:
+            raise AssertionError('a SharedBuffer could be truncated')
+        buf.seal()
+        self.assert_(not buf.writable)
+        aeq(buf.mmap[:], 'hello')
+        self.assertRaises(TypeError, buf.mmap.__setitem__, 0, 'x')
+        # nobody can write to it now
+        self.assertRaises(OSError, os.write, buf.fileno(), 'x')
+        buf.close()
+
+    def test_map_unix_fds(self):
+        from dbus.shm import SharedBuffer, _map_unix_fds
+        aeq = self.assertEquals
+        buf = SharedBuffer.from_bytes('abc')
+        ints = types.Array([1, 2], signature='i')
+        args = _map_unix_fds([types.UnixFd(buf),
+                              types.Array([types.UnixFd(buf)], signature='h'),
+                              types.Struct(('x', types.UnixFd(buf))),
+                              types.Dictionary({'k': types.UnixFd(buf)},
+                                               signature='sv',
+                                               variant_level=1),
+                              ints])
+        received = [args[0], args[1][0], args[2][1], args[3]['k']]
+        for item in received:
+            aeq(item.__class__, SharedBuffer)
+            aeq(item.mmap[:], 'abc')
+            item.close()
+        aeq(args[1].signature, 'h')
+        aeq(args[2][0], 'x')
+        aeq(args[3].variant_level, 1)
+        # containers which cannot hold file descriptors are not copied
+        self.assert_(args[4] is ints)
+        buf.close()
+
+
+class TestObjectPathTree(unittest.TestCase):
+
+    def test_tree(self):
+        from dbus.connection import _ObjectPathTree
+        aeq = self.assertEquals
+        tree = _ObjectPathTree()
+        root, a, ab, abcd = object(), object(), object(), object()
+        tree['/'] = root
+        tree['/a'] = a
+        tree['/a/b'] = ab
+        tree['/a/b/c/d'] = abcd
+        aeq(len(tree), 4)
+        aeq(tree.get('/a/b'), ab)
+        aeq(tree.get('/a/b/c'), None)
+
+        aeq(tree.nearest('/a/b/c'), ('/a/b', ab))
+        aeq(tree.nearest('/a/b'), ('/a/b', ab))
+        aeq(tree.nearest('/x/y'), ('/', root))
+        aeq(tree.ancestors('/a/b/c/d'), [('/', root), ('/a', a),
+                                         ('/a/b', ab)])
+        aeq(tree.ancestors('/'), [])
+        aeq(sorted(tree.descendants('/a')), sorted([('/a/b', ab),
+                                                    ('/a/b/c/d', abcd)]))
+        aeq(len(tree.descendants('/')), 3)
+
+        # only the registered object can be removed
+        self.assert_(not tree.remove('/a/b/c/d', ab))
+        self.assert_(tree.remove('/a/b/c/d', abcd))
+        self.assert_(not tree.remove('/a/b/c/d', abcd))
+        aeq(tree.descendants('/a/b'), [])
+        aeq(tree.nearest('/a/b/c/d'), ('/a/b', ab))
+        self.assert_(tree.remove('/', root))
+        aeq(tree.nearest('/x'), None)
+        aeq(len(tree), 2)
+
+
+class TestValidation(unittest.TestCase):
+
+    def test_cached_names(self):
+        for i in xrange(3):
+            _dbus_bindings.validate_member_name('Frobnicate')
+            _dbus_bindings.validate_interface_name('com.example.Foo')
+            _dbus_bindings.validate_error_name('com.example.Foo.Error')
+            _dbus_bindings.validate_object_path('/com/example/Foo')
+            _dbus_bindings.validate_object_path(types.ObjectPath('/a/b'))
+            _dbus_bindings.validate_bus_name(':1.1')
+            _dbus_bindings.validate_bus_name('com.example.Foo')
+
+        # names which were never valid are still rejected
+        self.assertRaises(ValueError, _dbus_bindings.validate_member_name,
+                          'com.example.Foo')
+        self.assertRaises(ValueError,
+                          _dbus_bindings.validate_interface_name,
+                          'Frobnicate')
+        self.assertRaises(ValueError, _dbus_bindings.validate_object_path,
+                          'com.example.Foo')
+        self.assertRaises(ValueError, _dbus_bindings.validate_object_path,
+                          '/com/example/Foo/')
+
+        # a cached bus name must still be allowed by the flags
+        self.assertRaises(ValueError, _dbus_bindings.validate_bus_name,
+                          ':1.1', allow_unique=False)
+        self.assertRaises(ValueError, _dbus_bindings.validate_bus_name,
+                          'com.example.Foo', allow_well_known=False)
+        _dbus_bindings.validate_bus_name(name=':1.1', allow_well_known=False)
+
+    def test_many_names(self):
+        # the cache is bounded, and overflowing it doesn't break anything
+        for i in xrange(5000):
+            _dbus_bindings.validate_object_path('/obj/%d' % i)
+        _dbus_bindings.validate_object_path('/obj/0')
+        self.assertRaises(ValueError, _dbus_bindings.validate_object_path,
+                          '/obj//0')
+
+
+class TestProfiling(unittest.TestCase):
+
+    def test_signal_handler(self):
+        from dbus.connection import SignalMatch
+        from dbus.profiling import HandlerProfiler, SlowHandlerLogger
+        import logging
+
+        class Recorder(HandlerProfiler):
+            def __init__(self):
+                self.calls = []
+            def before(self, kind, handler, message):
+                return 'context'
+            def after(self, kind, handler, message, seconds, context,
+                      exc_info):
+                self.calls.append((kind, handler, message.get_member(),
+                                   seconds >= 0, context,
+                                   exc_info and exc_info[0]))
+
+        class Conn(object):
+            pass
+
+        received = []
+        def handler(*args):
+            received.append(args)
+            if args[0] == 'fail':
+                raise ValueError(args[0])
+
+        conn = Conn()
+        match = SignalMatch(conn, None, None, 'com.example.Foo', 'Bar',
+                            handler)
+        profiler = Recorder()
+        s = _dbus_bindings.SignalMessage('/', 'com.example.Foo', 'Bar')
+        s.append('ok', signature='s')
+        self.assert_(match.maybe_handle_message(s, None, profiler))
+        # exceptions are still logged and swallowed
+        s = _dbus_bindings.SignalMessage('/', 'com.example.Foo', 'Bar')
+        s.append('fail', signature='s')
+        logging.getLogger('dbus.connection').disabled = True
+        try:
+            self.assert_(match.maybe_handle_message(s, None, profiler))
+        finally:
+            logging.getLogger('dbus.connection').disabled = False
+        self.assertEquals(received, [('ok',), ('fail',)])
+        self.assertEquals(profiler.calls,
+                [('signal', handler, 'Bar', True, 'context', None),
+                 ('signal', handler, 'Bar', True, 'context', ValueError)])
+
+        messages = []
+        class Capture(logging.Handler):
+            def emit(self, record):
+                messages.append(record.getMessage())
+        logger = logging.Logger('test-profiling')
+        logger.addHandler(Capture())
+        self.assertRaises(ValueError, SlowHandlerLogger, -1)
+        s = _dbus_bindings.SignalMessage('/', 'com.example.Foo', 'Bar')
+        s.append('ok', signature='s')
+        match.maybe_handle_message(s, None, SlowHandlerLogger(3600, logger))
+        self.assertEquals(messages, [])
+        match.maybe_handle_message(s, None, SlowHandlerLogger(0, logger))
+        self.assertEquals(len(messages), 1)
+        self.assert_('com.example.Foo.Bar' in messages[0], messages[0])
+        self.assert_('handler' in messages[0], messages[0])
+
+    def test_profiler_exceptions(self):
+        from dbus.profiling import HandlerProfiler, _call_profiled
+        import logging
+
+        class Broken(HandlerProfiler):
+            def before(self, kind, handler, message):
+                raise KeyError('before')
+            def after(self, kind, handler, message, seconds, context,
+                      exc_info):
+                raise KeyError('after')
+
+        def ok(x):
+            return x * 2
+        def fail(x):
+            raise ValueError(x)
+
+        s = _dbus_bindings.SignalMessage('/', 'com.example.Foo', 'Bar')
+        logging.getLogger('dbus.profiling').disabled = True
+        try:
+            # the profiler's exceptions are logged, and the handler's
+            # return value or exception gets through unchanged
+            self.assertEquals(_call_profiled(Broken(), 'signal', ok, s,
+                                             (21,), {}), 42)
+            self.assertRaises(ValueError, _call_profiled, Broken(),
+                              'signal', fail, s, (21,), {})
+        finally:
+            logging.getLogger('dbus.profiling').disabled = False
+
+
+class TestArgumentGenerator(unittest.TestCase):
+
+    def test_signatures(self):
+        from dbus.loadgen import ArgumentGenerator
+        for signature in ('', 'y', 'bnqiuxtd', 'sog', 'v', 'ai', 'ay',
+                          'a{sv}', 'a{ia(sd)}', '(ias)', 'aa{ss}'):
+            generate = ArgumentGenerator(signature, array_length=3,
+                                         string_length=5)
+            args = generate()
+            self.assertEquals(len(args), len(list(types.Signature(signature))))
+            s = _dbus_bindings.SignalMessage('/', 'com.example.Foo', 'Bar')
+            s.append(signature=signature, *args)
+            self.assertEquals(s.get_signature(), signature)
+            self.assertEquals(len(s.get_args_list()), len(args))
+
+        generate = ArgumentGenerator('as', array_length=2, string_length=7)
+        self.assertEquals([len(x) for x in generate()[0]], [7, 7])
+        self.assertEquals(ArgumentGenerator('ai(sd)', seed=42)(),
+                          ArgumentGenerator('ai(sd)', seed=42)())
+        self.assertRaises(ValueError, ArgumentGenerator, 'h')
+        self.assertRaises(ValueError, ArgumentGenerator, 'a{')
+        self.assertRaises(ValueError, ArgumentGenerator, 's', -1)
+
+        # variants are sometimes strings, even empty ones
+        generate = ArgumentGenerator('v' * 50, string_length=0, seed=1)
+        self.assert_(types.String in [v.__class__ for v in generate()])
+        # dictionary keys are distinct, as far as the key type allows
+        self.assertEquals(len(ArgumentGenerator('a{iy}', array_length=20,
+                                                seed=1)()[0]), 20)
+        self.assertEquals(len(ArgumentGenerator('a{by}', array_length=20,
+                                                seed=1)()[0]), 2)
+
+
+class TestReplyPlan(unittest.TestCase):
+
+    def test_decode(self):
+        aeq = self.assertEquals
+        signature = 'ynqiutbdsogayaiadabasa{sv}a(is)a{ia{s(b)}}asu'
+        s = _dbus_bindings.SignalMessage('/', 'com.example.Foo', 'Bar')
+        s.append(1, 2, 3, 4, 5, 2**63, True, 0.5, 'abc', '/a/b', 'ss',
+                 types.ByteArray('\0\1\xff'), [1, -2, 3], [0.5, 1.5],
+                 [True, False], ['x', 'y'],
+                 {'a': types.Int32(1), 'b': ['c']},
+                 [(1, 'one'), (2, 'two')], {1: {'x': (True,)}},
+                 types.Array([], signature='s'), types.UInt32(2**32 - 1),
+                 signature=signature)
+        plan = _dbus_bindings._ReplyPlan(signature)
+        aeq(plan.signature, signature)
+        args = plan.decode(s)
+        aeq(args, [1, 2, 3, 4, 5, 2**63, True, 0.5, 'abc', '/a/b', 'ss',
+                   '\0\1\xff', [1, -2, 3], [0.5, 1.5], [True, False],
+                   ['x', 'y'], {'a': 1, 'b': ['c']},
+                   [(1, 'one'), (2, 'two')], {1: {'x': (True,)}}, [],
+                   2**32 - 1])
+        aeq([type(x) for x in args[:12]],
+            [int, int, int, int, int, long, bool, float, str, str, str,
+             str])
+        aeq(type(args[16]), dict)
+        aeq(type(args[16]['a']), int)
+        aeq(type(args[16]['b']), list)
+        aeq(type(args[17][0]), tuple)
+
+        # messages with a different signature are not decoded
+        self.assert_(_dbus_bindings._ReplyPlan('s').decode(s) is None)
+        s = _dbus_bindings.SignalMessage('/', 'com.example.Foo', 'Bar')
+        aeq(_dbus_bindings._ReplyPlan('').decode(s), [])
+
+        self.assertRaises(ValueError, _dbus_bindings._ReplyPlan, 'a')
+        self.assertRaises(ValueError, _dbus_bindings._ReplyPlan, '(i')
+
+
+class TestIntrospectionParser(unittest.TestCase):
+
+    XML = """<node name="/com/example/Foo">
+  <interface name="com.example.Foo">
+    <method name="Frobnicate">
+      <arg name="what" type="s"/>
+      <arg name="how" type="a{sv}" direction="in"/>
+      <arg name="result" type="as" direction="out"/>
+      <annotation name="com.example.Hint" value="x"/>
+    </method>
+    <method name="Ping"/>
+    <signal name="Frobnicated">
+      <arg name="what" type="s"/>
+      <arg name="count" type="u"/>
+    </signal>
+    <property name="Size" type="t" access="read">
+      <annotation name="com.example.Hint" value="y"/>
+    </property>
+  </interface>
+  <node name="child">
+    <interface name="com.example.Child">
+      <method name="Ignored"><arg type="i"/></method>
+    </interface>
+  </node>
+  <node name="other"/>
+</node>
+"""
+
+    def test_parse(self):
+        from dbus._expat_introspect_parser import parse_introspection_data, \
+                process_introspection_data
+        aeq = self.assertEquals
+        info = parse_introspection_data(self.XML)
+        aeq(info.interfaces.keys(), ['com.example.Foo'])
+        iface = info.interfaces['com.example.Foo']
+        aeq(iface.methods, {'Frobnicate': ('sa{sv}', 'as'),
+                            'Ping': ('', '')})
+        aeq(iface.signals, {'Frobnicated': 'su'})
+        aeq(iface.properties, {'Size': ('t', 'read')})
+        aeq(info.children, ('child', 'other'))
+        aeq(info.method_map, {'com.example.Foo.Frobnicate': 'sa{sv}',
+                              'com.example.Foo.Ping': ''})
+        aeq(info.reply_map, {'com.example.Foo.Frobnicate': 'as',
+                             'com.example.Foo.Ping': ''})
+        aeq(process_introspection_data(self.XML), info.method_map)
+        # identical documents share their metadata
+        self.assert_(parse_introspection_data(self.XML) is info)
+
+        self.assertRaises(dbus.IntrospectionParserException,
+                          parse_introspection_data, '<node><interface')
+        self.assertRaises(dbus.IntrospectionParserException,
+                          parse_introspection_data, '<node><interface/>')
+
+
+class TestCoalescedSignals(unittest.TestCase):
+
+    def test_coalesce_interval(self):
+        import dbus.mainloop
+        from dbus.decorators import signal
+
+        class Conn(object):
+            _metrics = None
+            def __init__(self):
+                self.sent = []
+            def send_message(self, message):
+                self.sent.append(tuple(message.get_args_list()))
+
+        class Emitter(object):
+            _signal_batch = None
+            def __init__(self, conn):
+                self.locations = ((conn, '/'),)
+            @signal('com.example.Foo', signature='us', coalesce_interval=1,
+                    coalesce_key=0)
+            def Changed(self, key, value):
+                pass
+
+        timers = []
+        def timeout_add(milliseconds, callback, *args):
+            timers.append((milliseconds, callback, args))
+
+        conn = Conn()
+        emitter = Emitter(conn)
+        old_timeout_add = dbus.mainloop._timeout_add
+        dbus.mainloop.set_timeout_add(None)
+        try:
+            self.assertRaises(RuntimeError, emitter.Changed, 1, 'a')
+            dbus.mainloop.set_timeout_add(timeout_add)
+            emitter.Changed(1, 'a')
+            emitter.Changed(3, 'b')
+            emitter.Changed(2, 'c')
+            emitter.Changed(3, 'd')
+            emitter.Changed(2, 'e')
+        finally:
+            dbus.mainloop.set_timeout_add(old_timeout_add)
+
+        self.assertEquals(conn.sent, [(1, 'a')])
+        self.assertEquals(len(timers), 1)
+        milliseconds, callback, args = timers[0]
+        self.assertEquals(milliseconds, 1000)
+        # the latest emission per key, in the order they were made
+        self.assert_(callback(*args))
+        self.assertEquals(conn.sent, [(1, 'a'), (3, 'd'), (2, 'e')])
+        # an idle interval stops the timer
+        self.assert_(not callback(*args))
+
+
+class TestPendingCallRegistry(unittest.TestCase):
+
+    def test_timeout_coalescing(self):
+        import dbus.mainloop
+        from dbus.connection import _PendingCallRegistry
+
+        timers = []
+        def timeout_add(milliseconds, callback, *args):
+            timers.append((milliseconds, callback, args))
+
+        registry = _PendingCallRegistry()
+        timed_out = []
+        old_timeout_add = dbus.mainloop._timeout_add
+        dbus.mainloop.set_timeout_add(None)
+        try:
+            self.assertRaises(RuntimeError,
+                              registry.set_coalesce_interval, 0.01)
+            dbus.mainloop.set_timeout_add(timeout_add)
+            registry.set_coalesce_interval(0.01)
+            token, coalesced = registry.add('com.example', 'com.example.Foo',
+                                            'Bar', 0.01,
+                                            lambda: timed_out.append(1))
+        finally:
+            dbus.mainloop.set_timeout_add(old_timeout_add)
+
+        self.assert_(coalesced)
+        self.assertEquals(len(timers), 1)
+        self.assertEquals(timers[0][0], 10)
+        time.sleep(0.05)
+        # the call times out, and the timer stops as nothing else is waiting
+        self.assert_(not timers[0][1](*timers[0][2]))
+        self.assertEquals(timed_out, [1])
+        self.assertEquals(registry.complete(token), None)
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_lru(self):
+        from dbus._lru import LRUCache
+        aeq = self.assertEquals
+        cache = LRUCache(2)
+        cache['a'] = 1
+        cache['b'] = 2
+        aeq(cache.get('a'), 1)
+        # 'b' is the least recently used
+        cache['c'] = 3
+        aeq(sorted(cache.keys()), ['a', 'c'])
+        # peek doesn't count as a use
+        aeq(cache.peek('a'), 1)
+        cache['d'] = 4
+        aeq(sorted(cache.keys()), ['c', 'd'])
+        aeq(cache.pop('c'), 3)
+        aeq(cache.pop('c', 'gone'), 'gone')
+        aeq(len(cache), 1)
+        self.assert_('d' in cache)
+        cache.clear()
+        aeq(len(cache), 0)
+        aeq(cache.get('d'), None)
+
+
 if __name__ == '__main__':
     unittest.main()